@@ -2,11 +2,12 @@ import os
 import sys
 import json
 import argparse
+import contextlib
 import subprocess
 from functools import lru_cache
 from distutils.util import strtobool
 from rvc_cli.rvc.lib.tools.model_download import model_download_pipeline
-from rvc_cli.rvc.lib.tools.prerequisites import prequisites_download_pipeline
+from rvc_cli.rvc.lib.tools.prerequisites import prerequisites_download_pipeline
 
 
 
@@ -22,10 +23,14 @@ python = sys.executable
 
 
 @lru_cache(maxsize=None)
-def import_voice_converter():
+def import_voice_converter(**config_settings):
     from rvc_cli.rvc.infer.infer import VoiceConverter
 
-    return VoiceConverter()
+    voice_converter = VoiceConverter()
+    # settings read from the configuration when the conversion pipelines are built
+    for name, value in config_settings.items():
+        setattr(voice_converter.config, name, value)
+    return voice_converter
 
 
 @lru_cache(maxsize=1)
@@ -97,6 +102,27 @@ def run_infer_script(
     delay_feedback: float = 0.0,
     delay_mix: float = 0.5,
     sid: int = 0,
+    retrieval_backend: str = "auto",
+    synthesis_batch_size: int = 1,
+    whole_file_features: bool = False,
+    cache_analysis: bool = False,
+    concurrent_analysis: bool = False,
+    f0_threads: int = 0,
+    f0_energy_gate: bool = False,
+    f0_gate_threshold: float = -50.0,
+    f0_decimation: int = 1,
+    rmvpe_chunk_seconds: float = 0,
+    rmvpe_chunk_workers: int = 1,
+    index_cache_mb: float = 2048,
+    pipe_sample_format: str = "s16le",
+    pipe_sample_rate: int = 16000,
+    pipe_channels: int = 1,
+    pipe_wav_header: bool = False,
+    pipe_output_sample_rate: int = 0,
+    pipe_block_seconds: float = 1.0,
+    constant_memory: bool = False,
+    start: float = None,
+    end: float = None,
 ):
     kwargs = {
         "audio_input_path": input_path,
@@ -161,14 +187,54 @@ def run_infer_script(
         "delay_feedback": delay_feedback,
         "delay_mix": delay_mix,
         "sid": sid,
+        "retrieval_backend": retrieval_backend,
+        "synthesis_batch_size": synthesis_batch_size,
+        "whole_file_features": whole_file_features,
+        "cache_analysis": cache_analysis,
+        "concurrent_analysis": concurrent_analysis,
+        "f0_threads": f0_threads,
+        "f0_energy_gate": f0_energy_gate,
+        "f0_gate_threshold": f0_gate_threshold,
+        "f0_decimation": f0_decimation,
+        "start": start,
+        "end": end,
     }
-    infer_pipeline = import_voice_converter()
-    infer_pipeline.convert_audio(
-        **kwargs,
-    )
-    return f"File {input_path} inferred successfully.", output_path.replace(
-        ".wav", f".{export_format.lower()}"
-    )
+    config_settings = {
+        "rmvpe_chunk_seconds": rmvpe_chunk_seconds,
+        "rmvpe_chunk_workers": rmvpe_chunk_workers,
+        "index_cache_mb": index_cache_mb,
+    }
+    # "-" reads the input from stdin or writes the output to stdout
+    if "-" in (input_path, output_path):
+        kwargs.update(
+            {
+                "pipe_sample_format": pipe_sample_format,
+                "pipe_sample_rate": pipe_sample_rate,
+                "pipe_channels": pipe_channels,
+                "pipe_wav_header": pipe_wav_header,
+                "pipe_output_sample_rate": pipe_output_sample_rate,
+                "pipe_block_seconds": pipe_block_seconds,
+            }
+        )
+        # keep model loading messages out of the audio written to stdout
+        with contextlib.redirect_stdout(sys.stderr):
+            infer_pipeline = import_voice_converter(**config_settings)
+        infer_pipeline.convert_pipe(
+            **kwargs,
+        )
+        return f"File {input_path} inferred successfully.", output_path
+    infer_pipeline = import_voice_converter(**config_settings)
+    if constant_memory:
+        output_path = infer_pipeline.convert_long_audio(
+            **kwargs,
+        )
+    else:
+        output_path = infer_pipeline.convert_audio(
+            **kwargs,
+        )
+    if output_path is None:
+        return f"File {input_path} could not be inferred.", None
+    return f"File {input_path} inferred successfully.", output_path
 
 
 # Batch infer
@@ -233,6 +299,18 @@ def run_batch_infer_script(
     delay_feedback: float = 0.0,
     delay_mix: float = 0.5,
     sid: int = 0,
+    retrieval_backend: str = "auto",
+    synthesis_batch_size: int = 1,
+    whole_file_features: bool = False,
+    cache_analysis: bool = False,
+    concurrent_analysis: bool = False,
+    f0_threads: int = 0,
+    f0_energy_gate: bool = False,
+    f0_gate_threshold: float = -50.0,
+    f0_decimation: int = 1,
+    rmvpe_chunk_seconds: float = 0,
+    rmvpe_chunk_workers: int = 1,
+    index_cache_mb: float = 2048,
 ):
     kwargs = {
         "audio_input_paths": input_folder,
@@ -297,8 +375,21 @@ def run_batch_infer_script(
         "delay_feedback": delay_feedback,
         "delay_mix": delay_mix,
         "sid": sid,
+        "retrieval_backend": retrieval_backend,
+        "synthesis_batch_size": synthesis_batch_size,
+        "whole_file_features": whole_file_features,
+        "cache_analysis": cache_analysis,
+        "concurrent_analysis": concurrent_analysis,
+        "f0_threads": f0_threads,
+        "f0_energy_gate": f0_energy_gate,
+        "f0_gate_threshold": f0_gate_threshold,
+        "f0_decimation": f0_decimation,
     }
-    infer_pipeline = import_voice_converter()
+    infer_pipeline = import_voice_converter(
+        rmvpe_chunk_seconds=rmvpe_chunk_seconds,
+        rmvpe_chunk_workers=rmvpe_chunk_workers,
+        index_cache_mb=index_cache_mb,
+    )
     infer_pipeline.convert_audio_batch(
         **kwargs,
     )
@@ -307,6 +398,268 @@ def run_batch_infer_script(
 
    
 
+# Sweep
+def run_sweep_script(
+    pitches: list,
+    index_rates: list,
+    protects: list,
+    filter_radius: int,
+    volume_envelope: int,
+    hop_length: int,
+    f0_method: str,
+    input_path: str,
+    output_folder: str,
+    pth_path: str,
+    index_path: str,
+    split_audio: bool,
+    f0_autotune: bool,
+    f0_autotune_strength: float,
+    clean_audio: bool,
+    clean_strength: float,
+    export_format: str,
+    f0_file: str,
+    embedder_model: str,
+    embedder_model_custom: str = None,
+    formant_shifting: bool = False,
+    formant_qfrency: float = 1.0,
+    formant_timbre: float = 1.0,
+    sid: int = 0,
+    retrieval_backend: str = "auto",
+    synthesis_batch_size: int = 1,
+    whole_file_features: bool = False,
+    cache_analysis: bool = False,
+    concurrent_analysis: bool = False,
+    f0_threads: int = 0,
+    f0_energy_gate: bool = False,
+    f0_gate_threshold: float = -50.0,
+    f0_decimation: int = 1,
+):
+    kwargs = {
+        "audio_input_path": input_path,
+        "audio_output_path": output_folder,
+        "model_path": pth_path,
+        "index_path": index_path,
+        "pitches": pitches,
+        "index_rates": index_rates,
+        "protects": protects,
+        "filter_radius": filter_radius,
+        "volume_envelope": volume_envelope,
+        "hop_length": hop_length,
+        "f0_method": f0_method,
+        "split_audio": split_audio,
+        "f0_autotune": f0_autotune,
+        "f0_autotune_strength": f0_autotune_strength,
+        "clean_audio": clean_audio,
+        "clean_strength": clean_strength,
+        "export_format": export_format,
+        "f0_file": f0_file,
+        "embedder_model": embedder_model,
+        "embedder_model_custom": embedder_model_custom,
+        "formant_shifting": formant_shifting,
+        "formant_qfrency": formant_qfrency,
+        "formant_timbre": formant_timbre,
+        "sid": sid,
+        "retrieval_backend": retrieval_backend,
+        "synthesis_batch_size": synthesis_batch_size,
+        "whole_file_features": whole_file_features,
+        "cache_analysis": cache_analysis,
+        "concurrent_analysis": concurrent_analysis,
+        "f0_threads": f0_threads,
+        "f0_energy_gate": f0_energy_gate,
+        "f0_gate_threshold": f0_gate_threshold,
+        "f0_decimation": f0_decimation,
+    }
+    infer_pipeline = import_voice_converter()
+    output_paths = infer_pipeline.convert_sweep(
+        **kwargs,
+    )
+    return f"File {input_path} swept successfully.", output_paths
+
+
+# Fan-out
+def run_fanout_script(
+    pitch: int,
+    index_rate: float,
+    filter_radius: int,
+    volume_envelope: int,
+    protect: float,
+    hop_length: int,
+    f0_method: str,
+    input_path: str,
+    output_folder: str,
+    pth_paths: list,
+    index_paths: list,
+    split_audio: bool,
+    f0_autotune: bool,
+    f0_autotune_strength: float,
+    clean_audio: bool,
+    clean_strength: float,
+    export_format: str,
+    f0_file: str,
+    embedder_model: str,
+    embedder_model_custom: str = None,
+    embedder_models: list = None,
+    formant_shifting: bool = False,
+    formant_qfrency: float = 1.0,
+    formant_timbre: float = 1.0,
+    sid: int = 0,
+    retrieval_backend: str = "auto",
+    synthesis_batch_size: int = 1,
+    whole_file_features: bool = False,
+    cache_analysis: bool = False,
+    concurrent_analysis: bool = False,
+    f0_threads: int = 0,
+    f0_energy_gate: bool = False,
+    f0_gate_threshold: float = -50.0,
+    f0_decimation: int = 1,
+    max_cached_models: int = 4,
+):
+    if len(index_paths) != len(pth_paths):
+        raise ValueError("Provide one index path per model.")
+    if embedder_models and len(embedder_models) != len(pth_paths):
+        raise ValueError("Provide one embedder model per model.")
+    models = list(zip(pth_paths, index_paths))
+    if embedder_models:
+        models = [
+            (pth_path, index_path, model_embedder, embedder_model_custom)
+            for (pth_path, index_path), model_embedder in zip(models, embedder_models)
+        ]
+    kwargs = {
+        "audio_input_path": input_path,
+        "audio_output_path": output_folder,
+        "models": models,
+        "pitch": pitch,
+        "index_rate": index_rate,
+        "filter_radius": filter_radius,
+        "volume_envelope": volume_envelope,
+        "protect": protect,
+        "hop_length": hop_length,
+        "f0_method": f0_method,
+        "split_audio": split_audio,
+        "f0_autotune": f0_autotune,
+        "f0_autotune_strength": f0_autotune_strength,
+        "clean_audio": clean_audio,
+        "clean_strength": clean_strength,
+        "export_format": export_format,
+        "f0_file": f0_file,
+        "embedder_model": embedder_model,
+        "embedder_model_custom": embedder_model_custom,
+        "formant_shifting": formant_shifting,
+        "formant_qfrency": formant_qfrency,
+        "formant_timbre": formant_timbre,
+        "sid": sid,
+        "retrieval_backend": retrieval_backend,
+        "synthesis_batch_size": synthesis_batch_size,
+        "whole_file_features": whole_file_features,
+        "cache_analysis": cache_analysis,
+        "concurrent_analysis": concurrent_analysis,
+        "f0_threads": f0_threads,
+        "f0_energy_gate": f0_energy_gate,
+        "f0_gate_threshold": f0_gate_threshold,
+        "f0_decimation": f0_decimation,
+        "max_cached_models": max_cached_models,
+    }
+    infer_pipeline = import_voice_converter()
+    output_paths = infer_pipeline.convert_fanout(
+        **kwargs,
+    )
+    return f"File {input_path} converted with {len(models)} models.", output_paths
+
+
+# Stream
+def run_stream_script(
+    pitch: int,
+    index_rate: float,
+    protect: float,
+    hop_length: int,
+    f0_method: str,
+    filter_radius: int,
+    input_path: str,
+    output_path: str,
+    pth_path: str,
+    index_path: str,
+    f0_autotune: bool,
+    f0_autotune_strength: float,
+    clean_audio: bool,
+    clean_strength: float,
+    export_format: str,
+    embedder_model: str,
+    embedder_model_custom: str = None,
+    sid: int = 0,
+    retrieval_backend: str = "auto",
+    block_seconds: float = 0.25,
+    context_seconds: float = 1.0,
+    crossfade_seconds: float = 0.05,
+):
+    kwargs = {
+        "audio_input_path": input_path,
+        "audio_output_path": output_path,
+        "model_path": pth_path,
+        "index_path": index_path,
+        "pitch": pitch,
+        "index_rate": index_rate,
+        "protect": protect,
+        "hop_length": hop_length,
+        "f0_method": f0_method,
+        "filter_radius": filter_radius,
+        "f0_autotune": f0_autotune,
+        "f0_autotune_strength": f0_autotune_strength,
+        "clean_audio": clean_audio,
+        "clean_strength": clean_strength,
+        "export_format": export_format,
+        "embedder_model": embedder_model,
+        "embedder_model_custom": embedder_model_custom,
+        "sid": sid,
+        "retrieval_backend": retrieval_backend,
+        "block_seconds": block_seconds,
+        "context_seconds": context_seconds,
+        "crossfade_seconds": crossfade_seconds,
+    }
+    infer_pipeline = import_voice_converter()
+    stats = infer_pipeline.convert_stream(
+        **kwargs,
+    )
+    return f"File {input_path} streamed successfully.", stats
+
+
+# Index optimize
+def run_index_optimize_script(
+    index_path: str,
+    index_type: str,
+    nlist: int = None,
+    nprobe: int = 8,
+    hnsw_m: int = 32,
+    ef_construction: int = 200,
+    ef_search: int = 64,
+    pq_m: int = None,
+    pq_nbits: int = 8,
+    sample_size: int = 1000,
+):
+    from rvc_cli.rvc.lib.tools.index_optimizer import optimize_index
+
+    output_path, _ = optimize_index(
+        index_path=index_path,
+        index_type=index_type,
+        nlist=nlist,
+        nprobe=nprobe,
+        hnsw_m=hnsw_m,
+        ef_construction=ef_construction,
+        ef_search=ef_search,
+        pq_m=pq_m,
+        pq_nbits=pq_nbits,
+        sample_size=sample_size,
+    )
+    return f"Index {index_path} optimized successfully.", output_path
+
+
+# Benchmark
+def run_benchmark_script(suite: str):
+    from rvc_cli.rvc.lib.tools.benchmark import run_benchmark
+
+    run_benchmark(suite)
+    return f"Benchmark '{suite}' completed."
+
+
 # Download
 def run_download_script(model_link: str):
     model_download_pipeline(model_link)
@@ -397,13 +750,13 @@ def parse_arguments():
     infer_parser.add_argument(
         "--input_path",
         type=str,
-        help="Full path to the input audio file.",
+        help="Full path to the input audio file, or '-' to read raw or WAV PCM from stdin.",
         required=True,
     )
     infer_parser.add_argument(
         "--output_path",
         type=str,
-        help="Full path to the output audio file.",
+        help="Full path to the output audio file, or '-' to write PCM to stdout as it is converted.",
         required=True,
     )
     pth_path_description = "Full path to the RVC model file (.pth)."
@@ -454,10 +807,11 @@ def parse_arguments():
         choices=[(i / 10) for i in range(11)],
         default=0.7,
     )
-    export_format_description = "Select the desired output audio format."
+    export_format_description = "Select the desired output audio format, or several formats to encode from the same conversion."
     infer_parser.add_argument(
         "--export_format",
         type=str,
+        nargs="+",
         help=export_format_description,
         choices=["WAV", "MP3", "FLAC", "OGG", "M4A"],
         default="WAV",
@@ -856,6 +1210,156 @@ def parse_arguments():
         default=0.5,
         required=False,
     )
+    retrieval_backend_description = "Choose how the index is searched. 'torch' runs an exact search on the conversion device, 'faiss' uses the index as stored, and 'auto' picks 'torch' for indexes of up to 300k vectors that have no optimized copy."
+    infer_parser.add_argument(
+        "--retrieval_backend",
+        type=str,
+        help=retrieval_backend_description,
+        choices=["auto", "faiss", "torch"],
+        default="auto",
+        required=False,
+    )
+    synthesis_batch_size_description = "Maximum number of segments of a long input synthesized together in one batch. Higher values use more memory but keep more cores busy."
+    infer_parser.add_argument(
+        "--synthesis_batch_size",
+        type=int,
+        help=synthesis_batch_size_description,
+        default=1,
+        required=False,
+    )
+    whole_file_features_description = "Extract the speech features of each input once, in overlapping windows, instead of once per segment. Saves embedder time on long inputs, and searches the index once per frame rather than again for the padding shared by neighbouring segments."
+    infer_parser.add_argument(
+        "--whole_file_features",
+        type=lambda x: bool(strtobool(x)),
+        choices=[True, False],
+        help=whole_file_features_description,
+        default=False,
+    )
+    cache_analysis_description = "Store the decoded audio, pitch and speech features of each input in logs/analysis_cache and reuse them when the same input is converted again with other settings. Disabled by default."
+    infer_parser.add_argument(
+        "--cache_analysis",
+        type=lambda x: bool(strtobool(x)),
+        choices=[True, False],
+        help=cache_analysis_description,
+        default=False,
+    )
+    concurrent_analysis_description = "Run pitch extraction and speech feature extraction in parallel workers, each requesting its own share of the CPU threads. The split is best-effort, as torch shares one thread count across the process; the count is restored once both workers finish."
+    f0_threads_description = "Number of CPU threads requested for pitch extraction when --concurrent_analysis is enabled, the rest going to feature extraction (best-effort). 0 splits them evenly."
+    infer_parser.add_argument(
+        "--concurrent_analysis",
+        type=lambda x: bool(strtobool(x)),
+        choices=[True, False],
+        help=concurrent_analysis_description,
+        default=False,
+    )
+    infer_parser.add_argument(
+        "--f0_threads",
+        type=int,
+        help=f0_threads_description,
+        default=0,
+    )
+    f0_energy_gate_description = "Skip pitch extraction on silent parts of the input, running the pitch extractor only on the spans louder than --f0_gate_threshold and leaving the rest unvoiced."
+    f0_gate_threshold_description = "RMS level in dBFS below which frames are treated as silent by --f0_energy_gate."
+    infer_parser.add_argument(
+        "--f0_energy_gate",
+        type=lambda x: bool(strtobool(x)),
+        choices=[True, False],
+        help=f0_energy_gate_description,
+        default=False,
+    )
+    infer_parser.add_argument(
+        "--f0_gate_threshold",
+        type=float,
+        help=f0_gate_threshold_description,
+        default=-50.0,
+    )
+    f0_decimation_description = "Run crepe and FCPE at 1/2 or 1/4 of their frame rate and interpolate the pitch back to full rate, trading some pitch accuracy for speed."
+    infer_parser.add_argument(
+        "--f0_decimation",
+        type=int,
+        choices=[1, 2, 4],
+        help=f0_decimation_description,
+        default=1,
+    )
+    rmvpe_chunk_seconds_description = "Run RMVPE on inputs longer than this many seconds in overlapping windows of that length, so its memory use does not grow with the input length. The pitch near window edges can differ slightly from a whole-input run. 0 processes every input whole (default)."
+    rmvpe_chunk_workers_description = "Number of RMVPE windows processed concurrently when --rmvpe_chunk_seconds is set."
+    infer_parser.add_argument(
+        "--rmvpe_chunk_seconds",
+        type=float,
+        help=rmvpe_chunk_seconds_description,
+        default=0,
+    )
+    infer_parser.add_argument(
+        "--rmvpe_chunk_workers",
+        type=int,
+        help=rmvpe_chunk_workers_description,
+        default=1,
+    )
+    index_cache_mb_description = "Memory budget in MB of the loaded FAISS indexes kept for reuse across the conversions of a run. Vectors served from a memory-mapped sidecar do not count against it."
+    infer_parser.add_argument(
+        "--index_cache_mb",
+        type=float,
+        help=index_cache_mb_description,
+        default=2048,
+    )
+    infer_parser.add_argument(
+        "--pipe_sample_format",
+        type=str,
+        choices=["s16le", "s32le", "f32le"],
+        help="Sample format of raw PCM read from stdin and of the PCM written to stdout. WAV input is recognized by its header and uses its own format.",
+        default="s16le",
+    )
+    infer_parser.add_argument(
+        "--pipe_sample_rate",
+        type=int,
+        help="Sampling rate of raw PCM read from stdin.",
+        default=16000,
+    )
+    infer_parser.add_argument(
+        "--pipe_channels",
+        type=int,
+        help="Number of channels of raw PCM read from stdin. They are mixed down to mono.",
+        default=1,
+    )
+    infer_parser.add_argument(
+        "--pipe_wav_header",
+        type=lambda x: bool(strtobool(x)),
+        choices=[True, False],
+        help="Start the PCM written to stdout with a WAV header.",
+        default=False,
+    )
+    infer_parser.add_argument(
+        "--pipe_output_sample_rate",
+        type=int,
+        help="Sampling rate of the PCM written to stdout, 0 to keep the model's.",
+        default=0,
+    )
+    infer_parser.add_argument(
+        "--pipe_block_seconds",
+        type=float,
+        help="Length of the blocks converted at a time when reading from stdin or writing to stdout, in seconds. Output starts after the first block.",
+        default=1.0,
+    )
+    constant_memory_description = "Convert the input one window at a time, decoding, converting and writing each window before the next, so memory use does not grow with the input length. Progress is checkpointed next to the output, and an interrupted conversion resumes where it stopped when run again with the same settings."
+    infer_parser.add_argument(
+        "--constant_memory",
+        type=lambda x: bool(strtobool(x)),
+        choices=[True, False],
+        help=constant_memory_description,
+        default=False,
+    )
+    infer_parser.add_argument(
+        "--start",
+        type=float,
+        help="Start in seconds of the range of the input to convert. Only the range and the context around it are converted, at the gain of a full conversion, and the output is aligned to the sample so it can replace the same range of a full conversion.",
+        default=None,
+    )
+    infer_parser.add_argument(
+        "--end",
+        type=float,
+        help="End in seconds of the range of the input to convert (default is the end of the input).",
+        default=None,
+    )
 
     # Parser for 'batch_infer' mode
     batch_infer_parser = subparsers.add_parser(
@@ -976,6 +1480,7 @@ def parse_arguments():
     batch_infer_parser.add_argument(
         "--export_format",
         type=str,
+        nargs="+",
         help=export_format_description,
         choices=["WAV", "MP3", "FLAC", "OGG", "M4A"],
         default="WAV",
@@ -1326,11 +1831,845 @@ def parse_arguments():
         default=0.5,
         required=False,
     )
-
-
-    # Parser for 'download' mode
-    download_parser = subparsers.add_parser(
-        "download", help="Download a model from a provided link."
+    batch_infer_parser.add_argument(
+        "--retrieval_backend",
+        type=str,
+        help=retrieval_backend_description,
+        choices=["auto", "faiss", "torch"],
+        default="auto",
+        required=False,
+    )
+    batch_infer_parser.add_argument(
+        "--synthesis_batch_size",
+        type=int,
+        help=synthesis_batch_size_description,
+        default=1,
+        required=False,
+    )
+    batch_infer_parser.add_argument(
+        "--whole_file_features",
+        type=lambda x: bool(strtobool(x)),
+        choices=[True, False],
+        help=whole_file_features_description,
+        default=False,
+    )
+    batch_infer_parser.add_argument(
+        "--cache_analysis",
+        type=lambda x: bool(strtobool(x)),
+        choices=[True, False],
+        help=cache_analysis_description,
+        default=False,
+    )
+    batch_infer_parser.add_argument(
+        "--concurrent_analysis",
+        type=lambda x: bool(strtobool(x)),
+        choices=[True, False],
+        help=concurrent_analysis_description,
+        default=False,
+    )
+    batch_infer_parser.add_argument(
+        "--f0_threads",
+        type=int,
+        help=f0_threads_description,
+        default=0,
+    )
+    batch_infer_parser.add_argument(
+        "--f0_energy_gate",
+        type=lambda x: bool(strtobool(x)),
+        choices=[True, False],
+        help=f0_energy_gate_description,
+        default=False,
+    )
+    batch_infer_parser.add_argument(
+        "--f0_gate_threshold",
+        type=float,
+        help=f0_gate_threshold_description,
+        default=-50.0,
+    )
+    batch_infer_parser.add_argument(
+        "--f0_decimation",
+        type=int,
+        choices=[1, 2, 4],
+        help=f0_decimation_description,
+        default=1,
+    )
+    batch_infer_parser.add_argument(
+        "--rmvpe_chunk_seconds",
+        type=float,
+        help=rmvpe_chunk_seconds_description,
+        default=0,
+    )
+    batch_infer_parser.add_argument(
+        "--rmvpe_chunk_workers",
+        type=int,
+        help=rmvpe_chunk_workers_description,
+        default=1,
+    )
+    batch_infer_parser.add_argument(
+        "--index_cache_mb",
+        type=float,
+        help=index_cache_mb_description,
+        default=2048,
+    )
+
+
+    # Parser for 'sweep' mode
+    sweep_parser = subparsers.add_parser(
+        "sweep",
+        help="Render every combination of pitch, index rate and protection settings of one input, analyzing it only once.",
+    )
+    sweep_parser.add_argument(
+        "--pitches",
+        type=int,
+        nargs="+",
+        help="Pitch values to render. " + pitch_description,
+        default=[0],
+    )
+    sweep_parser.add_argument(
+        "--index_rates",
+        type=float,
+        nargs="+",
+        help="Index rates to render. " + index_rate_description,
+        default=[0.3],
+    )
+    sweep_parser.add_argument(
+        "--protects",
+        type=float,
+        nargs="+",
+        help="Protection values to render. " + protect_description,
+        default=[0.33],
+    )
+    sweep_parser.add_argument(
+        "--filter_radius",
+        type=int,
+        help=filter_radius_description,
+        choices=range(11),
+        default=3,
+    )
+    sweep_parser.add_argument(
+        "--volume_envelope",
+        type=float,
+        help=volume_envelope_description,
+        default=1,
+    )
+    sweep_parser.add_argument(
+        "--hop_length",
+        type=int,
+        help=hop_length_description,
+        choices=range(1, 513),
+        default=128,
+    )
+    sweep_parser.add_argument(
+        "--f0_method",
+        type=str,
+        help=f0_method_description,
+        choices=[
+            "crepe",
+            "crepe-tiny",
+            "rmvpe",
+            "fcpe",
+            "hybrid[crepe+rmvpe]",
+            "hybrid[crepe+fcpe]",
+            "hybrid[rmvpe+fcpe]",
+            "hybrid[crepe+rmvpe+fcpe]",
+        ],
+        default="rmvpe",
+    )
+    sweep_parser.add_argument(
+        "--input_path",
+        type=str,
+        help="Full path to the input audio file.",
+        required=True,
+    )
+    sweep_parser.add_argument(
+        "--output_folder",
+        type=str,
+        help="Folder the rendered files are written to, one per combination of settings.",
+        required=True,
+    )
+    sweep_parser.add_argument(
+        "--pth_path", type=str, help=pth_path_description, required=True
+    )
+    sweep_parser.add_argument(
+        "--index_path", type=str, help=index_path_description, required=True
+    )
+    sweep_parser.add_argument(
+        "--split_audio",
+        type=lambda x: bool(strtobool(x)),
+        choices=[True, False],
+        help=split_audio_description,
+        default=False,
+    )
+    sweep_parser.add_argument(
+        "--f0_autotune",
+        type=lambda x: bool(strtobool(x)),
+        choices=[True, False],
+        help=f0_autotune_description,
+        default=False,
+    )
+    sweep_parser.add_argument(
+        "--f0_autotune_strength",
+        type=float,
+        help=f0_autotune_strength_description,
+        default=1.0,
+    )
+    sweep_parser.add_argument(
+        "--clean_audio",
+        type=lambda x: bool(strtobool(x)),
+        choices=[True, False],
+        help=clean_audio_description,
+        default=False,
+    )
+    sweep_parser.add_argument(
+        "--clean_strength",
+        type=float,
+        help=clean_strength_description,
+        choices=[(i / 10) for i in range(11)],
+        default=0.7,
+    )
+    sweep_parser.add_argument(
+        "--export_format",
+        type=str,
+        nargs="+",
+        help=export_format_description,
+        choices=["WAV", "MP3", "FLAC", "OGG", "M4A"],
+        default="WAV",
+    )
+    sweep_parser.add_argument(
+        "--embedder_model",
+        type=str,
+        help=embedder_model_description,
+        choices=[
+            "contentvec",
+            "chinese-hubert-base",
+            "japanese-hubert-base",
+            "korean-hubert-base",
+            "custom",
+        ],
+        default="contentvec",
+    )
+    sweep_parser.add_argument(
+        "--embedder_model_custom",
+        type=str,
+        help=embedder_model_custom_description,
+        default=None,
+    )
+    sweep_parser.add_argument(
+        "--f0_file",
+        type=str,
+        help=f0_file_description,
+        default=None,
+    )
+    sweep_parser.add_argument(
+        "--formant_shifting",
+        type=lambda x: bool(strtobool(x)),
+        choices=[True, False],
+        help=formant_shifting_description,
+        default=False,
+        required=False,
+    )
+    sweep_parser.add_argument(
+        "--formant_qfrency",
+        type=float,
+        help=formant_qfrency_description,
+        default=1.0,
+        required=False,
+    )
+    sweep_parser.add_argument(
+        "--formant_timbre",
+        type=float,
+        help=formant_timbre_description,
+        default=1.0,
+        required=False,
+    )
+    sweep_parser.add_argument(
+        "--sid",
+        type=int,
+        help=sid_description,
+        default=0,
+    )
+    sweep_parser.add_argument(
+        "--retrieval_backend",
+        type=str,
+        help=retrieval_backend_description,
+        choices=["auto", "faiss", "torch"],
+        default="auto",
+        required=False,
+    )
+    sweep_parser.add_argument(
+        "--synthesis_batch_size",
+        type=int,
+        help=synthesis_batch_size_description,
+        default=1,
+        required=False,
+    )
+    sweep_parser.add_argument(
+        "--whole_file_features",
+        type=lambda x: bool(strtobool(x)),
+        choices=[True, False],
+        help=whole_file_features_description,
+        default=False,
+    )
+    sweep_parser.add_argument(
+        "--cache_analysis",
+        type=lambda x: bool(strtobool(x)),
+        choices=[True, False],
+        help=cache_analysis_description,
+        default=False,
+    )
+    sweep_parser.add_argument(
+        "--concurrent_analysis",
+        type=lambda x: bool(strtobool(x)),
+        choices=[True, False],
+        help=concurrent_analysis_description,
+        default=False,
+    )
+    sweep_parser.add_argument(
+        "--f0_threads",
+        type=int,
+        help=f0_threads_description,
+        default=0,
+    )
+    sweep_parser.add_argument(
+        "--f0_energy_gate",
+        type=lambda x: bool(strtobool(x)),
+        choices=[True, False],
+        help=f0_energy_gate_description,
+        default=False,
+    )
+    sweep_parser.add_argument(
+        "--f0_gate_threshold",
+        type=float,
+        help=f0_gate_threshold_description,
+        default=-50.0,
+    )
+    sweep_parser.add_argument(
+        "--f0_decimation",
+        type=int,
+        choices=[1, 2, 4],
+        help=f0_decimation_description,
+        default=1,
+    )
+
+    # Parser for 'fanout' mode
+    fanout_parser = subparsers.add_parser(
+        "fanout",
+        help="Convert one input with several voice models, analyzing it only once per embedder model.",
+    )
+    fanout_parser.add_argument(
+        "--pitch",
+        type=int,
+        help=pitch_description,
+        choices=range(-24, 25),
+        default=0,
+    )
+    fanout_parser.add_argument(
+        "--index_rate",
+        type=float,
+        help=index_rate_description,
+        choices=[i / 100.0 for i in range(0, 101)],
+        default=0.3,
+    )
+    fanout_parser.add_argument(
+        "--protect",
+        type=float,
+        help=protect_description,
+        choices=[i / 1000.0 for i in range(0, 501)],
+        default=0.33,
+    )
+    fanout_parser.add_argument(
+        "--filter_radius",
+        type=int,
+        help=filter_radius_description,
+        choices=range(11),
+        default=3,
+    )
+    fanout_parser.add_argument(
+        "--volume_envelope",
+        type=float,
+        help=volume_envelope_description,
+        default=1,
+    )
+    fanout_parser.add_argument(
+        "--hop_length",
+        type=int,
+        help=hop_length_description,
+        choices=range(1, 513),
+        default=128,
+    )
+    fanout_parser.add_argument(
+        "--f0_method",
+        type=str,
+        help=f0_method_description,
+        choices=[
+            "crepe",
+            "crepe-tiny",
+            "rmvpe",
+            "fcpe",
+            "hybrid[crepe+rmvpe]",
+            "hybrid[crepe+fcpe]",
+            "hybrid[rmvpe+fcpe]",
+            "hybrid[crepe+rmvpe+fcpe]",
+        ],
+        default="rmvpe",
+    )
+    fanout_parser.add_argument(
+        "--input_path",
+        type=str,
+        help="Full path to the input audio file.",
+        required=True,
+    )
+    fanout_parser.add_argument(
+        "--output_folder",
+        type=str,
+        help="Folder the converted files are written to, one per model.",
+        required=True,
+    )
+    fanout_parser.add_argument(
+        "--pth_paths",
+        type=str,
+        nargs="+",
+        help="Full paths to the RVC model files (.pth).",
+        required=True,
+    )
+    fanout_parser.add_argument(
+        "--index_paths",
+        type=str,
+        nargs="+",
+        help="Full paths to the index files (.index), one per model. Pass an empty string for models without an index.",
+        required=True,
+    )
+    fanout_parser.add_argument(
+        "--split_audio",
+        type=lambda x: bool(strtobool(x)),
+        choices=[True, False],
+        help=split_audio_description,
+        default=False,
+    )
+    fanout_parser.add_argument(
+        "--f0_autotune",
+        type=lambda x: bool(strtobool(x)),
+        choices=[True, False],
+        help=f0_autotune_description,
+        default=False,
+    )
+    fanout_parser.add_argument(
+        "--f0_autotune_strength",
+        type=float,
+        help=f0_autotune_strength_description,
+        default=1.0,
+    )
+    fanout_parser.add_argument(
+        "--clean_audio",
+        type=lambda x: bool(strtobool(x)),
+        choices=[True, False],
+        help=clean_audio_description,
+        default=False,
+    )
+    fanout_parser.add_argument(
+        "--clean_strength",
+        type=float,
+        help=clean_strength_description,
+        choices=[(i / 10) for i in range(11)],
+        default=0.7,
+    )
+    fanout_parser.add_argument(
+        "--export_format",
+        type=str,
+        nargs="+",
+        help=export_format_description,
+        choices=["WAV", "MP3", "FLAC", "OGG", "M4A"],
+        default="WAV",
+    )
+    fanout_parser.add_argument(
+        "--embedder_model",
+        type=str,
+        help=embedder_model_description,
+        choices=[
+            "contentvec",
+            "chinese-hubert-base",
+            "japanese-hubert-base",
+            "korean-hubert-base",
+            "custom",
+        ],
+        default="contentvec",
+    )
+    fanout_parser.add_argument(
+        "--embedder_model_custom",
+        type=str,
+        help=embedder_model_custom_description,
+        default=None,
+    )
+    fanout_parser.add_argument(
+        "--embedder_models",
+        type=str,
+        nargs="+",
+        help="Embedder model of each model, when they differ. Models sharing an embedder share one analysis of the input.",
+        choices=[
+            "contentvec",
+            "chinese-hubert-base",
+            "japanese-hubert-base",
+            "korean-hubert-base",
+            "custom",
+        ],
+        default=None,
+    )
+    fanout_parser.add_argument(
+        "--f0_file",
+        type=str,
+        help=f0_file_description,
+        default=None,
+    )
+    fanout_parser.add_argument(
+        "--formant_shifting",
+        type=lambda x: bool(strtobool(x)),
+        choices=[True, False],
+        help=formant_shifting_description,
+        default=False,
+        required=False,
+    )
+    fanout_parser.add_argument(
+        "--formant_qfrency",
+        type=float,
+        help=formant_qfrency_description,
+        default=1.0,
+        required=False,
+    )
+    fanout_parser.add_argument(
+        "--formant_timbre",
+        type=float,
+        help=formant_timbre_description,
+        default=1.0,
+        required=False,
+    )
+    fanout_parser.add_argument(
+        "--sid",
+        type=int,
+        help=sid_description,
+        default=0,
+    )
+    fanout_parser.add_argument(
+        "--retrieval_backend",
+        type=str,
+        help=retrieval_backend_description,
+        choices=["auto", "faiss", "torch"],
+        default="auto",
+        required=False,
+    )
+    fanout_parser.add_argument(
+        "--synthesis_batch_size",
+        type=int,
+        help=synthesis_batch_size_description,
+        default=1,
+        required=False,
+    )
+    fanout_parser.add_argument(
+        "--whole_file_features",
+        type=lambda x: bool(strtobool(x)),
+        choices=[True, False],
+        help=whole_file_features_description,
+        default=False,
+    )
+    fanout_parser.add_argument(
+        "--cache_analysis",
+        type=lambda x: bool(strtobool(x)),
+        choices=[True, False],
+        help=cache_analysis_description,
+        default=False,
+    )
+    fanout_parser.add_argument(
+        "--concurrent_analysis",
+        type=lambda x: bool(strtobool(x)),
+        choices=[True, False],
+        help=concurrent_analysis_description,
+        default=False,
+    )
+    fanout_parser.add_argument(
+        "--f0_threads",
+        type=int,
+        help=f0_threads_description,
+        default=0,
+    )
+    fanout_parser.add_argument(
+        "--f0_energy_gate",
+        type=lambda x: bool(strtobool(x)),
+        choices=[True, False],
+        help=f0_energy_gate_description,
+        default=False,
+    )
+    fanout_parser.add_argument(
+        "--f0_gate_threshold",
+        type=float,
+        help=f0_gate_threshold_description,
+        default=-50.0,
+    )
+    fanout_parser.add_argument(
+        "--f0_decimation",
+        type=int,
+        choices=[1, 2, 4],
+        help=f0_decimation_description,
+        default=1,
+    )
+    fanout_parser.add_argument(
+        "--max_cached_models",
+        type=int,
+        help="Number of loaded voice models kept in memory (on the GPU when one is used) during the conversion, so switching between them does not reload them. They are released when the conversion ends. 0 disables the cache.",
+        default=4,
+    )
+
+    # Parser for 'stream' mode
+    stream_parser = subparsers.add_parser(
+        "stream",
+        help="Convert an input block by block with the low-latency streaming engine, as live input would arrive, and report latency and per-block compute times.",
+    )
+    stream_parser.add_argument(
+        "--pitch",
+        type=int,
+        help=pitch_description,
+        choices=range(-24, 25),
+        default=0,
+    )
+    stream_parser.add_argument(
+        "--index_rate",
+        type=float,
+        help=index_rate_description,
+        choices=[i / 100.0 for i in range(0, 101)],
+        default=0.3,
+    )
+    stream_parser.add_argument(
+        "--protect",
+        type=float,
+        help=protect_description,
+        choices=[i / 1000.0 for i in range(0, 501)],
+        default=0.33,
+    )
+    stream_parser.add_argument(
+        "--hop_length",
+        type=int,
+        help=hop_length_description,
+        choices=range(1, 513),
+        default=128,
+    )
+    stream_parser.add_argument(
+        "--f0_method",
+        type=str,
+        help=f0_method_description,
+        choices=[
+            "crepe",
+            "crepe-tiny",
+            "rmvpe",
+            "fcpe",
+            "hybrid[crepe+rmvpe]",
+            "hybrid[crepe+fcpe]",
+            "hybrid[rmvpe+fcpe]",
+            "hybrid[crepe+rmvpe+fcpe]",
+        ],
+        default="rmvpe",
+    )
+    stream_parser.add_argument(
+        "--filter_radius",
+        type=int,
+        help=filter_radius_description,
+        choices=range(11),
+        default=3,
+    )
+    stream_parser.add_argument(
+        "--input_path",
+        type=str,
+        help="Full path to the input audio file.",
+        required=True,
+    )
+    stream_parser.add_argument(
+        "--output_path",
+        type=str,
+        help="Full path to the output audio file.",
+        required=True,
+    )
+    stream_parser.add_argument(
+        "--pth_path", type=str, help=pth_path_description, required=True
+    )
+    stream_parser.add_argument(
+        "--index_path", type=str, help=index_path_description, required=True
+    )
+    stream_parser.add_argument(
+        "--f0_autotune",
+        type=lambda x: bool(strtobool(x)),
+        choices=[True, False],
+        help=f0_autotune_description,
+        default=False,
+    )
+    stream_parser.add_argument(
+        "--f0_autotune_strength",
+        type=float,
+        help=f0_autotune_strength_description,
+        default=1.0,
+    )
+    stream_parser.add_argument(
+        "--clean_audio",
+        type=lambda x: bool(strtobool(x)),
+        choices=[True, False],
+        help=clean_audio_description,
+        default=False,
+    )
+    stream_parser.add_argument(
+        "--clean_strength",
+        type=float,
+        help=clean_strength_description,
+        choices=[(i / 10) for i in range(11)],
+        default=0.7,
+    )
+    stream_parser.add_argument(
+        "--export_format",
+        type=str,
+        nargs="+",
+        help=export_format_description,
+        choices=["WAV", "MP3", "FLAC", "OGG", "M4A"],
+        default="WAV",
+    )
+    stream_parser.add_argument(
+        "--embedder_model",
+        type=str,
+        help=embedder_model_description,
+        choices=[
+            "contentvec",
+            "chinese-hubert-base",
+            "japanese-hubert-base",
+            "korean-hubert-base",
+            "custom",
+        ],
+        default="contentvec",
+    )
+    stream_parser.add_argument(
+        "--embedder_model_custom",
+        type=str,
+        help=embedder_model_custom_description,
+        default=None,
+    )
+    stream_parser.add_argument(
+        "--sid",
+        type=int,
+        help=sid_description,
+        default=0,
+    )
+    stream_parser.add_argument(
+        "--retrieval_backend",
+        type=str,
+        help=retrieval_backend_description,
+        choices=["auto", "faiss", "torch"],
+        default="auto",
+        required=False,
+    )
+    stream_parser.add_argument(
+        "--block_seconds",
+        type=float,
+        help="Length of the input blocks in seconds, rounded up to 20 ms. Shorter blocks lower the latency but cost more compute per second of audio.",
+        default=0.25,
+    )
+    stream_parser.add_argument(
+        "--context_seconds",
+        type=float,
+        help="Length of past input analysed together with each block, in seconds. Longer contexts improve quality at the cost of compute per block.",
+        default=1.0,
+    )
+    stream_parser.add_argument(
+        "--crossfade_seconds",
+        type=float,
+        help="Length of the crossfade between consecutive output blocks, in seconds. It adds to the latency.",
+        default=0.05,
+    )
+
+    # Parser for 'index' mode
+    index_parser = subparsers.add_parser("index", help="Manage index files.")
+    index_subparsers = index_parser.add_subparsers(
+        title="index commands", dest="index_mode", help="Choose an index command"
+    )
+    index_optimize_parser = index_subparsers.add_parser(
+        "optimize",
+        help="Rebuild a flat index as IVF-Flat, HNSW, fp16 or PQ and report recall, latency and size.",
+    )
+    index_optimize_parser.add_argument(
+        "--index_path", type=str, help=index_path_description, required=True
+    )
+    index_optimize_parser.add_argument(
+        "--index_type",
+        type=str,
+        help="Type of the optimized index. 'fp16' and 'pq' compress the index and store the blended vectors as float16.",
+        choices=["ivf", "hnsw", "fp16", "pq"],
+        default="ivf",
+    )
+    index_optimize_parser.add_argument(
+        "--nlist",
+        type=int,
+        help="Number of IVF inverted lists. Defaults to 4 * sqrt(number of vectors).",
+        default=None,
+    )
+    index_optimize_parser.add_argument(
+        "--nprobe",
+        type=int,
+        help="Number of IVF lists visited per search. Higher values improve recall but slow down the search.",
+        default=8,
+    )
+    index_optimize_parser.add_argument(
+        "--hnsw_m",
+        type=int,
+        help="Number of neighbours per HNSW graph node.",
+        default=32,
+    )
+    index_optimize_parser.add_argument(
+        "--ef_construction",
+        type=int,
+        help="HNSW candidate list size while building the graph.",
+        default=200,
+    )
+    index_optimize_parser.add_argument(
+        "--ef_search",
+        type=int,
+        help="HNSW candidate list size while searching. Higher values improve recall but slow down the search.",
+        default=64,
+    )
+    index_optimize_parser.add_argument(
+        "--pq_m",
+        type=int,
+        help="Number of PQ sub-quantizers. Must divide the vector dimension. Defaults to dimension / 8.",
+        default=None,
+    )
+    index_optimize_parser.add_argument(
+        "--pq_nbits",
+        type=int,
+        help="Bits per PQ sub-quantizer code.",
+        default=8,
+    )
+    index_optimize_parser.add_argument(
+        "--sample_size",
+        type=int,
+        help="Number of stored vectors used as queries to measure recall@8.",
+        default=1000,
+    )
+
+    # Parser for 'benchmark' mode
+    benchmark_parser = subparsers.add_parser(
+        "benchmark", help="Run performance benchmarks on synthetic data."
+    )
+    benchmark_parser.add_argument(
+        "--suite",
+        type=str,
+        help="Name of the benchmark suite to run.",
+        choices=[
+            "retrieval",
+            "synthesis",
+            "segmentation",
+            "f0_postprocess",
+            "rmvpe",
+            "f0_gate",
+            "f0_decimation",
+            "f0_methods",
+        ],
+        required=True,
+    )
+
+    # Parser for 'download' mode
+    download_parser = subparsers.add_parser(
+        "download", help="Download a model from a provided link."
     )
     download_parser.add_argument(
         "--model_link", type=str, help="Direct link to the model file.", required=True
@@ -1429,6 +2768,27 @@ def main():
                 delay_seconds=args.delay_seconds,
                 delay_feedback=args.delay_feedback,
                 delay_mix=args.delay_mix,
+                retrieval_backend=args.retrieval_backend,
+                synthesis_batch_size=args.synthesis_batch_size,
+                whole_file_features=args.whole_file_features,
+                cache_analysis=args.cache_analysis,
+                concurrent_analysis=args.concurrent_analysis,
+                f0_threads=args.f0_threads,
+                f0_energy_gate=args.f0_energy_gate,
+                f0_gate_threshold=args.f0_gate_threshold,
+                f0_decimation=args.f0_decimation,
+                rmvpe_chunk_seconds=args.rmvpe_chunk_seconds,
+                rmvpe_chunk_workers=args.rmvpe_chunk_workers,
+                index_cache_mb=args.index_cache_mb,
+                pipe_sample_format=args.pipe_sample_format,
+                pipe_sample_rate=args.pipe_sample_rate,
+                pipe_channels=args.pipe_channels,
+                pipe_wav_header=args.pipe_wav_header,
+                pipe_output_sample_rate=args.pipe_output_sample_rate,
+                pipe_block_seconds=args.pipe_block_seconds,
+                constant_memory=args.constant_memory,
+                start=args.start,
+                end=args.end,
             )
         elif args.mode == "batch_infer":
             run_batch_infer_script(
@@ -1492,8 +2852,119 @@ def main():
                 delay_seconds=args.delay_seconds,
                 delay_feedback=args.delay_feedback,
                 delay_mix=args.delay_mix,
+                retrieval_backend=args.retrieval_backend,
+                synthesis_batch_size=args.synthesis_batch_size,
+                whole_file_features=args.whole_file_features,
+                cache_analysis=args.cache_analysis,
+                concurrent_analysis=args.concurrent_analysis,
+                f0_threads=args.f0_threads,
+                f0_energy_gate=args.f0_energy_gate,
+                f0_gate_threshold=args.f0_gate_threshold,
+                f0_decimation=args.f0_decimation,
+                rmvpe_chunk_seconds=args.rmvpe_chunk_seconds,
+                rmvpe_chunk_workers=args.rmvpe_chunk_workers,
+                index_cache_mb=args.index_cache_mb,
             )
 
+        elif args.mode == "sweep":
+            run_sweep_script(
+                pitches=args.pitches,
+                index_rates=args.index_rates,
+                protects=args.protects,
+                filter_radius=args.filter_radius,
+                volume_envelope=args.volume_envelope,
+                hop_length=args.hop_length,
+                f0_method=args.f0_method,
+                input_path=args.input_path,
+                output_folder=args.output_folder,
+                pth_path=args.pth_path,
+                index_path=args.index_path,
+                split_audio=args.split_audio,
+                f0_autotune=args.f0_autotune,
+                f0_autotune_strength=args.f0_autotune_strength,
+                clean_audio=args.clean_audio,
+                clean_strength=args.clean_strength,
+                export_format=args.export_format,
+                f0_file=args.f0_file,
+                embedder_model=args.embedder_model,
+                embedder_model_custom=args.embedder_model_custom,
+                formant_shifting=args.formant_shifting,
+                formant_qfrency=args.formant_qfrency,
+                formant_timbre=args.formant_timbre,
+                sid=args.sid,
+                retrieval_backend=args.retrieval_backend,
+                synthesis_batch_size=args.synthesis_batch_size,
+                whole_file_features=args.whole_file_features,
+                cache_analysis=args.cache_analysis,
+                concurrent_analysis=args.concurrent_analysis,
+                f0_threads=args.f0_threads,
+                f0_energy_gate=args.f0_energy_gate,
+                f0_gate_threshold=args.f0_gate_threshold,
+                f0_decimation=args.f0_decimation,
+            )
+        elif args.mode == "fanout":
+            run_fanout_script(
+                pitch=args.pitch,
+                index_rate=args.index_rate,
+                filter_radius=args.filter_radius,
+                volume_envelope=args.volume_envelope,
+                protect=args.protect,
+                hop_length=args.hop_length,
+                f0_method=args.f0_method,
+                input_path=args.input_path,
+                output_folder=args.output_folder,
+                pth_paths=args.pth_paths,
+                index_paths=args.index_paths,
+                split_audio=args.split_audio,
+                f0_autotune=args.f0_autotune,
+                f0_autotune_strength=args.f0_autotune_strength,
+                clean_audio=args.clean_audio,
+                clean_strength=args.clean_strength,
+                export_format=args.export_format,
+                f0_file=args.f0_file,
+                embedder_model=args.embedder_model,
+                embedder_model_custom=args.embedder_model_custom,
+                embedder_models=args.embedder_models,
+                formant_shifting=args.formant_shifting,
+                formant_qfrency=args.formant_qfrency,
+                formant_timbre=args.formant_timbre,
+                sid=args.sid,
+                retrieval_backend=args.retrieval_backend,
+                synthesis_batch_size=args.synthesis_batch_size,
+                whole_file_features=args.whole_file_features,
+                cache_analysis=args.cache_analysis,
+                concurrent_analysis=args.concurrent_analysis,
+                f0_threads=args.f0_threads,
+                f0_energy_gate=args.f0_energy_gate,
+                f0_gate_threshold=args.f0_gate_threshold,
+                f0_decimation=args.f0_decimation,
+                max_cached_models=args.max_cached_models,
+            )
+        elif args.mode == "stream":
+            run_stream_script(
+                pitch=args.pitch,
+                index_rate=args.index_rate,
+                protect=args.protect,
+                hop_length=args.hop_length,
+                f0_method=args.f0_method,
+                filter_radius=args.filter_radius,
+                input_path=args.input_path,
+                output_path=args.output_path,
+                pth_path=args.pth_path,
+                index_path=args.index_path,
+                f0_autotune=args.f0_autotune,
+                f0_autotune_strength=args.f0_autotune_strength,
+                clean_audio=args.clean_audio,
+                clean_strength=args.clean_strength,
+                export_format=args.export_format,
+                embedder_model=args.embedder_model,
+                embedder_model_custom=args.embedder_model_custom,
+                sid=args.sid,
+                retrieval_backend=args.retrieval_backend,
+                block_seconds=args.block_seconds,
+                context_seconds=args.context_seconds,
+                crossfade_seconds=args.crossfade_seconds,
+            )
         elif args.mode == "prerequisites":
             run_prerequisites_script(
                 pretraineds_v1_f0=args.pretraineds_v1_f0,
@@ -1503,6 +2974,24 @@ def main():
                 models=args.models,
                 exe=args.exe,
             )
+        elif args.mode == "index":
+            if args.index_mode == "optimize":
+                run_index_optimize_script(
+                    index_path=args.index_path,
+                    index_type=args.index_type,
+                    nlist=args.nlist,
+                    nprobe=args.nprobe,
+                    hnsw_m=args.hnsw_m,
+                    ef_construction=args.ef_construction,
+                    ef_search=args.ef_search,
+                    pq_m=args.pq_m,
+                    pq_nbits=args.pq_nbits,
+                    sample_size=args.sample_size,
+                )
+        elif args.mode == "benchmark":
+            run_benchmark_script(
+                suite=args.suite,
+            )
         elif args.mode == "download":
             run_download_script(
                 model_link=args.model_link,
@@ -38,6 +38,11 @@ class Config:
         self.json_config = self.load_config_json()
         self.gpu_mem = None
         self.x_pad, self.x_query, self.x_center, self.x_max = self.device_config()
+        # RMVPE processes longer inputs in overlapping windows of this many seconds (0 disables)
+        self.rmvpe_chunk_seconds = 0
+        self.rmvpe_chunk_workers = 1
+        # Memory budget of the process-wide FAISS index cache, in MB
+        self.index_cache_mb = 2048
 
     def load_config_json(self) -> dict:
         configs = {}
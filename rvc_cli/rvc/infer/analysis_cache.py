@@ -0,0 +1,193 @@
+import os
+import hashlib
+import threading
+
+import numpy as np
+
+DEFAULT_ANALYSIS_CACHE_DIR = os.path.join("logs", "analysis_cache")
+# Default disk budget for cached analysis arrays
+DEFAULT_ANALYSIS_CACHE_BYTES = 4 * 1024**3
+# Bytes read at a time while hashing an input file
+HASH_CHUNK_SIZE = 1024**2
+
+# Storage dtype of each kind of cached array
+ANALYSIS_DTYPES = {
+    "audio": np.float32,
+    "f0": np.float32,
+    "features": np.float16,
+    "lengths": np.int64,
+}
+
+
+class AnalysisCache:
+    """
+    A content-addressed on-disk cache for the analysis stages of a conversion: decoded
+    16 kHz audio, raw F0 contours and embedder features.
+
+    The cache is opt-in. Keys are built from the SHA-256 of the input file together with
+    every parameter the cached array depends on, including the device and precision, so
+    re-rendering the same source with other index, protection, pitch or post-processing
+    settings skips decoding, F0 estimation and embedding. Arrays are stored in compact
+    dtypes, which only cache hits see. The least recently used arrays are deleted when the
+    cache exceeds its disk budget.
+    """
+
+    def __init__(
+        self, cache_dir=DEFAULT_ANALYSIS_CACHE_DIR, max_bytes=DEFAULT_ANALYSIS_CACHE_BYTES
+    ):
+        """
+        Initializes the AnalysisCache with a directory and a disk budget.
+
+        Args:
+            cache_dir: Directory the cached arrays are stored in.
+            max_bytes: Maximum number of bytes held on disk.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.file_hashes = {}
+        self.hits = {}
+        self.misses = {}
+        self.lock = threading.Lock()
+
+    def hash_file(self, path):
+        """
+        Returns the SHA-256 digest of a file, remembering it while the file is unchanged.
+
+        Args:
+            path: Path to the file.
+        """
+        stat = os.stat(path)
+        memo_key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+        digest = self.file_hashes.get(memo_key)
+        if digest is None:
+            sha256 = hashlib.sha256()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                    sha256.update(chunk)
+            digest = sha256.hexdigest()
+            self.file_hashes[memo_key] = digest
+        return digest
+
+    @staticmethod
+    def make_key(*parts):
+        """
+        Builds a cache key from a content hash and the parameters a cached array depends on.
+
+        Args:
+            parts: Hashes and parameter values identifying the array.
+        """
+        return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()
+
+    def get_path(self, key, kind):
+        """
+        Returns the file path of a cached array.
+
+        Args:
+            key: Cache key of the array.
+            kind: Kind of array ("audio", "f0", "features" or "lengths").
+        """
+        return os.path.join(self.cache_dir, f"{key}.{kind}.npy")
+
+    def load(self, key, kind):
+        """
+        Returns a cached array, or None on a miss.
+
+        Args:
+            key: Cache key of the array.
+            kind: Kind of array ("audio", "f0", "features" or "lengths").
+        """
+        path = self.get_path(key, kind)
+        try:
+            array = np.load(path)
+            # Mark the array as recently used for eviction
+            os.utime(path)
+        except (OSError, ValueError):
+            with self.lock:
+                self.misses[kind] = self.misses.get(kind, 0) + 1
+            return None
+        with self.lock:
+            self.hits[kind] = self.hits.get(kind, 0) + 1
+        return array
+
+    def save(self, key, kind, array):
+        """
+        Stores a copy of an array in its compact storage dtype.
+
+        Args:
+            key: Cache key of the array.
+            kind: Kind of array ("audio", "f0", "features" or "lengths").
+            array: The array to store.
+        """
+        array = np.ascontiguousarray(array, dtype=ANALYSIS_DTYPES[kind])
+        path = self.get_path(key, kind)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                np.save(f, array)
+            os.replace(tmp_path, path)
+            self.evict()
+        except OSError as error:
+            print(f"Could not write to the analysis cache '{self.cache_dir}': {error}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def evict(self):
+        """
+        Deletes least recently used arrays until the cache fits its disk budget.
+        """
+        with self.lock:
+            entries = []
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(".npy"):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+
+    def clear(self):
+        """
+        Deletes every cached array.
+        """
+        with self.lock:
+            if os.path.isdir(self.cache_dir):
+                for name in os.listdir(self.cache_dir):
+                    if name.endswith(".npy"):
+                        os.remove(os.path.join(self.cache_dir, name))
+
+    def stats(self):
+        """
+        Returns hit and miss counters per kind of array.
+        """
+        with self.lock:
+            return {"hits": dict(self.hits), "misses": dict(self.misses)}
+
+    @staticmethod
+    def format_stats(before, after):
+        """
+        Formats the hits and misses recorded between two stats() snapshots.
+
+        Args:
+            before: Snapshot taken before the run.
+            after: Snapshot taken after the run.
+        """
+        counts = []
+        for kind in ANALYSIS_DTYPES:
+            if kind == "lengths":
+                continue
+            hits = after["hits"].get(kind, 0) - before["hits"].get(kind, 0)
+            misses = after["misses"].get(kind, 0) - before["misses"].get(kind, 0)
+            if hits + misses:
+                counts.append(f"{kind} {hits}/{hits + misses} hits")
+        return ", ".join(counts) if counts else "not used"
+
+
+analysis_cache = AnalysisCache()
@@ -0,0 +1,232 @@
+import os
+import subprocess
+import numpy as np
+import soundfile as sf
+import soxr
+from concurrent.futures import ThreadPoolExecutor
+
+# Output formats that can be exported
+EXPORT_FORMATS = ["WAV", "MP3", "FLAC", "OGG", "M4A"]
+# Sampling rates accepted by the encoders of formats that do not take any rate
+FORMAT_SAMPLE_RATES = {
+    "MP3": [8000, 11025, 12000, 16000, 22050, 24000, 32000, 44100, 48000],
+    "M4A": [
+        7350,
+        8000,
+        11025,
+        12000,
+        16000,
+        22050,
+        24000,
+        32000,
+        44100,
+        48000,
+        64000,
+        88200,
+        96000,
+    ],
+}
+# ffmpeg output arguments of the formats soundfile cannot write
+FFMPEG_FORMATS = {"M4A": ["-c:a", "aac", "-b:a", "192k", "-f", "ipod"]}
+
+
+def parse_export_formats(export_format):
+    """
+    Returns the list of requested export formats.
+
+    Args:
+        export_format: A format name, a comma-separated list of names, or a list of names.
+    """
+    if isinstance(export_format, str):
+        export_format = export_format.split(",")
+    formats = []
+    for name in export_format:
+        name = name.strip().upper()
+        if name not in EXPORT_FORMATS:
+            raise ValueError(
+                f"Unsupported export format: {name}. Choose from {', '.join(EXPORT_FORMATS)}."
+            )
+        if name not in formats:
+            formats.append(name)
+    return formats
+
+
+def get_export_path(audio_output_path, export_format):
+    """
+    Returns the path of an output in a format: the output path with the format's extension.
+
+    Args:
+        audio_output_path: Path to the output audio file.
+        export_format: Name of the format.
+    """
+    return os.path.splitext(audio_output_path)[0] + f".{export_format.lower()}"
+
+
+def get_export_sample_rate(export_format, sample_rate):
+    """
+    Returns the sampling rate an output is encoded at: the audio's own rate when the
+    format accepts it, otherwise the closest rate it does.
+
+    Args:
+        export_format: Name of the format.
+        sample_rate: Sampling rate of the audio.
+    """
+    rates = FORMAT_SAMPLE_RATES.get(export_format)
+    if rates is None or sample_rate in rates:
+        return sample_rate
+    return min(rates, key=lambda x: abs(x - sample_rate))
+
+
+class FormatWriter:
+    """
+    Writes mono float audio to a file in one format incrementally, resampling only when the
+    format does not accept the audio's sampling rate.
+
+    Formats soundfile cannot write are encoded by an ffmpeg process fed through a pipe,
+    which resamples as part of the encoding.
+    """
+
+    def __init__(self, path, export_format, sample_rate):
+        """
+        Initializes the FormatWriter and opens the output.
+
+        Args:
+            path: Path to the output file.
+            export_format: Name of the format.
+            sample_rate: Sampling rate of the audio passed to write.
+        """
+        self.path = path
+        self.export_format = export_format
+        target_sr = get_export_sample_rate(export_format, sample_rate)
+        self.file = None
+        self.process = None
+        self.resampler = None
+        if export_format in FFMPEG_FORMATS:
+            self.process = subprocess.Popen(
+                [
+                    "ffmpeg",
+                    "-y",
+                    "-loglevel",
+                    "error",
+                    "-f",
+                    "f32le",
+                    "-ar",
+                    str(sample_rate),
+                    "-ac",
+                    "1",
+                    "-i",
+                    "pipe:0",
+                    "-ar",
+                    str(target_sr),
+                    *FFMPEG_FORMATS[export_format],
+                    path,
+                ],
+                stdin=subprocess.PIPE,
+            )
+        else:
+            self.file = sf.SoundFile(path, "w", target_sr, 1, format=export_format)
+            if target_sr != sample_rate:
+                self.resampler = soxr.ResampleStream(
+                    sample_rate, target_sr, 1, dtype="float32"
+                )
+
+    def write(self, audio):
+        """
+        Encodes a block of audio.
+
+        Args:
+            audio: Mono float audio as a NumPy array.
+        """
+        audio = np.asarray(audio, dtype=np.float32)
+        if self.process is not None:
+            self.process.stdin.write(audio.astype("<f4").tobytes())
+            return
+        if self.resampler is not None:
+            audio = self.resampler.resample_chunk(audio)
+        self.file.write(audio)
+
+    def close(self):
+        """
+        Flushes the resampler and finishes the file.
+        """
+        if self.process is not None:
+            self.process.stdin.close()
+            if self.process.wait() != 0:
+                raise RuntimeError(
+                    f"ffmpeg failed to encode '{self.path}' as {self.export_format}."
+                )
+            return
+        if self.resampler is not None:
+            self.file.write(
+                self.resampler.resample_chunk(np.zeros(0, dtype=np.float32), last=True)
+            )
+        self.file.close()
+
+
+def encode_audio(audio, sample_rate, audio_output_path, export_formats):
+    """
+    Writes audio held in memory in one or several formats, without an intermediate file.
+
+    Args:
+        audio: Mono float audio as a NumPy array.
+        sample_rate: Sampling rate of the audio.
+        audio_output_path: Path to the output audio file; each format gets its extension.
+        export_formats: Names of the formats.
+
+    Returns:
+        The paths of the written files.
+    """
+    paths = []
+    for export_format in export_formats:
+        path = get_export_path(audio_output_path, export_format)
+        writer = FormatWriter(path, export_format, sample_rate)
+        try:
+            writer.write(audio)
+        finally:
+            writer.close()
+        paths.append(path)
+    return paths
+
+
+class BackgroundEncoder:
+    """
+    Runs output finishing and encoding jobs on a background thread, in submission order,
+    so the next conversion can start while the previous output is being written.
+    """
+
+    def __init__(self):
+        """
+        Initializes the BackgroundEncoder.
+        """
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.pending = []
+
+    def submit(self, function, *args, **kwargs):
+        """
+        Queues a job and returns its future.
+
+        Args:
+            function: Callable run on the background thread.
+            *args: Positional arguments of the callable.
+            **kwargs: Keyword arguments of the callable.
+        """
+        future = self.executor.submit(function, *args, **kwargs)
+        self.pending.append(future)
+        return future
+
+    def wait(self):
+        """
+        Waits for every queued job, then re-raises the error of the first one that failed,
+        after printing the errors of the others.
+        """
+        errors = []
+        pending, self.pending = self.pending, []
+        for future in pending:
+            try:
+                future.result()
+            except Exception as error:
+                errors.append(error)
+        for error in errors[1:]:
+            print(f"An error occurred writing the output audio: {error}")
+        if errors:
+            raise errors[0]
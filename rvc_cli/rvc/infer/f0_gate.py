@@ -0,0 +1,95 @@
+import numpy as np
+
+# Default RMS level, in dBFS, below which F0 frames are treated as silent
+DEFAULT_F0_GATE_THRESHOLD = -50.0
+# Frames kept on both sides of every active span so predictors see onsets and decays
+F0_GATE_MARGIN_FRAMES = 10
+# Silent gaps shorter than this many frames are processed together with their neighbours
+F0_GATE_MIN_GAP_FRAMES = 50
+# Share of active frames above which gating is not worth the extra predictor calls
+F0_GATE_MAX_COVERAGE = 0.9
+
+
+def frame_rms_db(x, frame_count, hop):
+    """
+    Returns the RMS level in dBFS of the 2 * hop samples centred on every F0 frame.
+
+    Args:
+        x: The audio signal as a NumPy array.
+        frame_count: Number of F0 frames.
+        hop: Number of samples between F0 frames.
+    """
+    samples = np.zeros(frame_count * hop, dtype=np.float64)
+    available = min(samples.shape[0], x.shape[0])
+    samples[:available] = x[:available]
+    blocks = np.square(samples).reshape(frame_count, hop).sum(axis=1)
+    # frame i covers the blocks starting hop samples before and at its centre
+    energy = blocks + np.concatenate(([0.0], blocks[:-1]))
+    return 10 * np.log10(energy / (2 * hop) + 1e-20)
+
+
+def find_active_spans(
+    x,
+    frame_count,
+    hop,
+    threshold_db=DEFAULT_F0_GATE_THRESHOLD,
+    margin=F0_GATE_MARGIN_FRAMES,
+    min_gap=F0_GATE_MIN_GAP_FRAMES,
+):
+    """
+    Finds the spans of F0 frames that are loud enough to hold pitch.
+
+    Frames above the threshold are extended by margin frames on both sides, and spans
+    separated by fewer than min_gap silent frames are merged.
+
+    Args:
+        x: The audio signal as a NumPy array.
+        frame_count: Number of F0 frames.
+        hop: Number of samples between F0 frames.
+        threshold_db: RMS level in dBFS below which frames are silent.
+        margin: Number of frames added on both sides of every span.
+        min_gap: Shortest silent gap, in frames, that separates two spans.
+
+    Returns:
+        list of (start, end) frame ranges, end exclusive.
+    """
+    active = np.flatnonzero(frame_rms_db(x, frame_count, hop) > threshold_db)
+    if active.shape[0] == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(active) - 1 - 2 * margin >= min_gap)
+    starts = np.maximum(active[np.concatenate(([0], breaks + 1))] - margin, 0)
+    ends = np.minimum(
+        active[np.concatenate((breaks, [active.shape[0] - 1]))] + 1 + margin,
+        frame_count,
+    )
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def gated_f0(x, frame_count, hop, extract, threshold_db=DEFAULT_F0_GATE_THRESHOLD):
+    """
+    Estimates an F0 contour by running a predictor on the active spans of a signal only,
+    leaving silent frames unvoiced (zero).
+
+    The predictor is run on the whole signal when there is no silence worth skipping.
+
+    Args:
+        x: The audio signal as a NumPy array.
+        frame_count: Number of F0 frames.
+        hop: Number of samples between F0 frames.
+        extract: Callable (audio, frame_count) returning the F0 contour of a signal.
+        threshold_db: RMS level in dBFS below which frames are silent.
+
+    Returns:
+        The F0 contour and the share of frames that were skipped.
+    """
+    spans = find_active_spans(x, frame_count, hop, threshold_db)
+    covered = sum(end - start for start, end in spans)
+    if covered > F0_GATE_MAX_COVERAGE * frame_count:
+        return extract(x, frame_count), 0.0
+    f0 = np.zeros(frame_count, dtype=np.float32)
+    for start, end in spans:
+        # frame j of the span is centred on sample j * hop of its slice
+        span_f0 = np.asarray(extract(x[start * hop : end * hop], end - start))
+        length = min(end - start, span_f0.shape[0])
+        f0[start : start + length] = span_f0[:length]
+    return f0, 1 - covered / max(frame_count, 1)
@@ -0,0 +1,187 @@
+import numpy as np
+from numba import njit
+
+# Reference note frequencies used by autotune, G1 to C6
+REF_FREQS = [
+    49.00,  # G1
+    51.91,  # G#1 / Ab1
+    55.00,  # A1
+    58.27,  # A#1 / Bb1
+    61.74,  # B1
+    65.41,  # C2
+    69.30,  # C#2 / Db2
+    73.42,  # D2
+    77.78,  # D#2 / Eb2
+    82.41,  # E2
+    87.31,  # F2
+    92.50,  # F#2 / Gb2
+    98.00,  # G2
+    103.83,  # G#2 / Ab2
+    110.00,  # A2
+    116.54,  # A#2 / Bb2
+    123.47,  # B2
+    130.81,  # C3
+    138.59,  # C#3 / Db3
+    146.83,  # D3
+    155.56,  # D#3 / Eb3
+    164.81,  # E3
+    174.61,  # F3
+    185.00,  # F#3 / Gb3
+    196.00,  # G3
+    207.65,  # G#3 / Ab3
+    220.00,  # A3
+    233.08,  # A#3 / Bb3
+    246.94,  # B3
+    261.63,  # C4
+    277.18,  # C#4 / Db4
+    293.66,  # D4
+    311.13,  # D#4 / Eb4
+    329.63,  # E4
+    349.23,  # F4
+    369.99,  # F#4 / Gb4
+    392.00,  # G4
+    415.30,  # G#4 / Ab4
+    440.00,  # A4
+    466.16,  # A#4 / Bb4
+    493.88,  # B4
+    523.25,  # C5
+    554.37,  # C#5 / Db5
+    587.33,  # D5
+    622.25,  # D#5 / Eb5
+    659.25,  # E5
+    698.46,  # F5
+    739.99,  # F#5 / Gb5
+    783.99,  # G5
+    830.61,  # G#5 / Ab5
+    880.00,  # A5
+    932.33,  # A#5 / Bb5
+    987.77,  # B5
+    1046.50,  # C6
+]
+
+# Smallest filter_radius for which the F0 contour is median filtered
+MIN_FILTER_RADIUS = 3
+# Factors by which crepe and FCPE may reduce their frame rate
+F0_DECIMATION_FACTORS = (1, 2, 4)
+
+
+def autotune_f0(f0, ref_freqs, f0_autotune_strength):
+    """
+    Moves every voiced frame of an F0 contour towards its closest reference frequency.
+
+    The closest note is found with a binary search over the sorted reference frequencies;
+    on a tie the lower note wins. Unvoiced (zero) frames are left at zero.
+
+    Args:
+        f0: The F0 contour as a NumPy array.
+        ref_freqs: Reference frequencies representing musical notes.
+        f0_autotune_strength: Fraction of the distance to the closest note to move by.
+    """
+    notes = np.sort(np.asarray(ref_freqs, dtype=np.float64))
+    index = np.clip(np.searchsorted(notes, f0), 1, len(notes) - 1)
+    lower, upper = notes[index - 1], notes[index]
+    closest_note = np.where(f0 - lower <= upper - f0, lower, upper)
+    autotuned_f0 = f0 + (closest_note - f0) * f0_autotune_strength
+    return np.where(f0 > 0, autotuned_f0, f0).astype(f0.dtype, copy=False)
+
+
+@njit(cache=True)
+def _voiced_median_filter(f0, radius):
+    filtered = f0.copy()
+    n = f0.shape[0]
+    for i in range(n):
+        if f0[i] <= 0:
+            continue
+        # the window stops at the edges of the voiced span
+        start = i
+        while start > max(0, i - radius) and f0[start - 1] > 0:
+            start -= 1
+        end = i + 1
+        while end < min(n, i + radius + 1) and f0[end] > 0:
+            end += 1
+        filtered[i] = np.median(f0[start:end])
+    return filtered
+
+
+def median_filter_f0(f0, filter_radius):
+    """
+    Median filters the voiced frames of an F0 contour over a window of 2 * filter_radius + 1
+    frames, to remove octave jumps and other single-frame errors.
+
+    The window is cut at the edges of each voiced span, so the filter neither voices
+    unvoiced frames, pulls voiced frames towards zero, nor mixes the pitch of separate
+    notes across a pause. Contours are returned unchanged when filter_radius is below
+    MIN_FILTER_RADIUS.
+
+    Args:
+        f0: The F0 contour as a NumPy array.
+        filter_radius: Radius of the median filter, in frames.
+    """
+    if filter_radius < MIN_FILTER_RADIUS:
+        return f0
+    return _voiced_median_filter(np.ascontiguousarray(f0), int(filter_radius))
+
+
+def upsample_f0(f0, positions):
+    """
+    Resamples an F0 contour at fractional frame positions, as when a contour estimated at a
+    reduced frame rate is brought back to the full rate.
+
+    The pitch is interpolated on a log scale between voiced neighbours. Between a voiced
+    and an unvoiced frame the nearest frame is used, so voiced spans neither shrink nor
+    ramp down towards zero at their edges. Unvoiced frames may be zero or NaN.
+
+    Args:
+        f0: The F0 contour as a NumPy array.
+        positions: Fractional frame indices into f0 to sample at.
+    """
+    f0 = np.nan_to_num(np.asarray(f0, dtype=np.float64))
+    positions = np.clip(positions, 0, f0.shape[0] - 1)
+    left = np.floor(positions).astype(np.int64)
+    right = np.minimum(left + 1, f0.shape[0] - 1)
+    weight = positions - left
+    nearest = np.where(weight < 0.5, f0[left], f0[right])
+    voiced = (f0[left] > 0) & (f0[right] > 0)
+    log_f0 = np.log2(np.where(f0 > 0, f0, 1))
+    interpolated = np.exp2((1 - weight) * log_f0[left] + weight * log_f0[right])
+    return np.where(voiced, interpolated, nearest)
+
+
+def overlay_f0(f0, inp_f0, offset, frame_rate):
+    """
+    Replaces part of an F0 contour with a contour read from an F0 file.
+
+    Args:
+        f0: The F0 contour as a NumPy array. It is modified in place.
+        inp_f0: Array of (time in seconds, frequency) rows.
+        offset: First frame to replace.
+        frame_rate: Number of F0 frames per second.
+    """
+    delta_t = np.round(
+        (inp_f0[:, 0].max() - inp_f0[:, 0].min()) * frame_rate + 1
+    ).astype("int16")
+    replace_f0 = np.interp(np.arange(delta_t), inp_f0[:, 0] * 100, inp_f0[:, 1])
+    shape = f0[offset : offset + len(replace_f0)].shape[0]
+    f0[offset : offset + len(replace_f0)] = replace_f0[:shape]
+    return f0
+
+
+def quantize_f0(f0, f0_min, f0_max):
+    """
+    Quantizes an F0 contour to the 255 mel-scale bins of the synthesizer's pitch embedding.
+    Unvoiced frames map to bin 1.
+
+    Args:
+        f0: The F0 contour as a NumPy array.
+        f0_min: Frequency of the lowest bin.
+        f0_max: Frequency of the highest bin.
+    """
+    f0_mel_min = 1127 * np.log(1 + f0_min / 700)
+    f0_mel_max = 1127 * np.log(1 + f0_max / 700)
+    f0_mel = 1127 * np.log(1 + f0 / 700)
+    f0_mel[f0_mel > 0] = (f0_mel[f0_mel > 0] - f0_mel_min) * 254 / (
+        f0_mel_max - f0_mel_min
+    ) + 1
+    f0_mel[f0_mel <= 1] = 1
+    f0_mel[f0_mel > 255] = 255
+    return np.rint(f0_mel).astype(int)
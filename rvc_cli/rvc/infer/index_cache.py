@@ -0,0 +1,275 @@
+import os
+import threading
+from collections import OrderedDict
+
+import faiss
+import numpy as np
+
+# Default memory budget for cached indexes and their reconstructed vectors
+DEFAULT_INDEX_CACHE_BYTES = 2 * 1024**3
+# Number of vectors reconstructed at a time while writing a sidecar
+SIDECAR_CHUNK_SIZE = 65536
+
+
+def get_sidecar_path(file_index):
+    """
+    Returns the path of the vector sidecar stored next to an index file.
+
+    Args:
+        file_index: Path to the FAISS index file.
+    """
+    return os.path.splitext(file_index)[0] + ".vectors.npy"
+
+
+def read_index(file_index):
+    """
+    Reads a FAISS index, memory-mapping its data when the index type supports it.
+
+    Args:
+        file_index: Path to the FAISS index file.
+    """
+    try:
+        return faiss.read_index(file_index, faiss.IO_FLAG_MMAP)
+    except RuntimeError:
+        return faiss.read_index(file_index)
+
+
+def write_vector_sidecar(index, sidecar_path, dtype="float32"):
+    """
+    Writes every vector stored in an index to a .npy sidecar without materializing them all at once.
+
+    Args:
+        index: The FAISS index to read vectors from.
+        sidecar_path: Destination path of the sidecar.
+        dtype: Storage dtype of the sidecar ("float32" or "float16").
+    """
+    tmp_path = f"{sidecar_path}.{os.getpid()}.tmp"
+    vectors = np.lib.format.open_memmap(
+        tmp_path, mode="w+", dtype=dtype, shape=(index.ntotal, index.d)
+    )
+    for start in range(0, index.ntotal, SIDECAR_CHUNK_SIZE):
+        count = min(SIDECAR_CHUNK_SIZE, index.ntotal - start)
+        vectors[start : start + count] = index.reconstruct_n(start, count)
+    vectors.flush()
+    del vectors
+    os.replace(tmp_path, sidecar_path)
+
+
+def copy_vector_sidecar(vectors, sidecar_path, dtype):
+    """
+    Writes a copy of a set of vectors to a .npy sidecar with another storage dtype.
+
+    Args:
+        vectors: The vectors to copy, usually a memory-mapped sidecar.
+        sidecar_path: Destination path of the copy.
+        dtype: Storage dtype of the copy ("float32" or "float16").
+    """
+    tmp_path = f"{sidecar_path}.{os.getpid()}.tmp"
+    converted = np.lib.format.open_memmap(
+        tmp_path, mode="w+", dtype=dtype, shape=vectors.shape
+    )
+    for start in range(0, vectors.shape[0], SIDECAR_CHUNK_SIZE):
+        converted[start : start + SIDECAR_CHUNK_SIZE] = vectors[
+            start : start + SIDECAR_CHUNK_SIZE
+        ]
+    converted.flush()
+    del converted
+    os.replace(tmp_path, sidecar_path)
+
+
+def get_optimized_index_path(file_index):
+    """
+    Returns the path of the optimized (IVF, HNSW, fp16 or PQ) copy of an index file.
+
+    Args:
+        file_index: Path to the FAISS index file.
+    """
+    return os.path.splitext(file_index)[0] + ".optimized.index"
+
+
+def load_optimized_sidecar(file_index, optimized_path, dtype="float32"):
+    """
+    Opens the vectors blended with an optimized index: its own float16 sidecar when it was
+    built as a compressed type, otherwise the sidecar of the original index.
+
+    Args:
+        file_index: Path to the original FAISS index file.
+        optimized_path: Path to the optimized copy of the index.
+        dtype: Storage dtype used when the original sidecar has to be written.
+    """
+    sidecar_path = get_sidecar_path(optimized_path)
+    if os.path.exists(sidecar_path):
+        return np.load(sidecar_path, mmap_mode="r")
+    return load_vector_sidecar(file_index, dtype=dtype)
+
+
+def resolve_search_index(file_index):
+    """
+    Returns the index file that should be searched: the optimized copy when it is up to date,
+    otherwise the index itself.
+
+    Args:
+        file_index: Path to the FAISS index file.
+    """
+    optimized_path = get_optimized_index_path(file_index)
+    if os.path.exists(optimized_path) and os.path.getmtime(
+        optimized_path
+    ) >= os.path.getmtime(file_index):
+        return optimized_path
+    return file_index
+
+
+def load_vector_sidecar(file_index, index=None, dtype="float32"):
+    """
+    Opens the memory-mapped vector sidecar of an index, writing it first if it is missing or stale.
+
+    Falls back to an in-memory copy of the vectors when the sidecar cannot be written.
+
+    Args:
+        file_index: Path to the FAISS index file the vectors belong to.
+        index: The loaded FAISS index, read from file_index when not given.
+        dtype: Storage dtype used when a new sidecar has to be written.
+    """
+    sidecar_path = get_sidecar_path(file_index)
+    if (
+        os.path.exists(sidecar_path)
+        and os.path.getmtime(sidecar_path) >= os.path.getmtime(file_index)
+    ):
+        vectors = np.load(sidecar_path, mmap_mode="r")
+        if index is None or vectors.shape == (index.ntotal, index.d):
+            return vectors
+    index = faiss.read_index(file_index) if index is None else index
+    try:
+        write_vector_sidecar(index, sidecar_path, dtype)
+        return np.load(sidecar_path, mmap_mode="r")
+    except OSError as error:
+        print(f"Could not write the index vector sidecar '{sidecar_path}': {error}")
+        return index.reconstruct_n(0, index.ntotal)
+
+
+class IndexCache:
+    """
+    A process-wide LRU cache for FAISS indexes and their reconstructed feature vectors.
+
+    Entries are keyed by the absolute index path together with the modification time and
+    size of the searched file, so a rewritten or newly optimized index is picked up on the next
+    lookup. Vectors are served from a memory-mapped sidecar, so only in-memory fallbacks count
+    against the budget.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_INDEX_CACHE_BYTES, vector_dtype="float32"):
+        """
+        Initializes the IndexCache with a memory budget.
+
+        Args:
+            max_bytes: Maximum number of bytes held by cached entries.
+            vector_dtype: Storage dtype used when writing new vector sidecars.
+        """
+        self.max_bytes = max_bytes
+        self.vector_dtype = vector_dtype
+        self.entries = OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def make_key(file_index):
+        """
+        Builds the cache key for an index file.
+
+        Args:
+            file_index: Path to the FAISS index file.
+        """
+        search_index = resolve_search_index(file_index)
+        stat = os.stat(search_index)
+        return (
+            os.path.abspath(file_index),
+            search_index,
+            stat.st_mtime_ns,
+            stat.st_size,
+        )
+
+    def get(self, file_index):
+        """
+        Returns the FAISS index and its reconstructed vectors, loading them on a miss.
+
+        Args:
+            file_index: Path to the FAISS index file.
+        """
+        key = self.make_key(file_index)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry["index"], entry["big_npy"]
+            self.misses += 1
+            # Drop stale entries for the same path before loading the new version
+            for stale_key in [k for k in self.entries if k[0] == key[0]]:
+                self._evict(stale_key)
+
+            search_index = key[1]
+            index = read_index(search_index)
+            if search_index == file_index:
+                big_npy = load_vector_sidecar(file_index, index, self.vector_dtype)
+            else:
+                big_npy = load_optimized_sidecar(
+                    file_index, search_index, self.vector_dtype
+                )
+            nbytes = key[3]
+            if not isinstance(big_npy, np.memmap):
+                nbytes += big_npy.nbytes
+            if nbytes <= self.max_bytes:
+                while self.entries and self.current_bytes + nbytes > self.max_bytes:
+                    self._evict(next(iter(self.entries)))
+                self.entries[key] = {"index": index, "big_npy": big_npy, "nbytes": nbytes}
+                self.current_bytes += nbytes
+            else:
+                print(
+                    f"Index '{file_index}' ({nbytes / 1024**2:.1f} MB) exceeds the index cache budget and will not be cached."
+                )
+            return index, big_npy
+
+    def _evict(self, key):
+        entry = self.entries.pop(key)
+        self.current_bytes -= entry["nbytes"]
+        self.evictions += 1
+
+    def set_memory_budget(self, max_bytes):
+        """
+        Changes the memory budget, evicting least recently used entries if needed.
+
+        Args:
+            max_bytes: Maximum number of bytes held by cached entries.
+        """
+        with self.lock:
+            self.max_bytes = max_bytes
+            while self.entries and self.current_bytes > self.max_bytes:
+                self._evict(next(iter(self.entries)))
+
+    def clear(self):
+        """
+        Removes every cached entry.
+        """
+        with self.lock:
+            self.entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        """
+        Returns hit/miss counters and the current memory usage of the cache.
+        """
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self.entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+index_cache = IndexCache()
@@ -2,12 +2,15 @@ import os
 import sys
 import time
 import torch
-import librosa
+import inspect
+import contextlib
+import itertools
 import logging
 import traceback
 import numpy as np
 import soundfile as sf
 import noisereduce as nr
+from collections import OrderedDict
 from pedalboard import (
     Pedalboard,
     Chorus,
@@ -26,11 +29,68 @@ now_dir = os.getcwd()
 sys.path.append(now_dir)
 
 from rvc_cli.rvc.infer.pipeline import Pipeline as VC
-from rvc_cli.rvc.lib.utils import load_audio_infer, load_embedding
+from rvc_cli.rvc.infer.index_cache import index_cache
+from rvc_cli.rvc.infer.analysis_cache import analysis_cache
+from rvc_cli.rvc.infer.f0_gate import DEFAULT_F0_GATE_THRESHOLD
+from rvc_cli.rvc.infer.streaming import (
+    DEFAULT_BLOCK_SECONDS,
+    DEFAULT_CONTEXT_SECONDS,
+    DEFAULT_CROSSFADE_SECONDS,
+    StreamingConverter,
+)
+from rvc_cli.rvc.infer.pipe_io import (
+    DEFAULT_PIPE_BLOCK_SECONDS,
+    PIPE_PATH,
+    PCMReader,
+    PCMWriter,
+    PeakLimiter,
+)
+from rvc_cli.rvc.infer.long_audio import (
+    SCAN_BLOCK_FRAMES,
+    ConversionCheckpoint,
+    find_window_end,
+    get_input_peak,
+    scan_peak,
+)
+from rvc_cli.rvc.infer.encoder import (
+    BackgroundEncoder,
+    FormatWriter,
+    encode_audio,
+    get_export_path,
+    parse_export_formats,
+)
+from rvc_cli.rvc.infer.predictor_registry import predictor_registry
+from rvc_cli.rvc.lib.utils import (
+    formant_shift,
+    load_audio_infer,
+    load_audio_range,
+    load_embedding,
+)
 from rvc_cli.rvc.lib.tools.split_audio import process_audio, merge_audio
 from rvc_cli.rvc.lib.algorithm.synthesizers import Synthesizer
 from rvc_cli.rvc.configs.config import Config
 
+# Default number of loaded synthesizers kept in memory during a fan-out conversion
+DEFAULT_MAX_CACHED_MODELS = 4
+# convert_audio options the constant-memory conversion does not support, with their defaults
+LONG_AUDIO_UNSUPPORTED_OPTIONS = {
+    "split_audio": False,
+    "f0_file": None,
+    "formant_shifting": False,
+    "start": None,
+    "end": None,
+}
+# convert_audio options the pipe conversion does not support, with their defaults
+PIPE_UNSUPPORTED_OPTIONS = {
+    "split_audio": False,
+    "f0_file": None,
+    "volume_envelope": 1,
+    "f0_energy_gate": False,
+    "f0_decimation": 1,
+    "start": None,
+    "end": None,
+}
+
 logging.getLogger("httpx").setLevel(logging.WARNING)
 logging.getLogger("httpcore").setLevel(logging.WARNING)
 logging.getLogger("faiss").setLevel(logging.WARNING)
@@ -59,6 +119,10 @@ class VoiceConverter:
         self.n_spk = None  # Number of speakers in the model
         self.use_f0 = None  # Whether the model uses F0
         self.loaded_model = None
+        self.model_cache = OrderedDict()  # Recently used synthesizers by model path
+        self.max_cached_models = 0  # Only fan-out conversions keep synthesizers cached
+        self.pipelines = {}  # Pipeline instances by target sampling rate
+        self.encoder = BackgroundEncoder()  # Writes outputs while the next one converts
 
     def load_hubert(self, embedder_model: str, embedder_model_custom: str = None):
         """
@@ -96,46 +160,23 @@ class VoiceConverter:
             print(f"An error occurred removing audio noise: {error}")
             return None
 
-    @staticmethod
-    def convert_audio_format(input_path, output_path, output_format):
-        """
-        Converts an audio file to a specified output format.
-
-        Args:
-            input_path (str): Path to the input audio file.
-            output_path (str): Path to the output audio file.
-            output_format (str): Desired audio format (e.g., "WAV", "MP3").
-        """
-        try:
-            if output_format != "WAV":
-                print(f"Saving audio as {output_format}...")
-                audio, sample_rate = librosa.load(input_path, sr=None)
-                common_sample_rates = [
-                    8000,
-                    11025,
-                    12000,
-                    16000,
-                    22050,
-                    24000,
-                    32000,
-                    44100,
-                    48000,
-                ]
-                target_sr = min(common_sample_rates, key=lambda x: abs(x - sample_rate))
-                audio = librosa.resample(
-                    audio, orig_sr=sample_rate, target_sr=target_sr
-                )
-                sf.write(output_path, audio, target_sr, format=output_format.lower())
-            return output_path
-        except Exception as error:
-            print(f"An error occurred converting the audio format: {error}")
-
     @staticmethod
     def post_process_audio(
         audio_input,
         sample_rate,
         **kwargs,
     ):
+        board = VoiceConverter.get_effects_board(**kwargs)
+        return board(audio_input, sample_rate)
+
+    @staticmethod
+    def get_effects_board(**kwargs):
+        """
+        Builds the Pedalboard of the post-processing effects enabled in kwargs.
+
+        Args:
+            **kwargs: Keyword arguments with the effect settings.
+        """
         board = Pedalboard()
         if kwargs.get("reverb", False):
             reverb = Reverb(
@@ -192,7 +233,7 @@ class VoiceConverter:
                 mix=kwargs.get("delay_mix", 0.5),
             )
             board.append(delay)
-        return board(audio_input, sample_rate)
+        return board
 
     def convert_audio(
         self,
@@ -220,6 +261,18 @@ class VoiceConverter:
         post_process: bool = False,
         resample_sr: int = 0,
         sid: int = 0,
+        retrieval_backend: str = "auto",
+        synthesis_batch_size: int = 1,
+        whole_file_features: bool = False,
+        cache_analysis: bool = False,
+        concurrent_analysis: bool = False,
+        f0_threads: int = 0,
+        f0_energy_gate: bool = False,
+        f0_gate_threshold: float = DEFAULT_F0_GATE_THRESHOLD,
+        f0_decimation: int = 1,
+        start: float = None,
+        end: float = None,
+        background_encoding: bool = False,
         **kwargs,
     ):
         """
@@ -248,22 +301,41 @@ class VoiceConverter:
             embedder_model_custom (str): Path to the custom embedder model.
             resample_sr (int, optional): Resample sampling rate. Default is 0.
             sid (int, optional): Speaker ID. Default is 0.
+            retrieval_backend (str, optional): Index search backend ("auto", "faiss" or "torch"). Default is "auto".
+            synthesis_batch_size (int, optional): Maximum number of segments synthesized per generator call. Default is 1.
+            whole_file_features (bool, optional): Extract features once per input instead of once per segment. Default is False.
+            cache_analysis (bool, optional): Reuse and store decoded audio, F0 and features in the analysis cache. Default is False.
+            concurrent_analysis (bool, optional): Run F0 estimation and feature extraction in parallel workers. Default is False.
+            f0_threads (int, optional): Torch CPU threads of the F0 worker in concurrent analysis, 0 to split them evenly. Default is 0.
+            f0_energy_gate (bool, optional): Skip F0 estimation on frames quieter than f0_gate_threshold and leave them unvoiced. Default is False.
+            f0_gate_threshold (float, optional): RMS level in dBFS below which frames are skipped by the energy gate. Default is -50.
+            f0_decimation (int, optional): Factor (1, 2 or 4) by which crepe and FCPE reduce their frame rate. Default is 1.
+            start (float, optional): Start in seconds of the range to convert, decoded by seeking. Default is the start of the input.
+            end (float, optional): End in seconds of the range to convert. Default is the end of the input.
+            background_encoding (bool, optional): Return while the output is still being encoded, leaving self.encoder.wait to the caller. Default is False.
             **kwargs: Additional keyword arguments.
+
+        Returns:
+            The path of the output in the first requested format, or None when the conversion failed.
         """
+        if not f0_energy_gate:
+            f0_gate_threshold = None
         self.get_vc(model_path, sid)
         try:
             start_time = time.time()
             print(f"Converting audio '{audio_input_path}'...")
 
-            audio = load_audio_infer(
-                audio_input_path,
-                16000,
-                **kwargs,
-            )
-            audio_max = np.abs(audio).max() / 0.95
-
-            if audio_max > 1:
-                audio /= audio_max
+            cache_stats = analysis_cache.stats()
+            if start is not None or end is not None:
+                audio, output_range = self.load_input_range(
+                    audio_input_path, start, end, **kwargs
+                )
+                source_key = None
+            else:
+                audio, source_key = self.load_input_audio(
+                    audio_input_path, cache_analysis, **kwargs
+                )
+                output_range = None
 
             if not self.hubert_model or embedder_model != self.last_embedder_model:
                 self.load_hubert(embedder_model, embedder_model_custom)
@@ -289,7 +361,19 @@ class VoiceConverter:
                 chunks.append(audio)
 
             converted_chunks = []
-            for c in chunks:
+            for i, c in enumerate(chunks):
+                f0_cache_key, feature_cache_key = self.get_chunk_cache_keys(
+                    source_key,
+                    split_audio,
+                    i,
+                    f0_method,
+                    hop_length,
+                    embedder_model,
+                    embedder_model_custom,
+                    whole_file_features,
+                    f0_gate_threshold=f0_gate_threshold,
+                    f0_decimation=f0_decimation,
+                )
                 audio_opt = self.vc.pipeline(
                     model=self.hubert_model,
                     net_g=self.net_g,
@@ -308,6 +392,16 @@ class VoiceConverter:
                     f0_autotune=f0_autotune,
                     f0_autotune_strength=f0_autotune_strength,
                     f0_file=f0_file,
+                    retrieval_backend=retrieval_backend,
+                    synthesis_batch_size=synthesis_batch_size,
+                    whole_file_features=whole_file_features,
+                    f0_cache_key=f0_cache_key,
+                    feature_cache_key=feature_cache_key,
+                    concurrent_analysis=concurrent_analysis,
+                    f0_threads=f0_threads,
+                    f0_gate_threshold=f0_gate_threshold,
+                    f0_decimation=f0_decimation,
+                    normalize=output_range is None,
                 )
                 converted_chunks.append(audio_opt)
                 if split_audio:
@@ -317,37 +411,1317 @@ class VoiceConverter:
                 audio_opt = merge_audio(converted_chunks, intervals, 16000, self.tgt_sr)
             else:
                 audio_opt = converted_chunks[0]
+            if output_range is not None:
+                audio_opt = audio_opt[output_range]
 
-            if clean_audio:
-                cleaned_audio = self.remove_audio_noise(
-                    audio_opt, self.tgt_sr, clean_strength
-                )
-                if cleaned_audio is not None:
-                    audio_opt = cleaned_audio
+            audio_output_path = self.save_output_audio(
+                audio_opt,
+                audio_output_path,
+                export_format,
+                clean_audio,
+                clean_strength,
+                post_process,
+                background_encoding,
+                **kwargs,
+            )
 
-            if post_process:
-                audio_opt = self.post_process_audio(
-                    audio_input=audio_opt,
-                    sample_rate=self.tgt_sr,
-                    **kwargs,
+            elapsed_time = time.time() - start_time
+            if background_encoding:
+                print(
+                    f"Conversion completed in {elapsed_time:.2f} seconds, writing '{audio_output_path}'."
+                )
+            else:
+                print(
+                    f"Conversion completed at '{audio_output_path}' in {elapsed_time:.2f} seconds."
+                )
+            if cache_analysis:
+                print(
+                    f"Analysis cache: {analysis_cache.format_stats(cache_stats, analysis_cache.stats())}."
                 )
+            return audio_output_path
+        except Exception as error:
+            print(f"An error occurred during audio conversion: {error}")
+            print(traceback.format_exc())
+
+    def convert_long_audio(
+        self,
+        audio_input_path: str,
+        audio_output_path: str,
+        model_path: str,
+        index_path: str,
+        pitch: int = 0,
+        f0_method: str = "rmvpe",
+        index_rate: float = 0.75,
+        volume_envelope: float = 1,
+        protect: float = 0.5,
+        hop_length: int = 128,
+        f0_autotune: bool = False,
+        f0_autotune_strength: float = 1,
+        filter_radius: int = 3,
+        embedder_model: str = "contentvec",
+        embedder_model_custom: str = None,
+        clean_audio: bool = False,
+        clean_strength: float = 0.5,
+        export_format: str = "WAV",
+        post_process: bool = False,
+        sid: int = 0,
+        retrieval_backend: str = "auto",
+        synthesis_batch_size: int = 1,
+        whole_file_features: bool = False,
+        concurrent_analysis: bool = False,
+        f0_threads: int = 0,
+        f0_energy_gate: bool = False,
+        f0_gate_threshold: float = DEFAULT_F0_GATE_THRESHOLD,
+        f0_decimation: int = 1,
+        **kwargs,
+    ):
+        """
+        Performs voice conversion with a peak memory use independent of the input length.
+
+        The input is decoded one window at a time, each window running through the pipeline
+        with x_pad seconds of real context on both sides and ending at a quiet point near
+        x_center seconds, as the pipeline cuts long inputs into segments. Converted windows
+        are appended to a float RF64 file next to the output, and a checkpoint records the
+        progress after each one, so an interrupted conversion resumes from its last window.
+        The output is then normalized and written in the requested format block by block.
+
+        Args:
+            audio_input_path (str): Path to the input audio file.
+            audio_output_path (str): Path to the output audio file.
+            clean_audio (bool): Whether to clean each window of the audio.
+            post_process (bool): Whether to apply the post-processing effects in kwargs.
+            The remaining arguments are the same as for convert_audio.
 
-            sf.write(audio_output_path, audio_opt, self.tgt_sr, format="WAV")
-            output_path_format = audio_output_path.replace(
-                ".wav", f".{export_format.lower()}"
+        Returns:
+            The path of the output in the first requested format, or None when the conversion failed.
+        """
+        if not f0_energy_gate:
+            f0_gate_threshold = None
+        ignored = [
+            name
+            for name, default in LONG_AUDIO_UNSUPPORTED_OPTIONS.items()
+            if kwargs.get(name, default) != default
+        ]
+        if ignored:
+            print(
+                f"Options not supported by the constant-memory conversion, ignored: {', '.join(ignored)}."
             )
-            audio_output_path = self.convert_audio_format(
-                audio_output_path, output_path_format, export_format
+        self.get_vc(model_path, sid)
+        try:
+            start_time = time.time()
+            if not self.hubert_model or embedder_model != self.last_embedder_model:
+                self.load_hubert(embedder_model, embedder_model_custom)
+                self.last_embedder_model = embedder_model
+            file_index = (
+                index_path.strip()
+                .strip('"')
+                .strip("\n")
+                .strip('"')
+                .strip()
+                .replace("trained", "added")
             )
+            path = (
+                audio_input_path.strip(" ").strip('"').strip("\n").strip('"').strip(" ")
+            )
+            info = sf.info(path)
+            length = int(np.ceil(info.frames * 16000 / info.samplerate))
+            vc = self.vc
+            upp = self.tgt_sr // (vc.sample_rate // vc.window)
+            partial_path = audio_output_path + ".partial.rf64"
+            checkpoint = ConversionCheckpoint(
+                audio_output_path + ".checkpoint.json",
+                {
+                    "input": os.path.abspath(path),
+                    "input_size": os.path.getsize(path),
+                    "input_mtime": os.path.getmtime(path),
+                    "model": os.path.abspath(model_path),
+                    "index": file_index,
+                    "tgt_sr": self.tgt_sr,
+                    "window": [vc.t_pad, vc.t_query, vc.t_center],
+                    "settings": [
+                        pitch,
+                        f0_method,
+                        index_rate,
+                        volume_envelope,
+                        protect,
+                        hop_length,
+                        f0_autotune,
+                        f0_autotune_strength,
+                        filter_radius,
+                        embedder_model,
+                        embedder_model_custom,
+                        clean_audio,
+                        clean_strength,
+                        sid,
+                        f0_gate_threshold,
+                        f0_decimation,
+                    ],
+                },
+            )
+            state = checkpoint.load()
+            if (
+                state is not None
+                and os.path.isfile(partial_path)
+                and sf.info(partial_path).frames >= state["output_frames"]
+            ):
+                print(
+                    f"Resuming the conversion of '{audio_input_path}' at {state['position'] / 16000:.1f} s."
+                )
+                mode = "r+"
+            else:
+                print(f"Converting audio '{audio_input_path}' in constant memory...")
+                state = {
+                    "position": 0,
+                    "output_frames": 0,
+                    "windows": 0,
+                    "input_peak": scan_peak(path),
+                    "peak": 0.0,
+                }
+                mode = "w"
+            # the whole-file conversion scales inputs peaking above 0.95 down to 0.95
+            input_gain = min(1.0, 0.95 / max(state["input_peak"], 1e-9))
 
+            # RF64 lifts the 4 GB limit of WAV for inputs of several hours
+            partial_format = (
+                {
+                    "samplerate": self.tgt_sr,
+                    "channels": 1,
+                    "subtype": "FLOAT",
+                    "format": "RF64",
+                }
+                if mode == "w"
+                else {}
+            )
+            with sf.SoundFile(partial_path, mode, **partial_format) as partial:
+                partial.seek(state["output_frames"])
+                while state["position"] < length:
+                    start = state["position"]
+                    left = min(vc.t_pad, start)
+                    lookahead = min(start + vc.t_center + vc.t_query, length)
+                    right = min(vc.t_pad, length - lookahead)
+                    audio = load_audio_range(path, 16000, start - left, lookahead + right)
+                    audio *= input_gain
+                    if lookahead < length:
+                        end = find_window_end(
+                            audio,
+                            left,
+                            start,
+                            vc.t_center,
+                            vc.t_query,
+                            vc.window,
+                        )
+                    else:
+                        end = length
+                    # context on the right, in whole F0 frames
+                    right = min(vc.t_pad, (length - end) // vc.window * vc.window)
+                    audio_opt = vc.pipeline(
+                        model=self.hubert_model,
+                        net_g=self.net_g,
+                        sid=sid,
+                        audio=audio[: end + right - (start - left)],
+                        pitch=pitch,
+                        f0_method=f0_method,
+                        file_index=file_index,
+                        index_rate=index_rate,
+                        pitch_guidance=self.use_f0,
+                        filter_radius=filter_radius,
+                        volume_envelope=volume_envelope,
+                        version=self.version,
+                        protect=protect,
+                        hop_length=hop_length,
+                        f0_autotune=f0_autotune,
+                        f0_autotune_strength=f0_autotune_strength,
+                        f0_file=None,
+                        retrieval_backend=retrieval_backend,
+                        synthesis_batch_size=synthesis_batch_size,
+                        whole_file_features=whole_file_features,
+                        concurrent_analysis=concurrent_analysis,
+                        f0_threads=f0_threads,
+                        f0_gate_threshold=f0_gate_threshold,
+                        f0_decimation=f0_decimation,
+                        normalize=False,
+                    )
+                    # the pipeline output lacks the last frames of its input, which the
+                    # right context absorbs, so the window is sliced from the start
+                    first = left // vc.window * upp
+                    audio_opt = audio_opt[
+                        first : first + -(-(end - start) // vc.window) * upp
+                    ]
+                    if clean_audio:
+                        cleaned_audio = self.remove_audio_noise(
+                            audio_opt, self.tgt_sr, clean_strength
+                        )
+                        if cleaned_audio is not None:
+                            audio_opt = cleaned_audio
+                    partial.write(audio_opt)
+                    partial.flush()
+                    state["position"] = end
+                    state["output_frames"] += audio_opt.shape[0]
+                    state["windows"] += 1
+                    state["peak"] = max(state["peak"], float(np.abs(audio_opt).max()))
+                    checkpoint.save(state)
+                    print(
+                        f"Converted window {state['windows']}: {end / 16000:.1f} s of {length / 16000:.1f} s."
+                    )
+                # drop output left over from a window converted before an interruption
+                partial.truncate(state["output_frames"])
+
+            audio_output_path = self.write_long_output(
+                partial_path,
+                audio_output_path,
+                export_format,
+                min(1.0, 0.99 / max(state["peak"], 1e-9)),
+                post_process,
+                **kwargs,
+            )
+            os.remove(partial_path)
+            checkpoint.remove()
             elapsed_time = time.time() - start_time
             print(
                 f"Conversion completed at '{audio_output_path}' in {elapsed_time:.2f} seconds."
             )
+            return audio_output_path
         except Exception as error:
             print(f"An error occurred during audio conversion: {error}")
             print(traceback.format_exc())
 
+    def write_long_output(
+        self,
+        partial_path,
+        audio_output_path,
+        export_format,
+        output_gain=1.0,
+        post_process=False,
+        **kwargs,
+    ):
+        """
+        Writes the output of a constant-memory conversion from its partial file block by
+        block, scaled by output_gain and with the optional effects, in the requested formats.
+
+        Args:
+            partial_path (str): Path to the float RF64 file holding the converted audio.
+            audio_output_path (str): Path to the output file; each format gets its extension.
+            export_format (str or list): Format or formats for exporting the audio.
+            output_gain (float): Gain applied to the audio.
+            post_process (bool): Whether to apply the post-processing effects in kwargs.
+            **kwargs: Additional keyword arguments with the effect settings.
+
+        Returns:
+            The path of the file in the first requested format.
+        """
+        board = self.get_effects_board(**kwargs) if post_process else None
+        export_formats = parse_export_formats(export_format)
+        writers = []
+        try:
+            for fmt in export_formats:
+                writers.append(
+                    FormatWriter(
+                        get_export_path(audio_output_path, fmt), fmt, self.tgt_sr
+                    )
+                )
+            for block in sf.blocks(
+                partial_path, blocksize=SCAN_BLOCK_FRAMES, dtype="float32"
+            ):
+                block = block * output_gain
+                if board is not None:
+                    block = board(block, self.tgt_sr, reset=False)
+                for writer in writers:
+                    writer.write(block)
+        finally:
+            for writer in writers:
+                writer.close()
+        return writers[0].path
+
+    def load_input_audio(self, audio_input_path, cache_analysis=False, **kwargs):
+        """
+        Loads an input file as normalized 16 kHz audio, through the analysis cache.
+
+        Args:
+            audio_input_path (str): Path to the input audio file.
+            cache_analysis (bool): Whether to use the analysis cache.
+            **kwargs: Additional keyword arguments passed to load_audio_infer.
+
+        Returns:
+            The audio and its analysis cache key (None when the cache is not used).
+        """
+        source_key = (
+            self.get_analysis_key(audio_input_path, **kwargs) if cache_analysis else None
+        )
+        audio = analysis_cache.load(source_key, "audio") if source_key else None
+        if audio is None:
+            audio = load_audio_infer(
+                audio_input_path,
+                16000,
+                **kwargs,
+            )
+            if source_key:
+                analysis_cache.save(source_key, "audio", audio)
+        audio_max = np.abs(audio).max() / 0.95
+
+        if audio_max > 1:
+            audio /= audio_max
+        return audio, source_key
+
+    def load_input_range(self, audio_input_path, start=None, end=None, **kwargs):
+        """
+        Loads a time range of an input file as normalized 16 kHz audio, decoding only the
+        range and the t_pad samples of context the pipeline needs on both sides of it.
+
+        The decoded audio starts on an F0 frame boundary and is normalized by the peak of
+        the whole input, so its converted output can be cropped to the range with sample
+        precision and dropped back into a conversion of the whole input. Finding that peak
+        still reads the whole file once, at its own sampling rate; it is remembered for
+        later ranges of the same unchanged file. As the peak is measured before
+        resampling and formant shifting, inputs peaking near full scale can be converted
+        at a slightly different gain than a full conversion.
+
+        Args:
+            audio_input_path (str): Path to the input audio file.
+            start (float): Start of the range in seconds (default is the start of the input).
+            end (float): End of the range in seconds (default is the end of the input).
+            **kwargs: Additional keyword arguments with the formant shifting settings.
+
+        Returns:
+            The audio and the slice of its converted output that covers the range.
+        """
+        path = audio_input_path.strip(" ").strip('"').strip("\n").strip('"').strip(" ")
+        info = sf.info(path)
+        duration = info.frames / info.samplerate
+        start = 0.0 if start is None else float(start)
+        end = duration if end is None else min(float(end), duration)
+        if not 0 <= start < end:
+            raise ValueError(f"Invalid time range: {start} to {end} seconds.")
+        window = self.vc.window
+        length = int(np.ceil(info.frames * 16000 / info.samplerate))
+        first = max(int(start * 16000) // window * window - self.vc.t_pad, 0)
+        last = min(
+            -(-int(np.ceil(end * 16000)) // window) * window + self.vc.t_pad, length
+        )
+        audio = load_audio_range(path, 16000, first, last)
+        if kwargs.get("formant_shifting", False):
+            audio = formant_shift(
+                audio,
+                16000,
+                kwargs.get("formant_qfrency", 0.8),
+                kwargs.get("formant_timbre", 0.8),
+            )
+        # the whole-file conversion scales inputs peaking above 0.95 down to 0.95
+        audio_max = get_input_peak(path) / 0.95
+        if audio_max > 1:
+            audio /= audio_max
+        print(
+            f"Converting {start:.3f} s to {end:.3f} s, decoding {(last - first) / 16000:.2f} s of {duration:.2f} s."
+        )
+        # output samples before the decoded audio
+        offset = first // window * (self.tgt_sr // (16000 // window))
+        return audio, slice(
+            round(start * self.tgt_sr) - offset, round(end * self.tgt_sr) - offset
+        )
+
+    def get_chunk_cache_keys(
+        self,
+        source_key,
+        split_audio,
+        chunk_index,
+        f0_method,
+        hop_length,
+        embedder_model,
+        embedder_model_custom,
+        whole_file_features,
+        version=None,
+        f0_gate_threshold=None,
+        f0_decimation=1,
+    ):
+        """
+        Builds the analysis cache keys of the F0 contour and features of an input chunk.
+
+        Args:
+            source_key (str): Analysis cache key of the input, or None when the cache is not used.
+            split_audio (bool): Whether the input was split on silences.
+            chunk_index (int): Index of the chunk within the input.
+            f0_method (str): Method for F0 extraction.
+            hop_length (int): Hop length for F0 extraction.
+            embedder_model (str): Name of the embedder model.
+            embedder_model_custom (str): Path to the custom embedder model.
+            whole_file_features (bool): Whether features are extracted once per input.
+            version (str): Model version the features are extracted for (default is the loaded model's).
+            f0_gate_threshold (float): Energy gate threshold of the F0 extraction, or None when it is not gated.
+            f0_decimation (int): Frame rate reduction factor of the F0 extraction.
+
+        Returns:
+            The F0 and feature cache keys, both None when the cache is not used.
+        """
+        if not source_key:
+            return None, None
+        chunk_key = analysis_cache.make_key(source_key, split_audio, chunk_index)
+        f0_cache_key = analysis_cache.make_key(
+            chunk_key,
+            "f0",
+            f0_method,
+            hop_length,
+            self.config.x_pad,
+            self.config.rmvpe_chunk_seconds,
+            f0_gate_threshold,
+            f0_decimation,
+            str(self.config.device),
+            self.config.is_half,
+        )
+        feature_cache_key = analysis_cache.make_key(
+            chunk_key,
+            "features",
+            embedder_model,
+            embedder_model_custom,
+            version or self.version,
+            whole_file_features,
+            str(self.config.device),
+            self.config.is_half,
+            self.config.x_pad,
+            self.config.x_query,
+            self.config.x_center,
+            self.config.x_max,
+        )
+        return f0_cache_key, feature_cache_key
+
+    def save_output_audio(
+        self,
+        audio_opt,
+        audio_output_path,
+        export_format,
+        clean_audio=False,
+        clean_strength=0.5,
+        post_process=False,
+        background=False,
+        **kwargs,
+    ):
+        """
+        Applies the optional cleaning and effects to converted audio and encodes it in the
+        requested formats, straight from memory on the encoder thread.
+
+        Args:
+            audio_opt (numpy.ndarray): The converted audio at the target sampling rate.
+            audio_output_path (str): Path to the output file; each format gets its extension.
+            export_format (str or list): Format or formats for exporting the audio.
+            clean_audio (bool): Whether to clean the audio.
+            clean_strength (float): Strength of the audio cleaning.
+            post_process (bool): Whether to apply the post-processing effects in kwargs.
+            background (bool): Whether to return before the files are written, leaving
+                self.encoder.wait to the caller.
+            **kwargs: Additional keyword arguments with the effect settings.
+
+        Returns:
+            The path of the file in the first requested format.
+        """
+        export_formats = parse_export_formats(export_format)
+        self.encoder.submit(
+            self.finish_output_audio,
+            audio_opt,
+            self.tgt_sr,
+            audio_output_path,
+            export_formats,
+            clean_audio,
+            clean_strength,
+            post_process,
+            **kwargs,
+        )
+        if not background:
+            self.encoder.wait()
+        return get_export_path(audio_output_path, export_formats[0])
+
+    def finish_output_audio(
+        self,
+        audio_opt,
+        sample_rate,
+        audio_output_path,
+        export_formats,
+        clean_audio=False,
+        clean_strength=0.5,
+        post_process=False,
+        **kwargs,
+    ):
+        """
+        Cleans, post-processes and encodes converted audio; the job queued by save_output_audio.
+
+        Args:
+            audio_opt (numpy.ndarray): The converted audio.
+            sample_rate (int): Sampling rate of the audio.
+            audio_output_path (str): Path to the output file; each format gets its extension.
+            export_formats (list): Formats for exporting the audio.
+            clean_audio (bool): Whether to clean the audio.
+            clean_strength (float): Strength of the audio cleaning.
+            post_process (bool): Whether to apply the post-processing effects in kwargs.
+            **kwargs: Additional keyword arguments with the effect settings.
+        """
+        if clean_audio:
+            cleaned_audio = self.remove_audio_noise(
+                audio_opt, sample_rate, clean_strength
+            )
+            if cleaned_audio is not None:
+                audio_opt = cleaned_audio
+
+        if post_process:
+            audio_opt = self.post_process_audio(
+                audio_input=audio_opt,
+                sample_rate=sample_rate,
+                **kwargs,
+            )
+
+        return encode_audio(audio_opt, sample_rate, audio_output_path, export_formats)
+
+    def convert_sweep(
+        self,
+        audio_input_path: str,
+        audio_output_path: str,
+        model_path: str,
+        index_path: str,
+        pitches: list = (0,),
+        index_rates: list = (0.75,),
+        protects: list = (0.5,),
+        filter_radius: int = 3,
+        f0_file: str = None,
+        f0_method: str = "rmvpe",
+        volume_envelope: float = 1,
+        hop_length: int = 128,
+        split_audio: bool = False,
+        f0_autotune: bool = False,
+        f0_autotune_strength: float = 1,
+        embedder_model: str = "contentvec",
+        embedder_model_custom: str = None,
+        clean_audio: bool = False,
+        clean_strength: float = 0.5,
+        export_format: str = "WAV",
+        post_process: bool = False,
+        resample_sr: int = 0,
+        sid: int = 0,
+        retrieval_backend: str = "auto",
+        synthesis_batch_size: int = 1,
+        whole_file_features: bool = False,
+        cache_analysis: bool = False,
+        concurrent_analysis: bool = False,
+        f0_threads: int = 0,
+        f0_energy_gate: bool = False,
+        f0_gate_threshold: float = DEFAULT_F0_GATE_THRESHOLD,
+        f0_decimation: int = 1,
+        **kwargs,
+    ):
+        """
+        Renders every combination of pitch, index rate and protection settings of an input
+        from a single analysis pass.
+
+        Decoding, F0 estimation, feature extraction and the index search run once; each grid
+        point only re-blends the features and runs the generator.
+
+        Args:
+            audio_input_path (str): Path to the input audio file.
+            audio_output_path (str): Folder the rendered files are written to.
+            model_path (str): Path to the voice conversion model.
+            index_path (str): Path to the index file.
+            pitches (list of int): Keys for F0 up-sampling.
+            index_rates (list of float): Rates for index matching.
+            protects (list of float): Protection rates for certain audio segments.
+            The remaining arguments are the same as for convert_audio.
+
+        Returns:
+            list of str: Paths of the rendered files, in grid order.
+        """
+        if not f0_energy_gate:
+            f0_gate_threshold = None
+        self.get_vc(model_path, sid)
+        output_paths = []
+        try:
+            start_time = time.time()
+            grid = list(itertools.product(pitches, index_rates, protects))
+            print(f"Rendering {len(grid)} variants of '{audio_input_path}'...")
+
+            cache_stats = analysis_cache.stats()
+            audio, source_key = self.load_input_audio(
+                audio_input_path, cache_analysis, **kwargs
+            )
+
+            if not self.hubert_model or embedder_model != self.last_embedder_model:
+                self.load_hubert(embedder_model, embedder_model_custom)
+                self.last_embedder_model = embedder_model
+
+            file_index = (
+                index_path.strip()
+                .strip('"')
+                .strip("\n")
+                .strip('"')
+                .strip()
+                .replace("trained", "added")
+            )
+
+            if self.tgt_sr != resample_sr >= 16000:
+                self.tgt_sr = resample_sr
+
+            if split_audio:
+                chunks, intervals = process_audio(audio, 16000)
+                print(f"Audio split into {len(chunks)} chunks for processing.")
+            else:
+                chunks = [audio]
+
+            analyses = []
+            for i, c in enumerate(chunks):
+                f0_cache_key, feature_cache_key = self.get_chunk_cache_keys(
+                    source_key,
+                    split_audio,
+                    i,
+                    f0_method,
+                    hop_length,
+                    embedder_model,
+                    embedder_model_custom,
+                    whole_file_features,
+                    f0_gate_threshold=f0_gate_threshold,
+                    f0_decimation=f0_decimation,
+                )
+                analyses.append(
+                    self.vc.analyze(
+                        model=self.hubert_model,
+                        audio=c,
+                        f0_method=f0_method,
+                        pitch_guidance=self.use_f0,
+                        version=self.version,
+                        hop_length=hop_length,
+                        filter_radius=filter_radius,
+                        f0_file=f0_file,
+                        whole_file_features=whole_file_features,
+                        f0_cache_key=f0_cache_key,
+                        feature_cache_key=feature_cache_key,
+                        concurrent_analysis=concurrent_analysis,
+                        f0_threads=f0_threads,
+                        f0_gate_threshold=f0_gate_threshold,
+                        f0_decimation=f0_decimation,
+                    )
+                )
+            retriever = (
+                self.vc.load_retriever(file_index, retrieval_backend)
+                if any(index_rate > 0 for index_rate in index_rates)
+                else None
+            )
+            analysis_time = time.time() - start_time
+            print(f"Analysis completed in {analysis_time:.2f} seconds.")
+
+            os.makedirs(audio_output_path, exist_ok=True)
+            name = os.path.splitext(os.path.basename(audio_input_path.strip()))[0]
+            render_times = []
+            for pitch, index_rate, protect in grid:
+                render_start = time.time()
+                converted_chunks = [
+                    self.vc.render(
+                        analysis,
+                        net_g=self.net_g,
+                        sid=sid,
+                        pitch=pitch,
+                        retriever=retriever if index_rate > 0 else None,
+                        index_rate=index_rate,
+                        volume_envelope=volume_envelope,
+                        protect=protect,
+                        f0_autotune=f0_autotune,
+                        f0_autotune_strength=f0_autotune_strength,
+                        synthesis_batch_size=synthesis_batch_size,
+                    )
+                    for analysis in analyses
+                ]
+                if split_audio:
+                    audio_opt = merge_audio(
+                        converted_chunks, intervals, 16000, self.tgt_sr
+                    )
+                else:
+                    audio_opt = converted_chunks[0]
+                output_path = self.save_output_audio(
+                    audio_opt,
+                    os.path.join(
+                        audio_output_path,
+                        f"{name}_pitch{pitch}_index{index_rate:g}_protect{protect:g}.wav",
+                    ),
+                    export_format,
+                    clean_audio,
+                    clean_strength,
+                    post_process,
+                    background=True,
+                    **kwargs,
+                )
+                output_paths.append(output_path)
+                render_times.append(time.time() - render_start)
+                print(f"Rendered '{output_path}' in {render_times[-1]:.2f} seconds.")
+
+            self.encoder.wait()
+            elapsed_time = time.time() - start_time
+            print(
+                f"Sweep of {len(grid)} variants completed in {elapsed_time:.2f} seconds: "
+                f"analysis {analysis_time:.2f} s once, "
+                f"{np.mean(render_times):.2f} s per variant."
+            )
+            print(
+                f"Separate conversions would repeat the analysis {len(grid)} times "
+                f"(about {len(grid) * analysis_time + sum(render_times):.2f} seconds)."
+            )
+            if cache_analysis:
+                print(
+                    f"Analysis cache: {analysis_cache.format_stats(cache_stats, analysis_cache.stats())}."
+                )
+        except Exception as error:
+            print(f"An error occurred during the parameter sweep: {error}")
+            print(traceback.format_exc())
+        return output_paths
+
+    def convert_fanout(
+        self,
+        audio_input_path: str,
+        audio_output_path: str,
+        models: list,
+        pitch: int = 0,
+        index_rate: float = 0.75,
+        volume_envelope: float = 1,
+        protect: float = 0.5,
+        filter_radius: int = 3,
+        hop_length: int = 128,
+        f0_method: str = "rmvpe",
+        split_audio: bool = False,
+        f0_autotune: bool = False,
+        f0_autotune_strength: float = 1,
+        f0_file: str = None,
+        embedder_model: str = "contentvec",
+        embedder_model_custom: str = None,
+        clean_audio: bool = False,
+        clean_strength: float = 0.5,
+        export_format: str = "WAV",
+        post_process: bool = False,
+        resample_sr: int = 0,
+        sid: int = 0,
+        retrieval_backend: str = "auto",
+        synthesis_batch_size: int = 1,
+        whole_file_features: bool = False,
+        cache_analysis: bool = False,
+        concurrent_analysis: bool = False,
+        f0_threads: int = 0,
+        f0_energy_gate: bool = False,
+        f0_gate_threshold: float = DEFAULT_F0_GATE_THRESHOLD,
+        f0_decimation: int = 1,
+        max_cached_models: int = DEFAULT_MAX_CACHED_MODELS,
+        **kwargs,
+    ):
+        """
+        Converts one input with several voice models, sharing its analysis between them.
+
+        The input is decoded once, and filtered, pitch-tracked and embedded once per embedder
+        model. Each voice model then only runs its index search and synthesizer. The embedder
+        output is kept in its raw (v2) form and projected for v1 models, and the F0 contour is
+        estimated once for all models that use pitch guidance.
+
+        Args:
+            audio_input_path (str): Path to the input audio file.
+            audio_output_path (str): Folder the converted files are written to.
+            models (list): (model_path, index_path) pairs, optionally extended with an
+                embedder_model and embedder_model_custom overriding the defaults for that model.
+            embedder_model (str): Embedder model used by models that do not set their own.
+            embedder_model_custom (str): Path to the custom embedder model used by models that do not set their own.
+            max_cached_models (int): Number of loaded synthesizers kept in memory while converting, so models are not reloaded. They are released when the conversion ends.
+            The remaining arguments are the same as for convert_audio.
+
+        Returns:
+            list of str: Paths of the converted files, in the order of models.
+        """
+        if not f0_energy_gate:
+            f0_gate_threshold = None
+        output_paths = [None] * len(models)
+        self.max_cached_models = max_cached_models
+        try:
+            start_time = time.time()
+            print(f"Converting '{audio_input_path}' with {len(models)} models...")
+            cache_stats = analysis_cache.stats()
+            audio, source_key = self.load_input_audio(
+                audio_input_path, cache_analysis, **kwargs
+            )
+            if split_audio:
+                chunks, intervals = process_audio(audio, 16000)
+                print(f"Audio split into {len(chunks)} chunks for processing.")
+            else:
+                chunks = [audio]
+            load_time = time.time() - start_time
+
+            # group the models by embedder so each group shares one analysis
+            groups = OrderedDict()
+            for i, model in enumerate(models):
+                model_path, index_path, *embedder = model
+                embedder = tuple(embedder) + (embedder_model, embedder_model_custom)[
+                    len(embedder) :
+                ]
+                groups.setdefault(embedder, []).append((i, model_path, index_path))
+
+            os.makedirs(audio_output_path, exist_ok=True)
+            name = os.path.splitext(os.path.basename(audio_input_path.strip()))[0]
+            separate_time = 0
+            for (group_embedder, group_embedder_custom), group in groups.items():
+                # a pipeline instance is needed to run the analysis
+                first_model_start = time.time()
+                self.get_vc(group[0][1], sid)
+                first_model_time = time.time() - first_model_start
+                analysis_start = time.time()
+                if (
+                    not self.hubert_model
+                    or group_embedder != self.last_embedder_model
+                ):
+                    self.load_hubert(group_embedder, group_embedder_custom)
+                    self.last_embedder_model = group_embedder
+                analyses = []
+                for c, chunk in enumerate(chunks):
+                    f0_cache_key, feature_cache_key = self.get_chunk_cache_keys(
+                        source_key,
+                        split_audio,
+                        c,
+                        f0_method,
+                        hop_length,
+                        group_embedder,
+                        group_embedder_custom,
+                        whole_file_features,
+                        version="v2",
+                        f0_gate_threshold=f0_gate_threshold,
+                        f0_decimation=f0_decimation,
+                    )
+                    analyses.append(
+                        self.vc.analyze(
+                            model=self.hubert_model,
+                            audio=chunk,
+                            f0_method=f0_method,
+                            pitch_guidance=True,
+                            version="v2",
+                            hop_length=hop_length,
+                            filter_radius=filter_radius,
+                            f0_file=f0_file,
+                            whole_file_features=whole_file_features,
+                            f0_cache_key=f0_cache_key,
+                            feature_cache_key=feature_cache_key,
+                            concurrent_analysis=concurrent_analysis,
+                            f0_threads=f0_threads,
+                            f0_gate_threshold=f0_gate_threshold,
+                            f0_decimation=f0_decimation,
+                        )
+                    )
+                analysis_time = time.time() - analysis_start
+                print(
+                    f"Analysis with '{group_embedder}' completed in {analysis_time:.2f} seconds."
+                )
+
+                views = {}
+                for i, model_path, index_path in group:
+                    model_start = time.time()
+                    self.get_vc(model_path, sid)
+                    view_key = (self.version, bool(self.use_f0))
+                    if view_key not in views:
+                        views[view_key] = [
+                            self.vc.adapt_analysis(
+                                analysis, self.hubert_model, self.version, self.use_f0
+                            )
+                            for analysis in analyses
+                        ]
+                    file_index = (
+                        index_path.strip()
+                        .strip('"')
+                        .strip("\n")
+                        .strip('"')
+                        .strip()
+                        .replace("trained", "added")
+                    )
+                    retriever = (
+                        self.vc.load_retriever(file_index, retrieval_backend)
+                        if index_rate > 0
+                        else None
+                    )
+                    if self.tgt_sr != resample_sr >= 16000:
+                        self.tgt_sr = resample_sr
+                    converted_chunks = [
+                        self.vc.render(
+                            analysis,
+                            net_g=self.net_g,
+                            sid=sid,
+                            pitch=pitch,
+                            retriever=retriever,
+                            index_rate=index_rate,
+                            volume_envelope=volume_envelope,
+                            protect=protect,
+                            f0_autotune=f0_autotune,
+                            f0_autotune_strength=f0_autotune_strength,
+                            synthesis_batch_size=synthesis_batch_size,
+                        )
+                        for analysis in views[view_key]
+                    ]
+                    if split_audio:
+                        audio_opt = merge_audio(
+                            converted_chunks, intervals, 16000, self.tgt_sr
+                        )
+                    else:
+                        audio_opt = converted_chunks[0]
+                    model_name = os.path.splitext(os.path.basename(model_path))[0]
+                    output_paths[i] = self.save_output_audio(
+                        audio_opt,
+                        os.path.join(audio_output_path, f"{name}_{model_name}.wav"),
+                        export_format,
+                        clean_audio,
+                        clean_strength,
+                        post_process,
+                        background=True,
+                        **kwargs,
+                    )
+                    model_time = time.time() - model_start
+                    if i == group[0][0]:
+                        model_time += first_model_time
+                    separate_time += load_time + analysis_time + model_time
+                    print(
+                        f"Converted with '{model_path}' in {model_time:.2f} seconds: '{output_paths[i]}'."
+                    )
+
+            self.encoder.wait()
+            elapsed_time = time.time() - start_time
+            audio_seconds = audio.shape[0] / 16000 * len(models)
+            print(
+                f"Fan-out to {len(models)} models completed in {elapsed_time:.2f} seconds "
+                f"({audio_seconds / elapsed_time:.2f} seconds of output per second)."
+            )
+            print(
+                f"Separate conversions would take about {separate_time:.2f} seconds "
+                f"({audio_seconds / separate_time:.2f} seconds of output per second), "
+                f"{separate_time / elapsed_time:.2f}x slower."
+            )
+            if cache_analysis:
+                print(
+                    f"Analysis cache: {analysis_cache.format_stats(cache_stats, analysis_cache.stats())}."
+                )
+        except Exception as error:
+            print(f"An error occurred during the fan-out conversion: {error}")
+            print(traceback.format_exc())
+        finally:
+            self.max_cached_models = 0
+            self.model_cache.clear()
+        return output_paths
+
+    def create_stream(
+        self,
+        model_path: str,
+        index_path: str = "",
+        pitch: int = 0,
+        index_rate: float = 0.0,
+        protect: float = 0.5,
+        hop_length: int = 128,
+        f0_method: str = "rmvpe",
+        filter_radius: int = 3,
+        f0_autotune: bool = False,
+        f0_autotune_strength: float = 1,
+        embedder_model: str = "contentvec",
+        embedder_model_custom: str = None,
+        sid: int = 0,
+        retrieval_backend: str = "auto",
+        block_seconds: float = DEFAULT_BLOCK_SECONDS,
+        context_seconds: float = DEFAULT_CONTEXT_SECONDS,
+        crossfade_seconds: float = DEFAULT_CROSSFADE_SECONDS,
+    ):
+        """
+        Loads a voice model and returns a StreamingConverter that converts 16 kHz input
+        block by block.
+
+        Args:
+            model_path (str): Path to the voice conversion model.
+            index_path (str): Path to the index file.
+            block_seconds (float): Length of the input blocks.
+            context_seconds (float): Length of past input analysed together with each block.
+            crossfade_seconds (float): Length of the crossfade between output blocks.
+            The remaining arguments are the same as for convert_audio.
+        """
+        self.get_vc(model_path, sid)
+        if not self.hubert_model or embedder_model != self.last_embedder_model:
+            self.load_hubert(embedder_model, embedder_model_custom)
+            self.last_embedder_model = embedder_model
+        file_index = (
+            index_path.strip()
+            .strip('"')
+            .strip("\n")
+            .strip('"')
+            .strip()
+            .replace("trained", "added")
+        )
+        retriever = (
+            self.vc.load_retriever(file_index, retrieval_backend)
+            if index_rate > 0
+            else None
+        )
+        return StreamingConverter(
+            self.vc,
+            self.hubert_model,
+            self.net_g,
+            sid,
+            self.version,
+            self.use_f0,
+            self.tgt_sr,
+            pitch=pitch,
+            f0_method=f0_method,
+            hop_length=hop_length,
+            filter_radius=filter_radius,
+            retriever=retriever,
+            index_rate=index_rate,
+            protect=protect,
+            f0_autotune=f0_autotune,
+            f0_autotune_strength=f0_autotune_strength,
+            block_seconds=block_seconds,
+            context_seconds=context_seconds,
+            crossfade_seconds=crossfade_seconds,
+        )
+
+    def convert_stream(
+        self,
+        audio_input_path: str,
+        audio_output_path: str,
+        model_path: str,
+        index_path: str = "",
+        export_format: str = "WAV",
+        clean_audio: bool = False,
+        clean_strength: float = 0.5,
+        post_process: bool = False,
+        **kwargs,
+    ):
+        """
+        Converts an input file through the streaming engine, feeding it block by block as
+        live input would arrive, and reports the latency and per-block compute times.
+
+        The output is shifted back by the crossfade delay so it lines up with the input.
+
+        Args:
+            audio_input_path (str): Path to the input audio file.
+            audio_output_path (str): Path to the output audio file.
+            model_path (str): Path to the voice conversion model.
+            index_path (str): Path to the index file.
+            export_format (str): Format for exporting the audio.
+            clean_audio (bool): Whether to clean the audio.
+            clean_strength (float): Strength of the audio cleaning.
+            post_process (bool): Whether to apply the post-processing effects in kwargs.
+            **kwargs: Arguments of create_stream, load_audio_infer and the post-processing effects.
+
+        Returns:
+            dict: The stream statistics.
+        """
+        stream_parameters = inspect.signature(self.create_stream).parameters
+        stream_kwargs = {
+            key: kwargs.pop(key) for key in list(kwargs) if key in stream_parameters
+        }
+        try:
+            stream = self.create_stream(model_path, index_path, **stream_kwargs)
+            audio = load_audio_infer(audio_input_path, 16000, **kwargs)
+            audio_max = np.abs(audio).max() / 0.95
+            if audio_max > 1:
+                audio /= audio_max
+            output_length = audio.shape[0] * self.tgt_sr // 16000
+            blocks = -(-audio.shape[0] // stream.block_size)
+            audio = np.pad(audio, (0, blocks * stream.block_size - audio.shape[0]))
+            print(
+                f"Streaming '{audio_input_path}' in {blocks} blocks, "
+                f"{1000 * stream.latency:.0f} ms algorithmic latency..."
+            )
+            audio_opt = [
+                stream.process_block(block)
+                for block in audio.reshape(blocks, stream.block_size)
+            ]
+            audio_opt.append(stream.flush())
+            audio_opt = np.concatenate(audio_opt)[stream.crossfade_size_tgt :]
+            audio_opt = audio_opt[:output_length]
+            audio_max = np.abs(audio_opt).max() / 0.99
+            if audio_max > 1:
+                audio_opt /= audio_max
+            print(stream.format_stats())
+            self.save_output_audio(
+                audio_opt,
+                audio_output_path,
+                export_format,
+                clean_audio,
+                clean_strength,
+                post_process,
+                **kwargs,
+            )
+            print(f"Conversion completed at '{audio_output_path}'.")
+            return stream.stats()
+        except Exception as error:
+            print(f"An error occurred during streaming conversion: {error}")
+            print(traceback.format_exc())
+
+    def convert_pipe(
+        self,
+        audio_input_path: str,
+        audio_output_path: str,
+        model_path: str,
+        index_path: str = "",
+        export_format: str = "WAV",
+        clean_audio: bool = False,
+        clean_strength: float = 0.5,
+        post_process: bool = False,
+        pipe_sample_format: str = "s16le",
+        pipe_sample_rate: int = 16000,
+        pipe_channels: int = 1,
+        pipe_wav_header: bool = False,
+        pipe_output_sample_rate: int = 0,
+        pipe_block_seconds: float = DEFAULT_PIPE_BLOCK_SECONDS,
+        stdin=None,
+        stdout=None,
+        **kwargs,
+    ):
+        """
+        Converts audio read incrementally from stdin and/or written incrementally to stdout,
+        so the conversion can sit in a shell pipeline without temporary files.
+
+        Either path may be "-". Input from stdin is raw PCM in the given format, or WAV,
+        recognized by its header. Output to stdout is PCM at the model's sampling rate,
+        written as each block is converted. Blocks go through the streaming engine with
+        pipe_block_seconds blocks, and running peak limiters stand in for the whole-file
+        normalization of convert_audio. Log messages go to stderr while stdout carries audio.
+
+        Args:
+            audio_input_path (str): Path to the input audio file, or "-" for stdin.
+            audio_output_path (str): Path to the output audio file, or "-" for stdout.
+            model_path (str): Path to the voice conversion model.
+            index_path (str): Path to the index file.
+            export_format (str): Format for exporting the audio to a file.
+            clean_audio (bool): Whether to clean the audio written to a file.
+            clean_strength (float): Strength of the audio cleaning.
+            post_process (bool): Whether to apply the post-processing effects in kwargs.
+            pipe_sample_format (str): Sample format of raw PCM input and of the output ("s16le", "s32le" or "f32le").
+            pipe_sample_rate (int): Sampling rate of raw PCM input.
+            pipe_channels (int): Number of channels of raw PCM input.
+            pipe_wav_header (bool): Whether to start the output on stdout with a WAV header.
+            pipe_output_sample_rate (int): Sampling rate of the output on stdout, 0 for the model's.
+            pipe_block_seconds (float): Length of the blocks converted at a time.
+            stdin: Binary input stream (default is sys.stdin).
+            stdout: Binary output stream (default is sys.stdout).
+            **kwargs: Arguments of create_stream, load_audio_infer and the post-processing effects.
+
+        Returns:
+            dict: The stream statistics.
+        """
+        stdin = stdin or sys.stdin.buffer
+        stdout = stdout or sys.stdout.buffer
+        to_stdout = audio_output_path == PIPE_PATH
+        stream_parameters = inspect.signature(self.create_stream).parameters
+        stream_kwargs = {
+            key: kwargs.pop(key) for key in list(kwargs) if key in stream_parameters
+        }
+        stream_kwargs["block_seconds"] = pipe_block_seconds
+        ignored = [
+            name
+            for name, default in PIPE_UNSUPPORTED_OPTIONS.items()
+            if kwargs.get(name, default) != default
+        ]
+        if clean_audio and to_stdout:
+            ignored.append("clean_audio")
+        # log messages must not end up in the audio written to stdout
+        redirect = (
+            contextlib.redirect_stdout(sys.stderr)
+            if to_stdout
+            else contextlib.nullcontext()
+        )
+        with redirect:
+            try:
+                if ignored:
+                    print(
+                        f"Options not supported when converting through a pipe, ignored: {', '.join(ignored)}."
+                    )
+                stream = self.create_stream(model_path, index_path, **stream_kwargs)
+                if audio_input_path == PIPE_PATH:
+                    reader = PCMReader(
+                        stdin,
+                        16000,
+                        pipe_sample_format,
+                        pipe_sample_rate,
+                        pipe_channels,
+                    )
+                    blocks = reader.blocks(stream.block_size)
+                else:
+                    reader = None
+                    audio, _ = self.load_input_audio(audio_input_path, False, **kwargs)
+                    input_length = audio.shape[0]
+                    count = -(-input_length // stream.block_size)
+                    audio = np.pad(audio, (0, count * stream.block_size - input_length))
+                    blocks = audio.reshape(count, stream.block_size)
+                input_limiter = PeakLimiter(0.95)
+                print(
+                    f"Converting '{audio_input_path}' to '{audio_output_path}' in blocks of "
+                    f"{1000 * stream.block_size / 16000:.0f} ms..."
+                )
+
+                def converted():
+                    for block in blocks:
+                        yield stream.process_block(input_limiter(block))
+                    yield stream.flush()
+
+                if to_stdout:
+                    writer = PCMWriter(
+                        stdout,
+                        self.tgt_sr,
+                        pipe_output_sample_rate or self.tgt_sr,
+                        pipe_sample_format,
+                        pipe_wav_header,
+                    )
+                    output_limiter = PeakLimiter(0.99)
+                    board = self.get_effects_board(**kwargs) if post_process else None
+                collected = []
+                # the output is delayed by the crossfade, which is shorter than a block
+                skip = stream.crossfade_size_tgt
+                written = 0
+                for audio_opt in converted():
+                    audio_opt = audio_opt[skip:]
+                    skip = 0
+                    if reader is None or reader.finished:
+                        if reader is not None:
+                            input_length = reader.length
+                        output_length = input_length * self.tgt_sr // 16000
+                        audio_opt = audio_opt[: max(output_length - written, 0)]
+                    written += audio_opt.shape[0]
+                    if not to_stdout:
+                        collected.append(audio_opt)
+                        continue
+                    audio_opt = output_limiter(audio_opt)
+                    if board is not None:
+                        audio_opt = board(audio_opt, self.tgt_sr, reset=False)
+                    writer.write(audio_opt)
+
+                if to_stdout:
+                    writer.write(np.zeros(0, dtype=np.float32), last=True)
+                else:
+                    audio_opt = np.concatenate(collected)
+                    audio_max = np.abs(audio_opt).max() / 0.99
+                    if audio_max > 1:
+                        audio_opt /= audio_max
+                    self.save_output_audio(
+                        audio_opt,
+                        audio_output_path,
+                        export_format,
+                        clean_audio,
+                        clean_strength,
+                        post_process,
+                        **kwargs,
+                    )
+                print(stream.format_stats())
+                print(f"Conversion completed at '{audio_output_path}'.")
+                return stream.stats()
+            except Exception as error:
+                print(f"An error occurred during pipe conversion: {error}")
+                print(traceback.format_exc())
+
+    @staticmethod
+    def get_analysis_key(audio_input_path, **kwargs):
+        """
+        Builds the analysis cache key of an input file from its content and the decoding settings.
+
+        Args:
+            audio_input_path (str): Path to the input audio file.
+            **kwargs: Additional keyword arguments, of which the formant shifting settings are used.
+        """
+        path = audio_input_path.strip(" ").strip('"').strip("\n").strip('"').strip(" ")
+        try:
+            content_hash = analysis_cache.hash_file(path)
+        except OSError:
+            return None
+        formant = (
+            (kwargs.get("formant_qfrency", 0.8), kwargs.get("formant_timbre", 0.8))
+            if kwargs.get("formant_shifting", False)
+            else None
+        )
+        return analysis_cache.make_key(content_hash, 16000, formant)
+
     def convert_audio_batch(
         self,
         audio_input_paths: str,
@@ -371,6 +1745,7 @@ class VoiceConverter:
             ) as pid_file:
                 pid_file.write(str(pid))
             start_time = time.time()
+            analysis_stats = analysis_cache.stats()
             print(f"Converting audio batch '{audio_input_paths}'...")
             audio_files = [
                 f
@@ -394,20 +1769,38 @@ class VoiceConverter:
                 )
             ]
             print(f"Detected {len(audio_files)} audio files for inference.")
+            export_format = parse_export_formats(kwargs.get("export_format", "WAV"))[0]
             for a in audio_files:
                 new_input = os.path.join(audio_input_paths, a)
                 new_output = os.path.splitext(a)[0] + "_output.wav"
                 new_output = os.path.join(audio_output_path, new_output)
-                if os.path.exists(new_output):
+                if os.path.exists(get_export_path(new_output, export_format)):
                     continue
+                # each output is encoded while the next file converts
                 self.convert_audio(
                     audio_input_path=new_input,
                     audio_output_path=new_output,
+                    background_encoding=True,
                     **kwargs,
                 )
+            self.encoder.wait()
             print(f"Conversion completed at '{audio_input_paths}'.")
             elapsed_time = time.time() - start_time
             print(f"Batch conversion completed in {elapsed_time:.2f} seconds.")
+            cache_stats = index_cache.stats()
+            print(
+                f"Index cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+                f"{cache_stats['bytes'] / 1024**2:.1f} MB resident."
+            )
+            predictor_stats = predictor_registry.stats()
+            print(
+                f"F0 predictors: {predictor_stats['misses']} loaded in {predictor_stats['load_time']:.2f} seconds, "
+                f"{predictor_stats['hits']} reused, {predictor_stats['bytes'] / 1024**2:.1f} MB resident."
+            )
+            if kwargs.get("cache_analysis", False):
+                print(
+                    f"Analysis cache: {analysis_cache.format_stats(analysis_stats, analysis_cache.stats())}."
+                )
         except Exception as error:
             print(f"An error occurred during audio batch conversion: {error}")
             print(traceback.format_exc())
@@ -428,12 +1821,42 @@ class VoiceConverter:
                 torch.cuda.empty_cache()
 
         if not self.loaded_model or self.loaded_model != weight_root:
-            self.load_model(weight_root)
-            if self.cpt is not None:
-                self.setup_network()
+            cached = self.model_cache.get(weight_root)
+            if cached is not None:
+                self.model_cache.move_to_end(weight_root)
+                self.cpt = None
+                for name, value in cached.items():
+                    setattr(self, name, value)
                 self.setup_vc_instance()
+            else:
+                self.load_model(weight_root)
+                if self.cpt is not None:
+                    self.setup_network()
+                    self.setup_vc_instance()
+                    self.cache_model(weight_root)
             self.loaded_model = weight_root
 
+    def cache_model(self, weight_root):
+        """
+        Keeps the loaded synthesizer in memory so switching back to it skips loading,
+        dropping the least recently used ones beyond max_cached_models.
+
+        Args:
+            weight_root (str): Path to the model weights.
+        """
+        if self.max_cached_models < 1:
+            return
+        self.model_cache[weight_root] = {
+            "net_g": self.net_g,
+            "tgt_sr": self.tgt_sr,
+            "use_f0": self.use_f0,
+            "version": self.version,
+            "text_enc_hidden_dim": self.text_enc_hidden_dim,
+            "n_spk": self.n_spk,
+        }
+        while len(self.model_cache) > self.max_cached_models:
+            self.model_cache.popitem(last=False)
+
     def cleanup_model(self):
         """
         Cleans up the model and releases resources.
@@ -445,6 +1868,9 @@ class VoiceConverter:
                 torch.cuda.empty_cache()
 
         del self.net_g, self.cpt
+        self.model_cache.clear()
+        self.pipelines.clear()
+        self.loaded_model = None
         if torch.cuda.is_available():
             torch.cuda.empty_cache()
         self.cpt = None
@@ -491,5 +1917,7 @@ class VoiceConverter:
         Sets up the voice conversion pipeline instance based on the target sampling rate and configuration.
         """
         if self.cpt is not None:
-            self.vc = VC(self.tgt_sr, self.config)
             self.n_spk = self.cpt["config"][-3]
+        if self.tgt_sr not in self.pipelines:
+            self.pipelines[self.tgt_sr] = VC(self.tgt_sr, self.config)
+        self.vc = self.pipelines[self.tgt_sr]
@@ -0,0 +1,128 @@
+import os
+import json
+import numpy as np
+import soundfile as sf
+from functools import lru_cache
+
+from rvc_cli.rvc.lib.tools.segmentation import find_quietest_point
+
+# Frames per block when scanning or rewriting a file in constant memory
+SCAN_BLOCK_FRAMES = 65536
+# Number of input files whose peak is kept by get_input_peak
+PEAK_CACHE_SIZE = 32
+
+
+def scan_peak(path, blocksize=SCAN_BLOCK_FRAMES, mono=False):
+    """
+    Returns the peak absolute sample value of an audio file, reading it block by block.
+
+    Args:
+        path: Path to the audio file.
+        blocksize: Number of frames read at a time.
+        mono: Whether to measure the peak of the channels' average, as the audio is
+            downmixed for conversion, rather than of every channel.
+    """
+    peak = 0.0
+    for block in sf.blocks(path, blocksize=blocksize, dtype="float32"):
+        if mono and block.ndim > 1:
+            block = block.mean(axis=1)
+        if block.size:
+            peak = max(peak, float(np.abs(block).max()))
+    return peak
+
+
+@lru_cache(maxsize=PEAK_CACHE_SIZE)
+def _scan_file_peak(path, mtime_ns, size):
+    return scan_peak(path, mono=True)
+
+
+def get_input_peak(path):
+    """
+    Returns the peak of an input file downmixed to mono, at its own sampling rate.
+
+    Scanning costs a full read of the file, without resampling, so the result is kept per
+    path, modification time and size and later ranges of an unchanged file reuse it.
+
+    Args:
+        path: Path to the audio file.
+    """
+    stat = os.stat(path)
+    return _scan_file_peak(os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+
+def find_window_end(audio, offset, start, center, query, window):
+    """
+    Chooses where a conversion window ends: the quietest window-sample run within query
+    samples of center samples after its start, as the pipeline cuts long inputs into
+    segments, rounded down to a whole F0 frame.
+
+    Args:
+        audio: Input samples, starting offset samples before the window.
+        offset: Number of samples of audio before the window start.
+        start: Position of the window start in the input.
+        center: Nominal window length, in samples.
+        query: Search radius around the nominal end, in samples.
+        window: Number of samples summed to measure loudness, and F0 frame length.
+
+    Returns:
+        The position of the window end in the input.
+    """
+    # padded so that position p of the search sums the samples centred on start + p
+    audio_pad = np.pad(audio[offset:], (window // 2, 0))
+    stop = min(center + query, audio_pad.shape[0] - window + 1)
+    end = find_quietest_point(audio_pad, center - query, stop, window)
+    return start + end // window * window
+
+
+class ConversionCheckpoint:
+    """
+    Progress of a constant-memory conversion, stored as JSON next to its partial output.
+
+    The checkpoint holds a signature of the input file and conversion settings, and is
+    only resumed from when the signature still matches. It is replaced atomically, after
+    the partial output has been flushed, so it never claims more output than was written.
+    """
+
+    def __init__(self, path, signature):
+        """
+        Initializes the ConversionCheckpoint.
+
+        Args:
+            path: Path of the checkpoint file.
+            signature: JSON-serializable description of the input and settings.
+        """
+        self.path = path
+        # compare in the form the signature takes after a JSON round trip
+        self.signature = json.loads(json.dumps(signature))
+
+    def load(self):
+        """
+        Returns the saved progress, or None when there is no checkpoint for this signature.
+        """
+        try:
+            with open(self.path, "r") as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if checkpoint.get("signature") != self.signature:
+            return None
+        return checkpoint["state"]
+
+    def save(self, state):
+        """
+        Stores the progress of the conversion.
+
+        Args:
+            state: JSON-serializable progress of the conversion.
+        """
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"signature": self.signature, "state": state}, f, indent=2)
+        os.replace(temp_path, self.path)
+
+    def remove(self):
+        """
+        Deletes the checkpoint file.
+        """
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,303 @@
+import struct
+import numpy as np
+import soxr
+
+# Path that stands for stdin or stdout
+PIPE_PATH = "-"
+# NumPy dtypes of the raw PCM sample formats
+PCM_FORMATS = {"s16le": "<i2", "s32le": "<i4", "f32le": "<f4"}
+# Input frames read from a pipe at a time
+PIPE_READ_FRAMES = 4096
+# Default length of the blocks converted from a pipe, in seconds
+DEFAULT_PIPE_BLOCK_SECONDS = 1.0
+# Size written in the RIFF and data headers of a WAV stream of unknown length
+WAV_STREAM_SIZE = 0xFFFFFFFF
+
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_IEEE_FLOAT = 3
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def read_exact(stream, size):
+    """
+    Reads size bytes from a binary stream, fewer only when it ends.
+
+    Args:
+        stream: The binary stream.
+        size: Number of bytes to read.
+    """
+    data = bytearray()
+    while len(data) < size:
+        chunk = stream.read(size - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return bytes(data)
+
+
+def read_wav_header(stream, prefix=b""):
+    """
+    Reads the header of a WAV stream up to the start of its data chunk.
+
+    The size of the data chunk is ignored, as programs writing WAV to a pipe cannot know
+    it in advance; the data runs until the stream ends.
+
+    Args:
+        stream: The binary stream.
+        prefix: Bytes of the header already read from the stream.
+
+    Returns:
+        The sampling rate, number of channels and PCM sample format of the stream.
+    """
+    header = prefix + read_exact(stream, 12 - len(prefix))
+    if header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+        raise ValueError("The input is not a WAV stream.")
+    fmt = None
+    while True:
+        chunk = read_exact(stream, 8)
+        if len(chunk) < 8:
+            raise ValueError("The WAV stream ended before its data chunk.")
+        chunk_id, size = chunk[:4], struct.unpack("<I", chunk[4:])[0]
+        if chunk_id == b"data":
+            break
+        # chunks are padded to an even size
+        body = read_exact(stream, size + size % 2)
+        if chunk_id == b"fmt ":
+            tag, channels, sample_rate = struct.unpack("<HHI", body[:8])
+            bits = struct.unpack("<H", body[14:16])[0]
+            if tag == WAVE_FORMAT_EXTENSIBLE:
+                tag = struct.unpack("<H", body[24:26])[0]
+            fmt = (tag, channels, sample_rate, bits)
+    if fmt is None:
+        raise ValueError("The WAV stream has no fmt chunk.")
+    tag, channels, sample_rate, bits = fmt
+    sample_format = {
+        (WAVE_FORMAT_PCM, 16): "s16le",
+        (WAVE_FORMAT_PCM, 32): "s32le",
+        (WAVE_FORMAT_IEEE_FLOAT, 32): "f32le",
+    }.get((tag, bits))
+    if sample_format is None:
+        raise ValueError(
+            f"Unsupported WAV sample format (format tag {tag}, {bits} bits). Use 16 or 32-bit PCM or 32-bit float."
+        )
+    return sample_rate, channels, sample_format
+
+
+def wav_stream_header(sample_rate, channels, sample_format):
+    """
+    Returns the header of a WAV stream of unknown length.
+
+    Args:
+        sample_rate: Sampling rate of the stream.
+        channels: Number of channels.
+        sample_format: PCM sample format, one of PCM_FORMATS.
+    """
+    dtype = np.dtype(PCM_FORMATS[sample_format])
+    tag = WAVE_FORMAT_IEEE_FLOAT if dtype.kind == "f" else WAVE_FORMAT_PCM
+    block_align = channels * dtype.itemsize
+    return (
+        b"RIFF"
+        + struct.pack("<I", WAV_STREAM_SIZE)
+        + b"WAVE"
+        + b"fmt "
+        + struct.pack(
+            "<IHHIIHH",
+            16,
+            tag,
+            channels,
+            sample_rate,
+            sample_rate * block_align,
+            block_align,
+            8 * dtype.itemsize,
+        )
+        + b"data"
+        + struct.pack("<I", WAV_STREAM_SIZE)
+    )
+
+
+def pcm_to_float(data, dtype):
+    """
+    Converts PCM samples to float32 in [-1, 1].
+
+    Args:
+        data: The PCM samples as a NumPy array.
+        dtype: NumPy dtype of the samples.
+    """
+    if dtype.kind == "f":
+        return data.astype(np.float32)
+    return data.astype(np.float32) / float(2 ** (8 * dtype.itemsize - 1))
+
+
+class PCMReader:
+    """
+    Reads mono float32 audio incrementally from a binary stream of raw or WAV PCM,
+    resampled to a target rate.
+
+    WAV input is recognized by its RIFF header, and its own format overrides the raw PCM
+    settings. Multichannel input is downmixed to mono.
+    """
+
+    def __init__(
+        self,
+        stream,
+        target_sr,
+        sample_format="s16le",
+        sample_rate=16000,
+        channels=1,
+        read_frames=PIPE_READ_FRAMES,
+    ):
+        """
+        Initializes the PCMReader and reads the WAV header, if any.
+
+        Args:
+            stream: The binary input stream.
+            target_sr: Sampling rate of the returned audio.
+            sample_format: Sample format of raw PCM input, one of PCM_FORMATS.
+            sample_rate: Sampling rate of raw PCM input.
+            channels: Number of channels of raw PCM input.
+            read_frames: Number of input frames read at a time.
+        """
+        self.stream = stream
+        self.read_frames = read_frames
+        self.pending = read_exact(stream, 4)
+        if self.pending == b"RIFF":
+            sample_rate, channels, sample_format = read_wav_header(
+                stream, self.pending
+            )
+            self.pending = b""
+        if sample_format not in PCM_FORMATS:
+            raise ValueError(f"Unsupported PCM sample format: {sample_format}")
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.dtype = np.dtype(PCM_FORMATS[sample_format])
+        self.frame_bytes = self.dtype.itemsize * channels
+        self.resampler = (
+            soxr.ResampleStream(sample_rate, target_sr, 1, dtype="float32")
+            if sample_rate != target_sr
+            else None
+        )
+        self.length = 0  # samples returned so far
+        self.finished = False
+
+    def read(self):
+        """
+        Reads the next input frames and returns them converted, or an empty array once the
+        stream has ended.
+        """
+        if self.finished:
+            return np.zeros(0, dtype=np.float32)
+        data = self.pending + read_exact(
+            self.stream, self.read_frames * self.frame_bytes - len(self.pending)
+        )
+        self.finished = len(data) < self.read_frames * self.frame_bytes
+        # keep the bytes of an incomplete frame for the next read
+        usable = len(data) - len(data) % self.frame_bytes
+        self.pending = data[usable:]
+        frames = np.frombuffer(data[:usable], dtype=self.dtype)
+        audio = pcm_to_float(frames, self.dtype)
+        audio = audio.reshape(-1, self.channels).mean(axis=1)
+        if self.resampler is not None:
+            audio = self.resampler.resample_chunk(audio, last=self.finished)
+        self.length += audio.shape[0]
+        return audio
+
+    def blocks(self, block_size):
+        """
+        Yields the converted audio in blocks of block_size samples, the last one padded
+        with silence. length holds the unpadded total once the last block is yielded.
+
+        Args:
+            block_size: Number of samples per block.
+        """
+        buffer = np.zeros(0, dtype=np.float32)
+        while not self.finished:
+            buffer = np.concatenate([buffer, self.read()])
+            while buffer.shape[0] >= block_size:
+                yield buffer[:block_size]
+                buffer = buffer[block_size:]
+        if buffer.shape[0] > 0:
+            yield np.pad(buffer, (0, block_size - buffer.shape[0]))
+
+
+class PCMWriter:
+    """
+    Writes mono float audio incrementally to a binary stream as raw or WAV PCM, resampled
+    to an output rate.
+    """
+
+    def __init__(
+        self,
+        stream,
+        source_sr,
+        sample_rate=None,
+        sample_format="s16le",
+        wav_header=False,
+    ):
+        """
+        Initializes the PCMWriter and writes the WAV header, if requested.
+
+        Args:
+            stream: The binary output stream.
+            source_sr: Sampling rate of the audio passed to write.
+            sample_rate: Sampling rate of the output (default is source_sr).
+            sample_format: Output sample format, one of PCM_FORMATS.
+            wav_header: Whether to start the output with a WAV header.
+        """
+        if sample_format not in PCM_FORMATS:
+            raise ValueError(f"Unsupported PCM sample format: {sample_format}")
+        self.stream = stream
+        self.sample_rate = sample_rate or source_sr
+        self.dtype = np.dtype(PCM_FORMATS[sample_format])
+        self.resampler = (
+            soxr.ResampleStream(source_sr, self.sample_rate, 1, dtype="float32")
+            if self.sample_rate != source_sr
+            else None
+        )
+        self.length = 0  # samples written so far
+        if wav_header:
+            self.stream.write(wav_stream_header(self.sample_rate, 1, sample_format))
+
+    def write(self, audio, last=False):
+        """
+        Converts and writes audio, flushing the stream.
+
+        Args:
+            audio: Mono float audio at source_sr as a NumPy array.
+            last: Whether this is the end of the audio, to flush the resampler.
+        """
+        audio = np.asarray(audio, dtype=np.float32)
+        if self.resampler is not None:
+            audio = self.resampler.resample_chunk(audio, last=last)
+        audio = np.clip(audio, -1, 1)
+        if self.dtype.kind != "f":
+            scale = 2 ** (8 * self.dtype.itemsize - 1)
+            audio = np.clip(
+                np.round(audio.astype(np.float64) * scale), -scale, scale - 1
+            )
+        self.stream.write(audio.astype(self.dtype).tobytes())
+        self.stream.flush()
+        self.length += audio.shape[0]
+
+
+class PeakLimiter:
+    """
+    Scales audio down so its peak stays under a ceiling, using the highest peak seen so
+    far: the incremental counterpart of normalizing a whole file, for audio that is
+    written out before its end is known. Blocks before a new peak keep their higher gain.
+    """
+
+    def __init__(self, ceiling):
+        """
+        Initializes the PeakLimiter.
+
+        Args:
+            ceiling: Highest absolute sample value let through.
+        """
+        self.ceiling = ceiling
+        self.peak = 0.0
+
+    def __call__(self, audio):
+        self.peak = max(self.peak, float(np.abs(audio).max(initial=0)))
+        if self.peak > self.ceiling:
+            return audio * (self.ceiling / self.peak)
+        return audio
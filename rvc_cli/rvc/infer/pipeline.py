@@ -1,21 +1,36 @@
 import os
-import gc
 import re
 import sys
+import time
 import torch
+import threading
 import torch.nn.functional as F
 import torchcrepe
-import faiss
 import librosa
 import numpy as np
 from scipy import signal
 from torch import Tensor
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 now_dir = os.getcwd()
 sys.path.append(now_dir)
 
-from rvc_cli.rvc.lib.predictors.RMVPE import RMVPE0Predictor
-from rvc_cli.rvc.lib.predictors.FCPE import FCPEF0Predictor
+from rvc_cli.rvc.infer.index_cache import index_cache
+from rvc_cli.rvc.infer.analysis_cache import analysis_cache
+from rvc_cli.rvc.infer.predictor_registry import predictor_registry
+from rvc_cli.rvc.infer.retrieval import create_retrieval_backend
+from rvc_cli.rvc.lib.tools.segmentation import plan_cut_points
+from rvc_cli.rvc.infer.f0_gate import gated_f0
+from rvc_cli.rvc.infer.f0_postprocess import (
+    F0_DECIMATION_FACTORS,
+    REF_FREQS,
+    autotune_f0,
+    median_filter_f0,
+    overlay_f0,
+    quantize_f0,
+    upsample_f0,
+)
 
 import logging
 
@@ -29,7 +44,31 @@ bh, ah = signal.butter(
     N=FILTER_ORDER, Wn=CUTOFF_FREQUENCY, btype="high", fs=SAMPLE_RATE
 )
 
-input_audio_path2wav = {}
+# Receptive field and hop of the embedder's convolutional front end, in 16 kHz samples
+EMBEDDER_RECEPTIVE_FIELD = 400
+EMBEDDER_HOP = 320
+
+# Recent hybrid F0 inputs by path, as float64 audio
+input_audio_path2wav = OrderedDict()
+input_audio_path2wav_lock = threading.Lock()
+# Number of inputs kept in input_audio_path2wav
+MAX_HYBRID_INPUTS = 2
+
+
+def cache_hybrid_input(input_audio_path, x):
+    """
+    Stores the float64 audio of a hybrid F0 input, evicting the oldest entries beyond
+    MAX_HYBRID_INPUTS.
+
+    Args:
+        input_audio_path: Path to the input audio file.
+        x: The input audio signal as a NumPy array.
+    """
+    with input_audio_path2wav_lock:
+        input_audio_path2wav[input_audio_path] = x.astype(np.double)
+        input_audio_path2wav.move_to_end(input_audio_path)
+        while len(input_audio_path2wav) > MAX_HYBRID_INPUTS:
+            input_audio_path2wav.popitem(last=False)
 
 
 class AudioProcessor:
@@ -104,16 +143,13 @@ class Autotune:
 
     def autotune_f0(self, f0, f0_autotune_strength):
         """
-        Autotunes a given F0 contour by snapping each frequency to the closest reference frequency.
+        Autotunes a given F0 contour by snapping each voiced frequency to the closest reference frequency.
 
         Args:
             f0: The input F0 contour as a NumPy array.
+            f0_autotune_strength: Strength of the autotune snapping.
         """
-        autotuned_f0 = np.zeros_like(f0)
-        for i, freq in enumerate(f0):
-            closest_note = min(self.note_dict, key=lambda x: abs(x - freq))
-            autotuned_f0[i] = freq + (closest_note - freq) * f0_autotune_strength
-        return autotuned_f0
+        return autotune_f0(f0, self.note_dict, f0_autotune_strength)
 
 
 class Pipeline:
@@ -149,70 +185,58 @@ class Pipeline:
         self.f0_mel_min = 1127 * np.log(1 + self.f0_min / 700)
         self.f0_mel_max = 1127 * np.log(1 + self.f0_max / 700)
         self.device = config.device
-        self.ref_freqs = [
-            49.00,  # G1
-            51.91,  # G#1 / Ab1
-            55.00,  # A1
-            58.27,  # A#1 / Bb1
-            61.74,  # B1
-            65.41,  # C2
-            69.30,  # C#2 / Db2
-            73.42,  # D2
-            77.78,  # D#2 / Eb2
-            82.41,  # E2
-            87.31,  # F2
-            92.50,  # F#2 / Gb2
-            98.00,  # G2
-            103.83,  # G#2 / Ab2
-            110.00,  # A2
-            116.54,  # A#2 / Bb2
-            123.47,  # B2
-            130.81,  # C3
-            138.59,  # C#3 / Db3
-            146.83,  # D3
-            155.56,  # D#3 / Eb3
-            164.81,  # E3
-            174.61,  # F3
-            185.00,  # F#3 / Gb3
-            196.00,  # G3
-            207.65,  # G#3 / Ab3
-            220.00,  # A3
-            233.08,  # A#3 / Bb3
-            246.94,  # B3
-            261.63,  # C4
-            277.18,  # C#4 / Db4
-            293.66,  # D4
-            311.13,  # D#4 / Eb4
-            329.63,  # E4
-            349.23,  # F4
-            369.99,  # F#4 / Gb4
-            392.00,  # G4
-            415.30,  # G#4 / Ab4
-            440.00,  # A4
-            466.16,  # A#4 / Bb4
-            493.88,  # B4
-            523.25,  # C5
-            554.37,  # C#5 / Db5
-            587.33,  # D5
-            622.25,  # D#5 / Eb5
-            659.25,  # E5
-            698.46,  # F5
-            739.99,  # F#5 / Gb5
-            783.99,  # G5
-            830.61,  # G#5 / Ab5
-            880.00,  # A5
-            932.33,  # A#5 / Bb5
-            987.77,  # B5
-            1046.50,  # C6
-        ]
+        self.ref_freqs = REF_FREQS
         self.autotune = Autotune(self.ref_freqs)
         self.note_dict = self.autotune.note_dict
-        self.model_rmvpe = RMVPE0Predictor(
-            os.path.join("rvc_cli", "rvc", "models", "predictors", "rmvpe.pt"),
-            is_half=self.is_half,
-            device=self.device,
+        self.rmvpe_chunk_seconds = config.rmvpe_chunk_seconds
+        self.rmvpe_chunk_workers = config.rmvpe_chunk_workers
+        index_cache.set_memory_budget(int(config.index_cache_mb * 1024**2))
+        self.retriever = None
+        self.retriever_key = None
+
+    @property
+    def model_rmvpe(self):
+        """
+        The shared RMVPE predictor, loaded on first use.
+        """
+        return predictor_registry.get_rmvpe(
+            self.is_half,
+            self.device,
+            self.rmvpe_chunk_seconds,
+            self.rmvpe_chunk_workers,
         )
 
+    @property
+    def model_fcpe(self):
+        """
+        The shared FCPE predictor, loaded on first use.
+        """
+        return predictor_registry.get_fcpe(
+            self.device, self.f0_min, self.f0_max, self.sample_rate
+        )
+
+    def get_retriever(self, file_index, retrieval_backend):
+        """
+        Returns the retrieval backend for an index file, reusing it while the index is unchanged.
+
+        Args:
+            file_index: Path to the FAISS index file.
+            retrieval_backend: Retrieval backend to use ("auto", "faiss" or "torch").
+        """
+        index, big_npy = index_cache.get(file_index)
+        key = (index_cache.make_key(file_index), retrieval_backend)
+        if key != self.retriever_key:
+            # key[1] is the searched file: the optimized copy when there is one
+            self.retriever = create_retrieval_backend(
+                index,
+                big_npy,
+                self.device,
+                retrieval_backend,
+                optimized=key[0][1] != file_index,
+            )
+            self.retriever_key = key
+        return self.retriever
+
     def get_f0_crepe(
         self,
         x,
@@ -221,6 +245,7 @@ class Pipeline:
         p_len,
         hop_length,
         model="full",
+        decimation=1,
     ):
         """
         Estimates the fundamental frequency (F0) of a given audio signal using the Crepe model.
@@ -232,6 +257,8 @@ class Pipeline:
             p_len: Desired length of the F0 output.
             hop_length: Hop length for the Crepe model.
             model: Crepe model size to use ("full" or "tiny").
+            decimation: Factor by which the hop length is multiplied, the contour being
+                interpolated back to p_len frames.
         """
         x = x.astype(np.float32)
         x /= np.quantile(np.abs(x), 0.999)
@@ -243,7 +270,7 @@ class Pipeline:
         pitch: Tensor = torchcrepe.predict(
             audio,
             self.sample_rate,
-            hop_length,
+            hop_length * decimation,
             f0_min,
             f0_max,
             model,
@@ -254,6 +281,8 @@ class Pipeline:
         p_len = p_len or x.shape[0] // hop_length
         source = np.array(pitch.squeeze(0).cpu().float().numpy())
         source[source < 0.001] = np.nan
+        if decimation > 1:
+            return upsample_f0(source, np.arange(p_len) * len(source) / p_len)
         target = np.interp(
             np.arange(0, len(source) * p_len, len(source)) / p_len,
             np.arange(0, len(source)),
@@ -270,10 +299,14 @@ class Pipeline:
         f0_max,
         p_len,
         hop_length,
+        decimation=1,
     ):
         """
         Estimates the fundamental frequency (F0) using a hybrid approach combining multiple methods.
 
+        The methods run concurrently on a thread pool, each with an equal share of the torch
+        CPU threads, and their median is taken per frame.
+
         Args:
             methods_str: A string specifying the methods to combine (e.g., "hybrid[crepe+rmvpe]").
             x: The input audio signal as a NumPy array.
@@ -281,39 +314,52 @@ class Pipeline:
             f0_max: Maximum F0 value to consider.
             p_len: Desired length of the F0 output.
             hop_length: Hop length for F0 estimation methods.
+            decimation: Frame rate reduction factor of the crepe and FCPE estimates.
         """
         methods_str = re.search("hybrid\[(.+)\]", methods_str)
         if methods_str:
             methods = [method.strip() for method in methods_str.group(1).split("+")]
-        f0_computation_stack = []
         print(f"Calculating f0 pitch estimations for methods: {', '.join(methods)}")
         x = x.astype(np.float32)
         x /= np.quantile(np.abs(x), 0.999)
-        for method in methods:
+        total_threads = torch.get_num_threads()
+        method_threads = max(1, total_threads // len(methods))
+
+        def compute_f0(method):
+            if len(methods) > 1:
+                torch.set_num_threads(method_threads)
+            start = time.perf_counter()
             f0 = None
             if method == "crepe":
-                f0 = self.get_f0_crepe_computation(
-                    x, f0_min, f0_max, p_len, int(hop_length)
+                f0 = self.get_f0_crepe(
+                    x, f0_min, f0_max, p_len, int(hop_length), decimation=decimation
                 )
             elif method == "rmvpe":
                 f0 = self.model_rmvpe.infer_from_audio(x, thred=0.03)
                 f0 = f0[1:]
             elif method == "fcpe":
-                self.model_fcpe = FCPEF0Predictor(
-                    os.path.join("rvc_cli", "rvc", "models", "predictors", "fcpe.pt"),
-                    f0_min=int(f0_min),
-                    f0_max=int(f0_max),
-                    dtype=torch.float32,
-                    device=self.device,
-                    sample_rate=self.sample_rate,
-                    threshold=0.03,
-                )
-                f0 = self.model_fcpe.compute_f0(x, p_len=p_len)
-                del self.model_fcpe
-                gc.collect()
-            f0_computation_stack.append(f0)
+                f0 = predictor_registry.get_fcpe(
+                    self.device, f0_min, f0_max, self.sample_rate
+                ).compute_f0(x, p_len=p_len, decimation=decimation)
+            return f0, time.perf_counter() - start
+
+        start = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=len(methods)) as executor:
+                results = list(executor.map(compute_f0, methods))
+        finally:
+            torch.set_num_threads(total_threads)
+        elapsed = time.perf_counter() - start
+        timings = ", ".join(
+            f"{method} {method_time:.2f} s"
+            for method, (_, method_time) in zip(methods, results)
+        )
+        print(
+            f"Hybrid f0 methods took {timings} ({elapsed:.2f} s wall time, "
+            f"{method_threads} threads each)."
+        )
 
-        f0_computation_stack = [fc for fc in f0_computation_stack if fc is not None]
+        f0_computation_stack = [f0 for f0, _ in results if f0 is not None]
         f0_median_hybrid = None
         if len(f0_computation_stack) == 1:
             f0_median_hybrid = f0_computation_stack[0]
@@ -348,30 +394,86 @@ class Pipeline:
             f0_autotune: Whether to apply autotune to the F0 contour.
             inp_f0: Optional input F0 contour to use instead of estimating.
         """
-        global input_audio_path2wav
+        f0 = self.extract_f0(input_audio_path, x, p_len, f0_method, hop_length)
+        f0 = median_filter_f0(f0, filter_radius)
+        return self.finalize_f0(f0, pitch, f0_autotune, f0_autotune_strength, inp_f0)
+
+    def extract_f0(
+        self,
+        input_audio_path,
+        x,
+        p_len,
+        f0_method,
+        hop_length,
+        f0_gate_threshold=None,
+        f0_decimation=1,
+    ):
+        """
+        Estimates the raw F0 contour of an audio signal, before any pitch adjustment.
+
+        Args:
+            input_audio_path: Path to the input audio file.
+            x: The input audio signal as a NumPy array.
+            p_len: Desired length of the F0 output.
+            f0_method: Method to use for F0 estimation (e.g., "crepe").
+            hop_length: Hop length for F0 estimation methods.
+            f0_gate_threshold: RMS level in dBFS below which frames are left unvoiced without
+                running the predictor on them, or None to process every frame.
+            f0_decimation: Factor by which crepe and FCPE reduce their frame rate, the contour
+                being interpolated back to p_len frames.
+        """
+        if f0_decimation not in F0_DECIMATION_FACTORS:
+            raise ValueError(
+                f"F0 decimation must be one of {F0_DECIMATION_FACTORS}, got {f0_decimation}"
+            )
+        if f0_gate_threshold is not None:
+            start = time.perf_counter()
+            f0, skipped = gated_f0(
+                x,
+                p_len,
+                self.window,
+                lambda audio, frame_count: self.extract_f0(
+                    input_audio_path,
+                    audio,
+                    frame_count,
+                    f0_method,
+                    hop_length,
+                    f0_decimation=f0_decimation,
+                ),
+                f0_gate_threshold,
+            )
+            print(
+                f"Energy-gated F0: skipped {100 * skipped:.0f}% of frames below "
+                f"{f0_gate_threshold:g} dBFS, {time.perf_counter() - start:.2f} s."
+            )
+            return f0
         if f0_method == "crepe":
-            f0 = self.get_f0_crepe(x, self.f0_min, self.f0_max, p_len, int(hop_length))
+            f0 = self.get_f0_crepe(
+                x,
+                self.f0_min,
+                self.f0_max,
+                p_len,
+                int(hop_length),
+                decimation=f0_decimation,
+            )
         elif f0_method == "crepe-tiny":
             f0 = self.get_f0_crepe(
-                x, self.f0_min, self.f0_max, p_len, int(hop_length), "tiny"
+                x,
+                self.f0_min,
+                self.f0_max,
+                p_len,
+                int(hop_length),
+                "tiny",
+                f0_decimation,
             )
         elif f0_method == "rmvpe":
             f0 = self.model_rmvpe.infer_from_audio(x, thred=0.03)
         elif f0_method == "fcpe":
-            self.model_fcpe = FCPEF0Predictor(
-                os.path.join("rvc_cli", "rvc", "models", "predictors", "fcpe.pt"),
-                f0_min=int(self.f0_min),
-                f0_max=int(self.f0_max),
-                dtype=torch.float32,
-                device=self.device,
-                sample_rate=self.sample_rate,
-                threshold=0.03,
+            f0 = self.model_fcpe.compute_f0(
+                x, p_len=p_len, decimation=f0_decimation
             )
-            f0 = self.model_fcpe.compute_f0(x, p_len=p_len)
-            del self.model_fcpe
-            gc.collect()
         elif "hybrid" in f0_method:
-            input_audio_path2wav[input_audio_path] = x.astype(np.double)
+            cache_hybrid_input(input_audio_path, x)
             f0 = self.get_f0_hybrid(
                 f0_method,
                 x,
@@ -379,32 +481,32 @@ class Pipeline:
                 self.f0_max,
                 p_len,
                 hop_length,
+                f0_decimation,
             )
+        return f0
 
+    def finalize_f0(self, f0, pitch, f0_autotune, f0_autotune_strength, inp_f0=None):
+        """
+        Applies autotune, the pitch shift and an optional input F0 contour to a raw F0 contour,
+        and quantizes it for the synthesizer's pitch embedding.
+
+        Args:
+            f0: The raw F0 contour from extract_f0. It is not modified.
+            pitch: Key to adjust the pitch of the F0 contour.
+            f0_autotune: Whether to apply autotune to the F0 contour.
+            f0_autotune_strength: Strength of the autotune snapping.
+            inp_f0: Optional input F0 contour to use instead of estimating.
+        """
+        f0 = f0.copy()
         if f0_autotune is True:
-            f0 = Autotune.autotune_f0(self, f0, f0_autotune_strength)
+            f0 = self.autotune.autotune_f0(f0, f0_autotune_strength)
 
         f0 *= pow(2, pitch / 12)
         tf0 = self.sample_rate // self.window
         if inp_f0 is not None:
-            delta_t = np.round(
-                (inp_f0[:, 0].max() - inp_f0[:, 0].min()) * tf0 + 1
-            ).astype("int16")
-            replace_f0 = np.interp(
-                list(range(delta_t)), inp_f0[:, 0] * 100, inp_f0[:, 1]
-            )
-            shape = f0[self.x_pad * tf0 : self.x_pad * tf0 + len(replace_f0)].shape[0]
-            f0[self.x_pad * tf0 : self.x_pad * tf0 + len(replace_f0)] = replace_f0[
-                :shape
-            ]
+            f0 = overlay_f0(f0, inp_f0, self.x_pad * tf0, tf0)
         f0bak = f0.copy()
-        f0_mel = 1127 * np.log(1 + f0 / 700)
-        f0_mel[f0_mel > 0] = (f0_mel[f0_mel > 0] - self.f0_mel_min) * 254 / (
-            self.f0_mel_max - self.f0_mel_min
-        ) + 1
-        f0_mel[f0_mel <= 1] = 1
-        f0_mel[f0_mel > 255] = 255
-        f0_coarse = np.rint(f0_mel).astype(int)
+        f0_coarse = quantize_f0(f0, self.f0_min, self.f0_max)
 
         return f0_coarse, f0bak
 
@@ -416,8 +518,7 @@ class Pipeline:
         audio0,
         pitch,
         pitchf,
-        index,
-        big_npy,
+        retriever,
         index_rate,
         version,
         protect,
@@ -432,14 +533,39 @@ class Pipeline:
             audio0: The input audio segment.
             pitch: Quantized F0 contour for pitch guidance.
             pitchf: Original F0 contour for pitch guidance.
-            index: FAISS index for speaker embedding retrieval.
-            big_npy: Speaker embeddings stored in a NumPy array.
+            retriever: Retrieval backend for speaker embedding retrieval.
             index_rate: Blending rate for speaker embedding retrieval.
             version: Model version ("v1" or "v2").
             protect: Protection level for preserving the original pitch.
         """
+        feats0 = self.extract_features(model, audio0, version)
+        feats = (
+            self.blend_features(
+                [feats0], self.search_features([feats0], retriever), index_rate
+            )[0]
+            if retriever
+            else feats0
+        )
+        segment = self.prepare_segment(
+            feats,
+            feats0 if pitch != None and pitchf != None else None,
+            audio0.shape[0] // self.window,
+            pitch,
+            pitchf,
+            protect,
+        )
+        return self.synthesize(net_g, sid, [segment])[0]
+
+    def extract_features(self, model, audio0, version):
+        """
+        Extracts content features from an audio segment with the embedder model.
+
+        Args:
+            model: The feature extractor model.
+            audio0: The input audio segment.
+            version: Model version ("v1" or "v2").
+        """
         with torch.no_grad():
-            pitch_guidance = pitch != None and pitchf != None
             # prepare source audio
             feats = (
                 torch.from_numpy(audio0).half()
@@ -454,24 +580,137 @@ class Pipeline:
             feats = (
                 model.final_proj(feats[0]).unsqueeze(0) if version == "v1" else feats
             )
-            # make a copy for pitch guidance and protection
-            feats0 = feats.clone() if pitch_guidance else None
-            if (
-                index
-            ):  # set by parent function, only true if index is available, loaded, and index rate > 0
-                feats = self._retrieve_speaker_embeddings(
-                    feats, index, big_npy, index_rate
+        return feats
+
+    def extract_features_windowed(self, model, audio, version):
+        """
+        Extracts content features for a whole input in bounded windows.
+
+        Each window of up to x_max seconds is embedded with x_pad seconds of context on both
+        sides, and only the frames of the window itself are kept, so every sample is embedded
+        about once regardless of how the input is later segmented. Frame i of the result
+        covers samples [i * EMBEDDER_HOP, i * EMBEDDER_HOP + EMBEDDER_RECEPTIVE_FIELD).
+
+        Args:
+            model: The feature extractor model.
+            audio: The whole padded input audio.
+            version: Model version ("v1" or "v2").
+        """
+        window = max(self.t_max // EMBEDDER_HOP, 1) * EMBEDDER_HOP
+        context = self.t_pad // EMBEDDER_HOP * EMBEDDER_HOP
+        feats = []
+        for start in range(0, audio.shape[0], window):
+            chunk_start = max(0, start - context)
+            chunk_end = (
+                start + window + context + EMBEDDER_RECEPTIVE_FIELD - EMBEDDER_HOP
+            )
+            offset = (start - chunk_start) // EMBEDDER_HOP
+            chunk_feats = self.extract_features(
+                model, audio[chunk_start:chunk_end], version
+            )
+            feats.append(chunk_feats[:, offset : offset + window // EMBEDDER_HOP])
+        return torch.cat(feats, dim=1)
+
+    def get_features(
+        self, model, audio_pad, segments, version, whole_file_features, cache_key=None
+    ):
+        """
+        Returns the embedder features of every segment, or of the whole input when
+        whole_file_features is set, reading and filling the analysis cache.
+
+        Args:
+            model: The feature extractor model.
+            audio_pad: The padded input audio.
+            segments: List of (start, end, pitch_end) segment bounds in samples.
+            version: Model version ("v1" or "v2").
+            whole_file_features: Whether to extract features once for the whole input.
+            cache_key: Analysis cache key of the features, or None to bypass the cache.
+        """
+        if cache_key:
+            cached = analysis_cache.load(cache_key, "features")
+            lengths = analysis_cache.load(cache_key, "lengths")
+            if cached is not None and lengths is not None:
+                feats = torch.from_numpy(cached).to(
+                    self.device, torch.float16 if self.is_half else torch.float32
                 )
+                return list(torch.split(feats.unsqueeze(0), lengths.tolist(), dim=1))
+        if whole_file_features:
+            feats = [self.extract_features_windowed(model, audio_pad, version)]
+        else:
+            feats = [
+                self.extract_features(model, audio_pad[start:end], version)
+                for start, end, _ in segments
+            ]
+        if cache_key:
+            # the cache stores float16; this run continues with the full-precision features
+            analysis_cache.save(
+                cache_key, "features", torch.cat(feats, dim=1)[0].float().cpu().numpy()
+            )
+            analysis_cache.save(
+                cache_key, "lengths", np.array([f.shape[1] for f in feats])
+            )
+        return feats
+
+    def search_features(self, feats, retriever):
+        """
+        Retrieves the speaker embeddings of every frame of the given tensors with a single
+        search.
+
+        Per-segment features overlap by the t_pad2 padding of their neighbours, and those
+        frames are searched once per segment they belong to: each segment embeds them with
+        its own context, so their features differ and cannot be shared. Only whole-file
+        features are searched once per unique frame.
+
+        Args:
+            feats: List of feature tensors of shape (1, frames, dim).
+            retriever: Retrieval backend for speaker embedding retrieval.
+        """
+        with torch.no_grad():
+            lengths = [f.shape[1] for f in feats]
+            retrieved = retriever.search(torch.cat(feats, dim=1)[0]).unsqueeze(0)
+        return list(torch.split(retrieved, lengths, dim=1))
+
+    @staticmethod
+    def blend_features(feats, retrieved, index_rate):
+        """
+        Blends features with their retrieved speaker embeddings.
+
+        Args:
+            feats: List of feature tensors of shape (1, frames, dim).
+            retrieved: The matching retrieved embeddings from search_features.
+            index_rate: Blending rate for speaker embedding retrieval.
+        """
+        return [
+            retrieved_feats * index_rate + (1 - index_rate) * segment_feats
+            for segment_feats, retrieved_feats in zip(feats, retrieved)
+        ]
+
+    def prepare_segment(self, feats, feats0, frames, pitch, pitchf, protect):
+        """
+        Computes the synthesizer inputs of an audio segment from its embedder features:
+        the upsampled and pitch-protected features, frame count and matching pitch contours.
+
+        Args:
+            feats: Retrieval-blended embedder features of the segment.
+            feats0: Original embedder features of the segment, used for pitch protection.
+            frames: Number of F0 frames covered by the segment audio.
+            pitch: Quantized F0 contour for pitch guidance.
+            pitchf: Original F0 contour for pitch guidance.
+            protect: Protection level for preserving the original pitch.
+        """
+        with torch.no_grad():
+            pitch_guidance = pitch != None and pitchf != None
             # feature upsampling
             feats = F.interpolate(feats.permute(0, 2, 1), scale_factor=2).permute(
                 0, 2, 1
             )
             # adjust the length if the audio is short
-            p_len = min(audio0.shape[0] // self.window, feats.shape[1])
+            p_len = min(frames, feats.shape[1])
+            feats = feats[:, :p_len]
             if pitch_guidance:
                 feats0 = F.interpolate(feats0.permute(0, 2, 1), scale_factor=2).permute(
                     0, 2, 1
-                )
+                )[:, :p_len]
                 pitch, pitchf = pitch[:, :p_len], pitchf[:, :p_len]
                 # Pitch protection blending
                 if protect < 0.5:
@@ -484,105 +723,142 @@ class Pipeline:
                     feats = feats.to(feats0.dtype)
             else:
                 pitch, pitchf = None, None
-            p_len = torch.tensor([p_len], device=self.device).long()
-            audio1 = (
-                (net_g.infer(feats, p_len, pitch, pitchf, sid)[0][0, 0])
-                .data.cpu()
-                .float()
-                .numpy()
+            del feats0
+        return feats, p_len, pitch, pitchf
+
+    @staticmethod
+    def synthesize(net_g, sid, segments):
+        """
+        Synthesizes a batch of prepared segments with a single generator call.
+
+        Segments are zero-padded to the longest one and masked through their phone
+        lengths, then each output is cropped back to its own length.
+
+        Args:
+            net_g: The generative model for synthesizing speech.
+            sid: Speaker ID tensor of shape (1,).
+            segments: List of (feats, p_len, pitch, pitchf) tuples from prepare_segment.
+        """
+        with torch.no_grad():
+            lengths = [p_len for _, p_len, _, _ in segments]
+            max_len = max(lengths)
+            feats = torch.cat(
+                [
+                    F.pad(feats[:, :p_len], (0, 0, 0, max_len - p_len))
+                    for feats, p_len, _, _ in segments
+                ]
             )
+            if segments[0][2] is not None:
+                pitch = torch.cat(
+                    [
+                        F.pad(pitch, (0, max_len - p_len))
+                        for _, p_len, pitch, _ in segments
+                    ]
+                )
+                pitchf = torch.cat(
+                    [
+                        F.pad(pitchf, (0, max_len - p_len))
+                        for _, p_len, _, pitchf in segments
+                    ]
+                )
+            else:
+                pitch, pitchf = None, None
+            p_len = torch.tensor(lengths, device=feats.device).long()
+            audio = net_g.infer(
+                feats, p_len, pitch, pitchf, sid.repeat(len(segments))
+            )[0][:, 0]
+            # samples generated per feature frame
+            upp = audio.shape[1] // max_len
+            audio = audio.data.cpu().float().numpy()
+            audio1 = [audio[i, : length * upp] for i, length in enumerate(lengths)]
             # clean up
-            del feats, feats0, p_len
+            del feats, pitch, pitchf, p_len
             if torch.cuda.is_available():
                 torch.cuda.empty_cache()
         return audio1
 
-    def _retrieve_speaker_embeddings(self, feats, index, big_npy, index_rate):
-        npy = feats[0].cpu().numpy()
-        npy = npy.astype("float32") if self.is_half else npy
-        score, ix = index.search(npy, k=8)
-        weight = np.square(1 / score)
-        weight /= weight.sum(axis=1, keepdims=True)
-        npy = np.sum(big_npy[ix] * np.expand_dims(weight, axis=2), axis=1)
-        npy = npy.astype("float16") if self.is_half else npy
-        feats = (
-            torch.from_numpy(npy).unsqueeze(0).to(self.device) * index_rate
-            + (1 - index_rate) * feats
-        )
-        return feats
+    def load_retriever(self, file_index, retrieval_backend="auto"):
+        """
+        Returns the retrieval backend for an index file, or None when it is missing or unreadable.
 
-    def pipeline(
+        Args:
+            file_index: Path to the FAISS index file.
+            retrieval_backend: Retrieval backend to use ("auto", "faiss" or "torch").
+        """
+        if file_index == "" or not os.path.exists(file_index):
+            return None
+        try:
+            return self.get_retriever(file_index, retrieval_backend)
+        except Exception as error:
+            print(f"An error occurred reading the FAISS index: {error}")
+            return None
+
+    @staticmethod
+    def run_with_threads(function, threads=0):
+        """
+        Runs a function, after requesting a number of torch CPU threads, and returns its
+        result together with its wall-clock time.
+
+        The thread count is shared by the whole process and is not restored here, since
+        concurrent workers would overwrite each other's saved value; the caller restores it
+        once every worker has finished.
+
+        Args:
+            function: The function to run.
+            threads: Number of torch CPU threads, 0 to keep the current number.
+        """
+        if threads:
+            torch.set_num_threads(threads)
+        start = time.perf_counter()
+        return function(), time.perf_counter() - start
+
+    def analyze(
         self,
         model,
-        net_g,
-        sid,
         audio,
-        pitch,
         f0_method,
-        file_index,
-        index_rate,
         pitch_guidance,
-        filter_radius,
-        volume_envelope,
         version,
-        protect,
         hop_length,
-        f0_autotune,
-        f0_autotune_strength,
-        f0_file,
+        filter_radius=3,
+        f0_file=None,
+        whole_file_features=False,
+        f0_cache_key=None,
+        feature_cache_key=None,
+        concurrent_analysis=False,
+        f0_threads=0,
+        f0_gate_threshold=None,
+        f0_decimation=1,
     ):
         """
-        The main pipeline function for performing voice conversion.
+        Runs the stages of a conversion that do not depend on the pitch, index or protection
+        settings: filtering, segmentation, raw F0 estimation and feature extraction.
+
+        The returned analysis can be rendered any number of times with render(). Its
+        "timings" entry holds the F0, feature and wall-clock times of the analysis.
 
         Args:
             model: The feature extractor model.
-            net_g: The generative model for synthesizing speech.
-            sid: Speaker ID for the target voice.
             audio: The input audio signal.
-            input_audio_path: Path to the input audio file.
-            pitch: Key to adjust the pitch of the F0 contour.
             f0_method: Method to use for F0 estimation.
-            file_index: Path to the FAISS index file for speaker embedding retrieval.
-            index_rate: Blending rate for speaker embedding retrieval.
             pitch_guidance: Whether to use pitch guidance during voice conversion.
-            filter_radius: Radius for median filtering the F0 contour.
-            tgt_sr: Target sampling rate for the output audio.
-            resample_sr: Resampling rate for the output audio.
-            volume_envelope: Blending rate for adjusting the RMS level of the output audio.
             version: Model version.
-            protect: Protection level for preserving the original pitch.
             hop_length: Hop length for F0 estimation methods.
-            f0_autotune: Whether to apply autotune to the F0 contour.
+            filter_radius: Radius for median filtering the F0 contour.
             f0_file: Path to a file containing an F0 contour to use.
+            whole_file_features: Whether to extract features once for the whole input and slice them per segment.
+            f0_cache_key: Analysis cache key of the raw F0 contour, or None to bypass the cache.
+            feature_cache_key: Analysis cache key of the embedder features, or None to bypass the cache.
+            concurrent_analysis: Whether to run F0 estimation and feature extraction in parallel workers.
+            f0_threads: Torch CPU threads requested by the F0 worker in concurrent analysis, the feature worker getting the rest (0 splits them evenly). The split is best-effort since the thread count is process-wide.
+            f0_gate_threshold: RMS level in dBFS below which F0 frames are skipped and left unvoiced, or None to process every frame.
+            f0_decimation: Factor (1, 2 or 4) by which crepe and FCPE reduce their frame rate, the contour being interpolated back to full rate.
         """
-        if file_index != "" and os.path.exists(file_index) and index_rate > 0:
-            try:
-                index = faiss.read_index(file_index)
-                big_npy = index.reconstruct_n(0, index.ntotal)
-            except Exception as error:
-                print(f"An error occurred reading the FAISS index: {error}")
-                index = big_npy = None
-        else:
-            index = big_npy = None
         audio = signal.filtfilt(bh, ah, audio)
-        audio_pad = np.pad(audio, (self.window // 2, self.window // 2), mode="reflect")
-        opt_ts = []
-        if audio_pad.shape[0] > self.t_max:
-            audio_sum = np.zeros_like(audio)
-            for i in range(self.window):
-                audio_sum += audio_pad[i : i - self.window]
-            for t in range(self.t_center, audio.shape[0], self.t_center):
-                opt_ts.append(
-                    t
-                    - self.t_query
-                    + np.where(
-                        np.abs(audio_sum[t - self.t_query : t + self.t_query])
-                        == np.abs(audio_sum[t - self.t_query : t + self.t_query]).min()
-                    )[0][0]
-                )
+        opt_ts = plan_cut_points(
+            audio, self.window, self.t_query, self.t_center, self.t_max
+        )
         s = 0
-        audio_opt = []
-        t = None
         audio_pad = np.pad(audio, (self.t_pad, self.t_pad), mode="reflect")
         p_len = audio_pad.shape[0] // self.window
         inp_f0 = None
@@ -596,19 +872,175 @@ class Pipeline:
                 inp_f0 = np.array(inp_f0, dtype="float32")
             except Exception as error:
                 print(f"An error occurred reading the F0 file: {error}")
+
+        def get_raw_f0():
+            f0 = analysis_cache.load(f0_cache_key, "f0") if f0_cache_key else None
+            if f0 is None:
+                f0 = self.extract_f0(
+                    "input_audio_path",  # questionable purpose of making a key for an array
+                    audio_pad,
+                    p_len,
+                    f0_method,
+                    hop_length,
+                    f0_gate_threshold,
+                    f0_decimation,
+                )
+                if f0_cache_key:
+                    analysis_cache.save(f0_cache_key, "f0", f0)
+            return median_filter_f0(f0, filter_radius)
+
+        # cut on embedder frame boundaries so segments can slice whole-file features
+        step = EMBEDDER_HOP if whole_file_features else self.window
+        segments = []
+        for t in opt_ts:
+            t = t // step * step
+            segments.append(
+                (s, t + self.t_pad2 + self.window, (t + self.t_pad2) // self.window)
+            )
+            s = t
+        segments.append((s, None, None))
+        if whole_file_features:
+            # the extra window of embedder edge samples is not needed when slicing
+            segments = [
+                (start, end - self.window if end is not None else None, pitch_end)
+                for start, end, pitch_end in segments
+            ]
+
+        def get_features():
+            return self.get_features(
+                model,
+                audio_pad,
+                segments,
+                version,
+                whole_file_features,
+                feature_cache_key,
+            )
+
+        start = time.perf_counter()
+        f0, f0_time = None, 0.0
+        if pitch_guidance and concurrent_analysis:
+            total_threads = torch.get_num_threads()
+            f0_threads = min(f0_threads or max(1, total_threads // 2), total_threads)
+            feature_threads = max(1, total_threads - f0_threads)
+            # the split is best-effort: both workers set the same process-wide count
+            try:
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    f0_future = executor.submit(
+                        self.run_with_threads, get_raw_f0, f0_threads
+                    )
+                    feats_future = executor.submit(
+                        self.run_with_threads, get_features, feature_threads
+                    )
+                    f0, f0_time = f0_future.result()
+                    feats, feature_time = feats_future.result()
+            finally:
+                torch.set_num_threads(total_threads)
+        else:
+            if pitch_guidance:
+                f0, f0_time = self.run_with_threads(get_raw_f0)
+            feats, feature_time = self.run_with_threads(get_features)
+        timings = {
+            "f0": f0_time,
+            "features": feature_time,
+            "wall": time.perf_counter() - start,
+        }
+        if pitch_guidance and concurrent_analysis:
+            sequential_time = f0_time + feature_time
+            print(
+                f"Concurrent analysis: F0 {f0_time:.2f} s on {f0_threads} threads, "
+                f"features {feature_time:.2f} s on {feature_threads} threads, "
+                f"{timings['wall']:.2f} s wall time "
+                f"({sequential_time - timings['wall']:.2f} s overlap, "
+                f"{100 * (1 - timings['wall'] / max(sequential_time, 1e-9)):.0f}% saved)."
+            )
+        return {
+            "audio": audio,
+            "audio_pad": audio_pad,
+            "p_len": p_len,
+            "f0": f0,
+            "inp_f0": inp_f0,
+            "segments": segments,
+            "feats": feats,
+            "whole_file_features": whole_file_features,
+            "retriever": None,
+            "retrieved": None,
+            "timings": timings,
+        }
+
+    def adapt_analysis(self, analysis, model, version, pitch_guidance):
+        """
+        Returns a view of an analysis made with raw (v2) embedder features for a model of
+        another version or without pitch guidance, so models can share one analysis.
+
+        The v1 projection is applied to every frame independently, so projecting the shared
+        features gives the same result as extracting them for the v1 model.
+
+        Args:
+            analysis: The analysis returned by analyze() with version "v2".
+            model: The feature extractor model the analysis was made with.
+            version: Model version ("v1" or "v2").
+            pitch_guidance: Whether the model uses pitch guidance.
+        """
+        view = dict(analysis, retriever=None, retrieved=None)
+        if version == "v1":
+            with torch.no_grad():
+                view["feats"] = [
+                    model.final_proj(feats[0]).unsqueeze(0)
+                    for feats in analysis["feats"]
+                ]
+        if not pitch_guidance:
+            view["f0"] = None
+        return view
+
+    def render(
+        self,
+        analysis,
+        net_g,
+        sid,
+        pitch,
+        retriever,
+        index_rate,
+        volume_envelope,
+        protect,
+        f0_autotune,
+        f0_autotune_strength,
+        synthesis_batch_size=1,
+        normalize=True,
+    ):
+        """
+        Synthesizes the output audio of an analysis with a set of pitch, index and protection
+        settings.
+
+        The index search runs once per analysis and retriever; later renders only re-blend
+        the retrieved embeddings. Frames shared by overlapping segments are searched once
+        per segment unless the analysis holds whole-file features (see search_features).
+
+        Args:
+            analysis: The analysis returned by analyze().
+            net_g: The generative model for synthesizing speech.
+            sid: Speaker ID for the target voice.
+            pitch: Key to adjust the pitch of the F0 contour.
+            retriever: Retrieval backend for speaker embedding retrieval, or None.
+            index_rate: Blending rate for speaker embedding retrieval.
+            volume_envelope: Blending rate for adjusting the RMS level of the output audio.
+            protect: Protection level for preserving the original pitch.
+            f0_autotune: Whether to apply autotune to the F0 contour.
+            f0_autotune_strength: Strength of the autotune snapping.
+            synthesis_batch_size: Maximum number of segments synthesized in one generator call.
+            normalize: Whether to scale the output down when its peak exceeds 0.99.
+        """
+        audio_pad = analysis["audio_pad"]
+        p_len = analysis["p_len"]
+        whole_file_features = analysis["whole_file_features"]
+        pitch_guidance = analysis["f0"] is not None
         sid = torch.tensor(sid, device=self.device).unsqueeze(0).long()
         if pitch_guidance:
-            pitch, pitchf = self.get_f0(
-                "input_audio_path",  # questionable purpose of making a key for an array
-                audio_pad,
-                p_len,
+            pitch, pitchf = self.finalize_f0(
+                analysis["f0"],
                 pitch,
-                f0_method,
-                filter_radius,
-                hop_length,
                 f0_autotune,
                 f0_autotune_strength,
-                inp_f0,
+                analysis["inp_f0"],
             )
             pitch = pitch[:p_len]
             pitchf = pitchf[:p_len]
@@ -616,77 +1048,52 @@ class Pipeline:
                 pitchf = pitchf.astype(np.float32)
             pitch = torch.tensor(pitch, device=self.device).unsqueeze(0).long()
             pitchf = torch.tensor(pitchf, device=self.device).unsqueeze(0).float()
-        for t in opt_ts:
-            t = t // self.window * self.window
-            if pitch_guidance:
-                audio_opt.append(
-                    self.voice_conversion(
-                        model,
-                        net_g,
-                        sid,
-                        audio_pad[s : t + self.t_pad2 + self.window],
-                        pitch[:, s // self.window : (t + self.t_pad2) // self.window],
-                        pitchf[:, s // self.window : (t + self.t_pad2) // self.window],
-                        index,
-                        big_npy,
-                        index_rate,
-                        version,
-                        protect,
-                    )[self.t_pad_tgt : -self.t_pad_tgt]
+        feats0 = analysis["feats"]
+        # set by parent function, only true if index is available, loaded, and index rate > 0
+        if retriever:
+            if analysis["retriever"] is not retriever:
+                analysis["retrieved"] = self.search_features(feats0, retriever)
+                analysis["retriever"] = retriever
+            feats = self.blend_features(feats0, analysis["retrieved"], index_rate)
+        else:
+            feats = feats0
+        audio_opt = []
+        batch = []
+        for i, (start, end, pitch_end) in enumerate(analysis["segments"]):
+            if whole_file_features:
+                feature_frames = slice(
+                    start // EMBEDDER_HOP,
+                    -(-end // EMBEDDER_HOP) if end is not None else None,
                 )
+                segment_feats = feats[0][:, feature_frames]
+                segment_feats0 = feats0[0][:, feature_frames]
             else:
-                audio_opt.append(
-                    self.voice_conversion(
-                        model,
-                        net_g,
-                        sid,
-                        audio_pad[s : t + self.t_pad2 + self.window],
-                        None,
-                        None,
-                        index,
-                        big_npy,
-                        index_rate,
-                        version,
-                        protect,
-                    )[self.t_pad_tgt : -self.t_pad_tgt]
-                )
-            s = t
-        if pitch_guidance:
-            audio_opt.append(
-                self.voice_conversion(
-                    model,
-                    net_g,
-                    sid,
-                    audio_pad[t:],
-                    pitch[:, t // self.window :] if t is not None else pitch,
-                    pitchf[:, t // self.window :] if t is not None else pitchf,
-                    index,
-                    big_npy,
-                    index_rate,
-                    version,
+                segment_feats, segment_feats0 = feats[i], feats0[i]
+            frames = slice(start // self.window, pitch_end)
+            batch.append(
+                self.prepare_segment(
+                    segment_feats,
+                    segment_feats0 if pitch_guidance else None,
+                    audio_pad[start:end].shape[0] // self.window,
+                    pitch[:, frames] if pitch_guidance else None,
+                    pitchf[:, frames] if pitch_guidance else None,
                     protect,
-                )[self.t_pad_tgt : -self.t_pad_tgt]
-            )
-        else:
-            audio_opt.append(
-                self.voice_conversion(
-                    model,
-                    net_g,
-                    sid,
-                    audio_pad[t:],
-                    None,
-                    None,
-                    index,
-                    big_npy,
-                    index_rate,
-                    version,
-                    protect,
-                )[self.t_pad_tgt : -self.t_pad_tgt]
+                )
             )
+            if len(batch) >= synthesis_batch_size or end is None:
+                audio_opt.extend(
+                    audio1[self.t_pad_tgt : -self.t_pad_tgt]
+                    for audio1 in self.synthesize(net_g, sid, batch)
+                )
+                batch = []
         audio_opt = np.concatenate(audio_opt)
         if volume_envelope != 1:
             audio_opt = AudioProcessor.change_rms(
-                audio, self.sample_rate, audio_opt, self.sample_rate, volume_envelope
+                analysis["audio"],
+                self.sample_rate,
+                audio_opt,
+                self.sample_rate,
+                volume_envelope,
             )
         # if resample_sr >= self.sample_rate and tgt_sr != resample_sr:
         #    audio_opt = librosa.resample(
@@ -698,11 +1105,110 @@ class Pipeline:
         #    max_int16 /= audio_max
         # audio_opt = (audio_opt * 32768).astype(np.int16)
         audio_max = np.abs(audio_opt).max() / 0.99
-        if audio_max > 1:
+        if normalize and audio_max > 1:
             audio_opt /= audio_max
         if pitch_guidance:
             del pitch, pitchf
-        del sid
+        del sid, feats, feats0
         if torch.cuda.is_available():
             torch.cuda.empty_cache()
         return audio_opt
+
+    def pipeline(
+        self,
+        model,
+        net_g,
+        sid,
+        audio,
+        pitch,
+        f0_method,
+        file_index,
+        index_rate,
+        pitch_guidance,
+        filter_radius,
+        volume_envelope,
+        version,
+        protect,
+        hop_length,
+        f0_autotune,
+        f0_autotune_strength,
+        f0_file,
+        retrieval_backend="auto",
+        synthesis_batch_size=1,
+        whole_file_features=False,
+        f0_cache_key=None,
+        feature_cache_key=None,
+        concurrent_analysis=False,
+        f0_threads=0,
+        f0_gate_threshold=None,
+        f0_decimation=1,
+        normalize=True,
+    ):
+        """
+        The main pipeline function for performing voice conversion.
+
+        Args:
+            model: The feature extractor model.
+            net_g: The generative model for synthesizing speech.
+            sid: Speaker ID for the target voice.
+            audio: The input audio signal.
+            input_audio_path: Path to the input audio file.
+            pitch: Key to adjust the pitch of the F0 contour.
+            f0_method: Method to use for F0 estimation.
+            file_index: Path to the FAISS index file for speaker embedding retrieval.
+            index_rate: Blending rate for speaker embedding retrieval.
+            pitch_guidance: Whether to use pitch guidance during voice conversion.
+            filter_radius: Radius for median filtering the F0 contour.
+            tgt_sr: Target sampling rate for the output audio.
+            resample_sr: Resampling rate for the output audio.
+            volume_envelope: Blending rate for adjusting the RMS level of the output audio.
+            version: Model version.
+            protect: Protection level for preserving the original pitch.
+            hop_length: Hop length for F0 estimation methods.
+            f0_autotune: Whether to apply autotune to the F0 contour.
+            f0_file: Path to a file containing an F0 contour to use.
+            retrieval_backend: Retrieval backend to use ("auto", "faiss" or "torch").
+            synthesis_batch_size: Maximum number of segments synthesized in one generator call.
+            whole_file_features: Whether to extract features once for the whole input and slice them per segment.
+            f0_cache_key: Analysis cache key of the raw F0 contour, or None to bypass the cache.
+            feature_cache_key: Analysis cache key of the embedder features, or None to bypass the cache.
+            concurrent_analysis: Whether to run F0 estimation and feature extraction in parallel workers.
+            f0_threads: Torch CPU threads of the F0 worker in concurrent analysis (0 splits them evenly).
+            f0_gate_threshold: RMS level in dBFS below which F0 frames are skipped and left unvoiced, or None to process every frame.
+            f0_decimation: Factor (1, 2 or 4) by which crepe and FCPE reduce their frame rate, the contour being interpolated back to full rate.
+            normalize: Whether to scale the output down when its peak exceeds 0.99.
+        """
+        retriever = (
+            self.load_retriever(file_index, retrieval_backend) if index_rate > 0 else None
+        )
+        analysis = self.analyze(
+            model,
+            audio,
+            f0_method,
+            pitch_guidance,
+            version,
+            hop_length,
+            filter_radius,
+            f0_file,
+            whole_file_features,
+            f0_cache_key,
+            feature_cache_key,
+            concurrent_analysis,
+            f0_threads,
+            f0_gate_threshold,
+            f0_decimation,
+        )
+        return self.render(
+            analysis,
+            net_g,
+            sid,
+            pitch,
+            retriever,
+            index_rate,
+            volume_envelope,
+            protect,
+            f0_autotune,
+            f0_autotune_strength,
+            synthesis_batch_size,
+            normalize,
+        )
@@ -0,0 +1,203 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+
+import torch
+
+from rvc_cli.rvc.lib.predictors.RMVPE import RMVPE0Predictor
+from rvc_cli.rvc.lib.predictors.FCPE import FCPEF0Predictor
+
+PREDICTORS_DIR = os.path.join("rvc_cli", "rvc", "models", "predictors")
+# Default memory budget for resident F0 predictors
+DEFAULT_PREDICTOR_REGISTRY_BYTES = 2 * 1024**3
+
+
+def get_predictor_bytes(predictor, depth=2):
+    """
+    Returns the memory held by the parameters and buffers of the torch modules a predictor
+    references, directly or through its attributes.
+
+    Args:
+        predictor: The predictor object.
+        depth: Number of attribute levels searched for modules.
+    """
+    seen = set()
+
+    def visit(obj, level):
+        if id(obj) in seen:
+            return 0
+        seen.add(id(obj))
+        if isinstance(obj, torch.nn.Module):
+            tensors = list(obj.parameters()) + list(obj.buffers())
+            return sum(t.numel() * t.element_size() for t in tensors)
+        if level == 0 or not hasattr(obj, "__dict__"):
+            return 0
+        return sum(visit(value, level - 1) for value in vars(obj).values())
+
+    return visit(predictor, depth)
+
+
+class PredictorRegistry:
+    """
+    A process-wide registry of F0 predictors, shared by every Pipeline instance.
+
+    Predictors are loaded on first use and kept resident while they fit the memory budget,
+    the least recently used ones being released first. Entries are keyed by predictor name
+    and every setting the loaded object depends on.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_PREDICTOR_REGISTRY_BYTES):
+        """
+        Initializes the PredictorRegistry with a memory budget.
+
+        Args:
+            max_bytes: Maximum number of bytes held by resident predictors.
+        """
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.load_time = 0.0
+        self.lock = threading.Lock()
+
+    def get(self, key, loader):
+        """
+        Returns the predictor registered under a key, loading it with loader() on a miss.
+
+        Args:
+            key: Tuple starting with the predictor name, followed by its settings.
+            loader: Callable that loads the predictor.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                entry["hits"] += 1
+                self.hits += 1
+                return entry["predictor"]
+            self.misses += 1
+            start = time.perf_counter()
+            predictor = loader()
+            load_time = time.perf_counter() - start
+            self.load_time += load_time
+            nbytes = get_predictor_bytes(predictor)
+            if nbytes <= self.max_bytes:
+                while self.entries and self.current_bytes + nbytes > self.max_bytes:
+                    self._evict(next(iter(self.entries)))
+                self.entries[key] = {
+                    "predictor": predictor,
+                    "nbytes": nbytes,
+                    "load_time": load_time,
+                    "loaded_at": time.time(),
+                    "hits": 0,
+                }
+                self.current_bytes += nbytes
+            else:
+                print(
+                    f"Predictor '{key[0]}' ({nbytes / 1024**2:.1f} MB) exceeds the predictor registry budget and will not be kept."
+                )
+            return predictor
+
+    def _evict(self, key):
+        entry = self.entries.pop(key)
+        self.current_bytes -= entry["nbytes"]
+        self.evictions += 1
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+    def get_rmvpe(self, is_half, device, chunk_seconds=0, chunk_workers=1):
+        """
+        Returns the shared RMVPE predictor for a precision, device and chunking setup.
+
+        Args:
+            is_half: Whether to use half-precision floating-point numbers.
+            device: Device to run the predictor on.
+            chunk_seconds: Window length for long inputs, 0 to process inputs whole.
+            chunk_workers: Number of threads processing windows concurrently.
+        """
+        return self.get(
+            ("rmvpe", is_half, str(device), chunk_seconds, chunk_workers),
+            lambda: RMVPE0Predictor(
+                os.path.join(PREDICTORS_DIR, "rmvpe.pt"),
+                is_half=is_half,
+                device=device,
+                chunk_seconds=chunk_seconds,
+                chunk_workers=chunk_workers,
+            ),
+        )
+
+    def get_fcpe(self, device, f0_min, f0_max, sample_rate, threshold=0.03):
+        """
+        Returns the shared FCPE predictor for a device and pitch range.
+
+        Args:
+            device: Device to run the predictor on.
+            f0_min: Minimum F0 value to consider.
+            f0_max: Maximum F0 value to consider.
+            sample_rate: Sampling rate of the input audio.
+            threshold: Voicing threshold.
+        """
+        return self.get(
+            ("fcpe", str(device), int(f0_min), int(f0_max), sample_rate, threshold),
+            lambda: FCPEF0Predictor(
+                os.path.join(PREDICTORS_DIR, "fcpe.pt"),
+                f0_min=int(f0_min),
+                f0_max=int(f0_max),
+                dtype=torch.float32,
+                device=device,
+                sample_rate=sample_rate,
+                threshold=threshold,
+            ),
+        )
+
+    def set_memory_budget(self, max_bytes):
+        """
+        Changes the memory budget, releasing least recently used predictors if needed.
+
+        Args:
+            max_bytes: Maximum number of bytes held by resident predictors.
+        """
+        with self.lock:
+            self.max_bytes = max_bytes
+            while self.entries and self.current_bytes > self.max_bytes:
+                self._evict(next(iter(self.entries)))
+
+    def clear(self):
+        """
+        Releases every resident predictor.
+        """
+        with self.lock:
+            while self.entries:
+                self._evict(next(iter(self.entries)))
+
+    def stats(self):
+        """
+        Returns hit/miss counters, total load time and the residency of each predictor.
+        """
+        with self.lock:
+            now = time.time()
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "load_time": self.load_time,
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "entries": [
+                    {
+                        "name": key[0],
+                        "key": key,
+                        "bytes": entry["nbytes"],
+                        "load_time": entry["load_time"],
+                        "resident_time": now - entry["loaded_at"],
+                        "hits": entry["hits"],
+                    }
+                    for key, entry in self.entries.items()
+                ],
+            }
+
+
+predictor_registry = PredictorRegistry()
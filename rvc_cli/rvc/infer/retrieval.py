@@ -0,0 +1,183 @@
+import warnings
+import faiss
+import numpy as np
+import torch
+
+# Indexes up to this many vectors are searched exactly with torch when the backend is "auto"
+# and the index has no optimized copy
+TORCH_RETRIEVAL_MAX_VECTORS = 300000
+# Number of stored vectors uploaded or compared at a time by the torch backend
+TORCH_RETRIEVAL_VECTOR_CHUNK = 65536
+# Upper bound on the number of query/vector distances computed at once by the torch backend
+TORCH_RETRIEVAL_CHUNK_ELEMENTS = 2**26
+# Upper bound on the number of query frames searched at once by the torch backend
+TORCH_RETRIEVAL_MAX_CHUNK = 4096
+# Candidates fetched per neighbour from product-quantized indexes before exact re-ranking
+PQ_RERANK_FACTOR = 4
+
+RETRIEVAL_BACKENDS = ["auto", "faiss", "torch"]
+
+
+class RetrievalBackend:
+    """
+    Base class for speaker embedding retrieval backends.
+
+    A backend looks up the k nearest stored feature vectors of every query frame and returns
+    their inverse-square distance weighted average.
+    """
+
+    name = None
+
+    def __init__(self, big_npy, k=8):
+        """
+        Initializes the backend with the stored feature vectors.
+
+        Args:
+            big_npy: Stored feature vectors as a NumPy array of shape (n, dim).
+            k: Number of neighbours blended per query frame.
+        """
+        self.big_npy = big_npy
+        self.ntotal = big_npy.shape[0]
+        self.k = min(k, self.ntotal)
+
+    def search(self, feats):
+        """
+        Returns the retrieved features for each query frame.
+
+        Args:
+            feats: Query features as a tensor of shape (frames, dim).
+        """
+        raise NotImplementedError
+
+
+class FaissRetrieval(RetrievalBackend):
+    """
+    Retrieval backend that searches the FAISS index on the CPU.
+
+    Product-quantized indexes only approximate distances, so their candidates are re-ranked
+    against the stored vectors.
+    """
+
+    name = "faiss"
+
+    def __init__(self, index, big_npy, k=8):
+        super().__init__(big_npy, k)
+        self.index = index
+        self.rerank = isinstance(
+            faiss.downcast_index(index), (faiss.IndexPQ, faiss.IndexIVFPQ)
+        )
+
+    def search(self, feats):
+        npy = feats.cpu().numpy().astype("float32", copy=False)
+        if self.rerank:
+            score, ix = self.search_reranked(npy)
+        else:
+            score, ix = self.index.search(npy, k=self.k)
+        weight = np.square(1 / score)
+        weight /= weight.sum(axis=1, keepdims=True)
+        npy = np.sum(self.big_npy[ix] * np.expand_dims(weight, axis=2), axis=1)
+        return torch.from_numpy(npy).to(feats.device, feats.dtype)
+
+    def search_reranked(self, npy):
+        candidates = min(self.k * PQ_RERANK_FACTOR, self.ntotal)
+        _, candidate_ix = self.index.search(npy, k=candidates)
+        candidate_ix = np.where(candidate_ix < 0, 0, candidate_ix)
+        distances = np.square(
+            self.big_npy[candidate_ix].astype("float32") - npy[:, None, :]
+        ).sum(axis=2)
+        order = np.argsort(distances, axis=1)[:, : self.k]
+        score = np.take_along_axis(distances, order, axis=1)
+        ix = np.take_along_axis(candidate_ix, order, axis=1)
+        return score, ix
+
+
+class TorchRetrieval(RetrievalBackend):
+    """
+    Retrieval backend that runs an exact matmul + top-k search on the device of the features.
+
+    On the CPU the stored vectors are searched in place, so a memory-mapped sidecar stays
+    shared through the page cache; on other devices they are uploaded chunk by chunk, without
+    an intermediate copy on the host.
+    """
+
+    name = "torch"
+
+    def __init__(self, big_npy, device, k=8):
+        super().__init__(big_npy, k)
+        device = torch.device(device)
+        if device.type == "cpu":
+            with warnings.catch_warnings():
+                # the sidecar is mapped read-only and is never written through the tensor
+                warnings.simplefilter("ignore", UserWarning)
+                self.vectors = torch.from_numpy(big_npy)
+        else:
+            self.vectors = torch.empty(
+                big_npy.shape, dtype=torch.float32, device=device
+            )
+            for start in range(0, self.ntotal, TORCH_RETRIEVAL_VECTOR_CHUNK):
+                chunk = np.asarray(
+                    big_npy[start : start + TORCH_RETRIEVAL_VECTOR_CHUNK],
+                    dtype=np.float32,
+                )
+                self.vectors[start : start + chunk.shape[0]] = torch.from_numpy(chunk)
+        self.norms = torch.cat(
+            [block.pow(2).sum(dim=1) for block in self.vector_blocks()]
+        )
+
+    def vector_blocks(self):
+        """
+        Yields the stored vectors as float32 blocks of at most TORCH_RETRIEVAL_VECTOR_CHUNK rows.
+        """
+        for start in range(0, self.ntotal, TORCH_RETRIEVAL_VECTOR_CHUNK):
+            yield self.vectors[start : start + TORCH_RETRIEVAL_VECTOR_CHUNK].float()
+
+    def search(self, feats):
+        queries = feats.to(self.vectors.device).float()
+        retrieved = torch.empty_like(queries)
+        chunk_size = min(
+            TORCH_RETRIEVAL_MAX_CHUNK,
+            max(1, TORCH_RETRIEVAL_CHUNK_ELEMENTS // self.ntotal),
+        )
+        for start in range(0, queries.shape[0], chunk_size):
+            chunk = queries[start : start + chunk_size]
+            # Squared L2 distances, matching the metric of the flat FAISS indexes
+            distances = torch.cat(
+                [chunk @ block.T for block in self.vector_blocks()], dim=1
+            )
+            distances = (
+                chunk.pow(2).sum(dim=1, keepdim=True) - 2 * distances + self.norms
+            )
+            score, ix = torch.topk(distances, self.k, dim=1, largest=False)
+            weight = score.clamp_min(1e-12).pow(-2)
+            weight /= weight.sum(dim=1, keepdim=True)
+            retrieved[start : start + chunk_size] = (
+                self.vectors[ix].float() * weight.unsqueeze(2)
+            ).sum(dim=1)
+        return retrieved.to(feats.device, feats.dtype)
+
+
+def create_retrieval_backend(
+    index, big_npy, device, backend="auto", k=8, optimized=False
+):
+    """
+    Creates the retrieval backend for a loaded index.
+
+    Args:
+        index: The loaded FAISS index.
+        big_npy: Stored feature vectors of the index.
+        device: Device the query features live on.
+        backend: "faiss", "torch", or "auto" to choose by index size.
+        k: Number of neighbours blended per query frame.
+        optimized: Whether index is an optimized copy, which "auto" always searches with faiss.
+    """
+    if backend == "auto":
+        backend = (
+            "torch"
+            if not optimized and index.ntotal <= TORCH_RETRIEVAL_MAX_VECTORS
+            else "faiss"
+        )
+    if backend == "torch":
+        return TorchRetrieval(big_npy, device, k)
+    if backend == "faiss":
+        return FaissRetrieval(index, big_npy, k)
+    raise ValueError(f"Unknown retrieval backend: {backend}")
@@ -0,0 +1,266 @@
+import time
+import torch
+import numpy as np
+from scipy import signal
+
+from rvc_cli.rvc.infer.pipeline import EMBEDDER_HOP, ah, bh
+from rvc_cli.rvc.infer.f0_postprocess import median_filter_f0
+
+# Default block, context and crossfade lengths in seconds
+DEFAULT_BLOCK_SECONDS = 0.25
+DEFAULT_CONTEXT_SECONDS = 1.0
+DEFAULT_CROSSFADE_SECONDS = 0.05
+
+
+class StreamingConverter:
+    """
+    Converts a live 16 kHz signal block by block with a loaded voice model.
+
+    Every block is appended to a rolling buffer of context + crossfade + block samples.
+    The embedder, F0 estimation and synthesizer encoder run on the whole buffer, while the
+    vocoder only generates the crossfade and block frames at its end, through the rate
+    argument of Synthesizer.infer. The first crossfade samples of each output are blended
+    with the last crossfade samples generated for the previous block, so the output is
+    delayed by one block plus the crossfade. Longer contexts give the embedder and pitch
+    tracker more to work with at the cost of compute per block.
+    """
+
+    def __init__(
+        self,
+        pipeline,
+        model,
+        net_g,
+        sid,
+        version,
+        pitch_guidance,
+        tgt_sr,
+        pitch=0,
+        f0_method="rmvpe",
+        hop_length=128,
+        filter_radius=3,
+        retriever=None,
+        index_rate=0.0,
+        protect=0.5,
+        f0_autotune=False,
+        f0_autotune_strength=1,
+        block_seconds=DEFAULT_BLOCK_SECONDS,
+        context_seconds=DEFAULT_CONTEXT_SECONDS,
+        crossfade_seconds=DEFAULT_CROSSFADE_SECONDS,
+    ):
+        """
+        Initializes the StreamingConverter with a loaded model and the stream geometry.
+
+        Block, context and crossfade lengths are rounded up to whole embedder frames (20 ms).
+
+        Args:
+            pipeline: The Pipeline instance of the model's target sampling rate.
+            model: The feature extractor model.
+            net_g: The generative model for synthesizing speech.
+            sid: Speaker ID for the target voice.
+            version: Model version ("v1" or "v2").
+            pitch_guidance: Whether the model uses pitch guidance.
+            tgt_sr: Sampling rate of the model output.
+            pitch: Key to adjust the pitch of the F0 contour.
+            f0_method: Method to use for F0 estimation.
+            hop_length: Hop length for F0 estimation methods.
+            filter_radius: Radius for median filtering the F0 contour.
+            retriever: Retrieval backend for speaker embedding retrieval, or None.
+            index_rate: Blending rate for speaker embedding retrieval.
+            protect: Protection level for preserving the original pitch.
+            f0_autotune: Whether to apply autotune to the F0 contour.
+            f0_autotune_strength: Strength of the autotune snapping.
+            block_seconds: Length of the input blocks.
+            context_seconds: Length of past input analysed together with each block.
+            crossfade_seconds: Length of the crossfade between consecutive output blocks.
+        """
+        self.pipeline = pipeline
+        self.model = model
+        self.net_g = net_g
+        self.sid = torch.tensor(sid, device=pipeline.device).unsqueeze(0).long()
+        self.version = version
+        self.pitch_guidance = pitch_guidance
+        self.tgt_sr = tgt_sr
+        self.pitch = pitch
+        self.f0_method = f0_method
+        self.hop_length = hop_length
+        self.filter_radius = filter_radius
+        self.retriever = retriever if index_rate > 0 else None
+        self.index_rate = index_rate
+        self.protect = protect
+        self.f0_autotune = f0_autotune
+        self.f0_autotune_strength = f0_autotune_strength
+
+        self.sample_rate = pipeline.sample_rate
+        self.window = pipeline.window
+        self.block_size = self.to_samples(block_seconds)
+        self.context_size = self.to_samples(context_seconds)
+        self.crossfade_size = self.to_samples(crossfade_seconds)
+        if self.block_size < self.crossfade_size:
+            raise ValueError("The block must be at least as long as the crossfade.")
+        self.buffer_size = self.context_size + self.crossfade_size + self.block_size
+        # output samples per F0 frame
+        self.upp = tgt_sr // (self.sample_rate // self.window)
+        self.block_size_tgt = self.block_size // self.window * self.upp
+        self.crossfade_size_tgt = self.crossfade_size // self.window * self.upp
+        fade = np.sin(0.5 * np.pi * np.linspace(0, 1, self.crossfade_size_tgt)) ** 2
+        self.fade_in = fade.astype(np.float32)
+        self.fade_out = 1 - self.fade_in
+        self.reset()
+
+    def to_samples(self, seconds):
+        """
+        Converts a length in seconds to 16 kHz samples, rounded up to whole embedder frames.
+
+        Args:
+            seconds: The length in seconds.
+        """
+        frames = int(np.ceil(seconds * self.sample_rate / EMBEDDER_HOP))
+        return frames * EMBEDDER_HOP
+
+    def reset(self):
+        """
+        Clears the input history, the pending crossfade tail and the block timings.
+        """
+        self.buffer = np.zeros(self.buffer_size, dtype=np.float32)
+        self.filter_state = signal.lfilter_zi(bh, ah) * 0
+        self.tail = np.zeros(self.crossfade_size_tgt, dtype=np.float32)
+        self.block_times = []
+
+    @property
+    def latency(self):
+        """
+        Algorithmic latency in seconds: the block being collected plus the crossfade held
+        back for the next block, not counting compute time.
+        """
+        return (self.block_size + self.crossfade_size) / self.sample_rate
+
+    def process_block(self, block):
+        """
+        Converts one block of input.
+
+        Args:
+            block: block_size samples of 16 kHz mono audio as a NumPy array.
+
+        Returns:
+            block_size_tgt samples of converted audio at tgt_sr, delayed by the latency.
+        """
+        if block.shape[0] != self.block_size:
+            raise ValueError(
+                f"Expected a block of {self.block_size} samples, got {block.shape[0]}."
+            )
+        start = time.perf_counter()
+        # causal version of the pipeline's high-pass filter
+        block, self.filter_state = signal.lfilter(
+            bh, ah, block, zi=self.filter_state
+        )
+        self.buffer = np.concatenate(
+            [self.buffer[self.block_size :], block.astype(np.float32)]
+        )
+        audio = self.convert_buffer()
+        output = audio[: self.block_size_tgt].copy()
+        output[: self.crossfade_size_tgt] = (
+            output[: self.crossfade_size_tgt] * self.fade_in + self.tail * self.fade_out
+        )
+        self.tail = audio[
+            self.block_size_tgt : self.block_size_tgt + self.crossfade_size_tgt
+        ]
+        self.block_times.append(time.perf_counter() - start)
+        return output
+
+    def flush(self):
+        """
+        Returns the crossfade tail still held back after the last block, faded out.
+        """
+        tail = self.tail * self.fade_out
+        self.tail = np.zeros_like(self.tail)
+        return tail
+
+    def convert_buffer(self):
+        """
+        Runs the embedder, F0 estimation and synthesis on the buffer and returns the audio
+        of its last crossfade + block samples.
+        """
+        pipeline = self.pipeline
+        p_len = self.buffer_size // self.window
+        with torch.no_grad():
+            feats0 = pipeline.extract_features(self.model, self.buffer, self.version)
+            # the embedder drops its last frame; repeat it to cover the whole buffer
+            feats0 = torch.cat([feats0, feats0[:, -1:]], dim=1)
+            feats = (
+                pipeline.blend_features(
+                    [feats0],
+                    pipeline.search_features([feats0], self.retriever),
+                    self.index_rate,
+                )[0]
+                if self.retriever
+                else feats0
+            )
+            pitch, pitchf = None, None
+            if self.pitch_guidance:
+                f0 = pipeline.extract_f0(
+                    None, self.buffer, p_len, self.f0_method, self.hop_length
+                )
+                f0 = median_filter_f0(np.asarray(f0)[:p_len], self.filter_radius)
+                pitch, pitchf = pipeline.finalize_f0(
+                    f0, self.pitch, self.f0_autotune, self.f0_autotune_strength
+                )
+                pitch = torch.tensor(pitch, device=pipeline.device).unsqueeze(0).long()
+                pitchf = (
+                    torch.tensor(pitchf, device=pipeline.device).unsqueeze(0).float()
+                )
+            feats, p_len, pitch, pitchf = pipeline.prepare_segment(
+                feats,
+                feats0 if self.pitch_guidance else None,
+                p_len,
+                pitch,
+                pitchf,
+                self.protect,
+            )
+            # vocode only the crossfade and block frames; int() in Synthesizer.infer
+            # truncates, so aim half a frame into the skipped head
+            skip = p_len - (self.crossfade_size + self.block_size) // self.window
+            rate = torch.tensor([1 - (skip + 0.5) / p_len], device=feats.device)
+            audio = self.net_g.infer(
+                feats,
+                torch.tensor([p_len], device=feats.device).long(),
+                pitch,
+                pitchf,
+                self.sid,
+                rate=rate,
+            )[0][0, 0]
+        return audio.data.cpu().float().numpy()
+
+    def stats(self):
+        """
+        Returns the latency and the compute time per block.
+        """
+        times = np.array(self.block_times) * 1000
+        block_ms = 1000 * self.block_size / self.sample_rate
+        if times.size == 0:
+            times = np.zeros(1)
+        return {
+            "blocks": len(self.block_times),
+            "block_ms": block_ms,
+            "context_ms": 1000 * self.context_size / self.sample_rate,
+            "crossfade_ms": 1000 * self.crossfade_size / self.sample_rate,
+            "latency_ms": 1000 * self.latency,
+            "mean_ms": float(times.mean()),
+            "p95_ms": float(np.percentile(times, 95)),
+            "max_ms": float(times.max()),
+            "realtime_factor": float(times.mean() / block_ms),
+            "late_blocks": int(np.sum(times > block_ms)),
+        }
+
+    def format_stats(self):
+        """
+        Formats the latency and per-block compute times for printing.
+        """
+        stats = self.stats()
+        return (
+            f"{stats['blocks']} blocks of {stats['block_ms']:.0f} ms "
+            f"({stats['context_ms']:.0f} ms context, {stats['crossfade_ms']:.0f} ms crossfade): "
+            f"algorithmic latency {stats['latency_ms']:.0f} ms, compute per block "
+            f"mean {stats['mean_ms']:.1f} ms, p95 {stats['p95_ms']:.1f} ms, "
+            f"max {stats['max_ms']:.1f} ms ({stats['realtime_factor']:.2f}x the block length, "
+            f"{stats['late_blocks']} blocks over budget)"
+        )
@@ -7,10 +7,9 @@ import resampy
 import torch
 import torchcrepe
 import torchfcpe
-import os
 
 # from tools.anyf0.rmvpe import RMVPE
-from rvc_cli.rvc.lib.predictors.RMVPE import RMVPE0Predictor
+from rvc_cli.rvc.infer.predictor_registry import predictor_registry
 from rvc_cli.rvc.configs.config import Config
 
 config = Config()
@@ -77,11 +76,11 @@ class F0Extractor:
             )
             f0 = f0.squeeze().cpu().numpy()
         elif method == "rmvpe":
-            model_rmvpe = RMVPE0Predictor(
-                os.path.join("rvc_cli", "rvc", "models", "predictors", "rmvpe.pt"),
-                is_half=config.is_half,
-                device=config.device,
-                # hop_length=80
+            model_rmvpe = predictor_registry.get_rmvpe(
+                config.is_half,
+                config.device,
+                config.rmvpe_chunk_seconds,
+                config.rmvpe_chunk_workers,
             )
             f0 = model_rmvpe.infer_from_audio(self.wav16k, thred=0.03)
 
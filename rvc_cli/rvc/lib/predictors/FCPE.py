@@ -18,6 +18,8 @@ from einops import rearrange, repeat
 from local_attention import LocalAttention
 from torch import nn
 
+from rvc_cli.rvc.infer.f0_postprocess import upsample_f0
+
 os.environ["LRU_CACHE_CAPACITY"] = "3"
 
 
@@ -754,10 +756,10 @@ class FCPEInfer:
         self.wav2mel = Wav2Mel(self.args, dtype=self.dtype, device=self.device)
 
     @torch.no_grad()
-    def __call__(self, audio, sr, threshold=0.05):
+    def __call__(self, audio, sr, threshold=0.05, speed=1):
         self.model.threshold = threshold
         audio = audio[None, :]
-        mel = self.wav2mel(audio=audio, sample_rate=sr).to(self.dtype)
+        mel = self.wav2mel(audio=audio, sample_rate=sr, speed=speed).to(self.dtype)
         f0 = self.model(mel=mel, infer=True, return_hz_f0=True)
         return f0
 
@@ -781,11 +783,13 @@ class Wav2Mel:
         )
         self.resample_kernel = {}
 
-    def extract_nvstft(self, audio, keyshift=0, train=False):
-        mel = self.stft.get_mel(audio, keyshift=keyshift, train=train).transpose(1, 2)
+    def extract_nvstft(self, audio, keyshift=0, train=False, speed=1):
+        mel = self.stft.get_mel(
+            audio, keyshift=keyshift, speed=speed, train=train
+        ).transpose(1, 2)
         return mel
 
-    def extract_mel(self, audio, sample_rate, keyshift=0, train=False):
+    def extract_mel(self, audio, sample_rate, keyshift=0, train=False, speed=1):
         audio = audio.to(self.dtype).to(self.device)
         if sample_rate == self.sample_rate:
             audio_res = audio
@@ -801,17 +805,19 @@ class Wav2Mel:
             audio_res = self.resample_kernel[key_str](audio)
 
         mel = self.extract_nvstft(
-            audio_res, keyshift=keyshift, train=train
+            audio_res, keyshift=keyshift, train=train, speed=speed
         )  # B, n_frames, bins
-        n_frames = int(audio.shape[1] // self.hop_size) + 1
+        n_frames = int(audio.shape[1] // (self.hop_size * speed)) + 1
         mel = (
             torch.cat((mel, mel[:, -1:, :]), 1) if n_frames > int(mel.shape[1]) else mel
         )
         mel = mel[:, :n_frames, :] if n_frames < int(mel.shape[1]) else mel
         return mel
 
-    def __call__(self, audio, sample_rate, keyshift=0, train=False):
-        return self.extract_mel(audio, sample_rate, keyshift=keyshift, train=train)
+    def __call__(self, audio, sample_rate, keyshift=0, train=False, speed=1):
+        return self.extract_mel(
+            audio, sample_rate, keyshift=keyshift, train=train, speed=speed
+        )
 
 
 class DotDict(dict):
@@ -899,14 +905,20 @@ class FCPEF0Predictor(F0Predictor):
         f0 = np.interp(time_frame, time_org, f0, left=f0[0], right=f0[-1])
         return f0, vuv_vector.cpu().numpy()
 
-    def compute_f0(self, wav, p_len=None):
+    def compute_f0(self, wav, p_len=None, decimation=1):
         x = torch.FloatTensor(wav).to(self.dtype).to(self.device)
         p_len = x.shape[0] // self.hop_length if p_len is None else p_len
-        f0 = self.fcpe(x, sr=self.sample_rate, threshold=self.threshold)[0, :, 0]
+        f0 = self.fcpe(
+            x, sr=self.sample_rate, threshold=self.threshold, speed=decimation
+        )[0, :, 0]
         if torch.all(f0 == 0):
             return f0.cpu().numpy() if p_len is None else np.zeros(p_len), (
                 f0.cpu().numpy() if p_len is None else np.zeros(p_len)
             )
+        if decimation > 1:
+            # bring the reduced-rate contour back to p_len frames before post-processing
+            positions = np.arange(p_len) * len(f0) / p_len
+            f0 = upsample_f0(f0.float().cpu().numpy(), positions)
         return self.post_process(x, self.sample_rate, f0, p_len)[0]
 
     def compute_f0_uv(self, wav, p_len=None):
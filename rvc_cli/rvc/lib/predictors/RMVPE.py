@@ -5,10 +5,17 @@ import numpy as np
 
 from librosa.filters import mel
 from typing import List
+from concurrent.futures import ThreadPoolExecutor
 
 # Constants for readability
 N_MELS = 128
 N_CLASS = 360
+# Hop of the mel frames in 16 kHz samples
+MEL_HOP = 160
+# Frames shared by consecutive windows in chunked inference, crossfaded linearly
+CHUNK_OVERLAP_FRAMES = 100
+# Extra frames of audio around each window so its mel frames match whole-input ones
+CHUNK_MEL_CONTEXT_FRAMES = 4
 
 
 # Define a helper function for creating convolutional blocks
@@ -441,9 +448,11 @@ class RMVPE0Predictor:
         model_path (str): Path to the RMVPE0 model file.
         is_half (bool): Whether to use half-precision floating-point numbers.
         device (str, optional): Device to use for computation. Defaults to None, which uses CUDA if available.
+        chunk_seconds (float, optional): Length of the windows longer inputs are processed in, bounding memory use. Defaults to 0, which processes inputs whole.
+        chunk_workers (int, optional): Number of threads processing windows concurrently. Defaults to 1.
     """
 
-    def __init__(self, model_path, is_half, device=None):
+    def __init__(self, model_path, is_half, device=None, chunk_seconds=0, chunk_workers=1):
         self.resample_kernel = {}
         model = E2E(4, 1, (2, 2))
         ckpt = torch.load(model_path, map_location="cpu")
@@ -461,6 +470,8 @@ class RMVPE0Predictor:
         self.model = self.model.to(device)
         cents_mapping = 20 * np.arange(N_CLASS) + 1997.3794084376191
         self.cents_mapping = np.pad(cents_mapping, (4, 4))
+        self.chunk_frames = int(chunk_seconds * 16000 / MEL_HOP)
+        self.chunk_workers = chunk_workers
 
     def mel2hidden(self, mel):
         """
@@ -498,6 +509,9 @@ class RMVPE0Predictor:
             audio (np.ndarray): Audio signal.
             thred (float, optional): Threshold for salience. Defaults to 0.03.
         """
+        n_frames = audio.shape[0] // MEL_HOP + 1
+        if self.chunk_frames and n_frames > self.chunk_frames:
+            return self.infer_from_audio_chunked(audio, thred=thred)
         audio = torch.from_numpy(audio).float().to(self.device).unsqueeze(0)
         mel = self.mel_extractor(audio, center=True)
         hidden = self.mel2hidden(mel)
@@ -507,6 +521,69 @@ class RMVPE0Predictor:
         f0 = self.decode(hidden, thred=thred)
         return f0
 
+    def window_salience(self, audio, start, end):
+        """
+        Computes the salience of frames [start, end) of an input.
+
+        The window is embedded with a few frames of surrounding audio so its mel frames
+        equal those of the whole input.
+
+        Args:
+            audio (np.ndarray): Audio signal.
+            start (int): First frame of the window.
+            end (int): End frame of the window (exclusive).
+        """
+        context_start = max(0, start - CHUNK_MEL_CONTEXT_FRAMES)
+        context_end = end - 1 + CHUNK_MEL_CONTEXT_FRAMES
+        segment = audio[context_start * MEL_HOP : context_end * MEL_HOP + 1]
+        segment = torch.from_numpy(segment).float().to(self.device).unsqueeze(0)
+        mel = self.mel_extractor(segment, center=True)
+        mel = mel[:, :, start - context_start : end - context_start]
+        hidden = self.mel2hidden(mel).squeeze(0).cpu().numpy()
+        return hidden.astype("float32") if self.is_half else hidden
+
+    def infer_from_audio_chunked(self, audio, thred=0.03):
+        """
+        Infers F0 from audio in overlapping windows of chunk_frames frames, so memory use
+        does not grow with the input length.
+
+        The salience of consecutive windows is crossfaded linearly over
+        CHUNK_OVERLAP_FRAMES frames before decoding. With chunk_workers above 1, that many
+        windows are computed concurrently.
+
+        Args:
+            audio (np.ndarray): Audio signal.
+            thred (float, optional): Threshold for salience. Defaults to 0.03.
+        """
+        n_frames = audio.shape[0] // MEL_HOP + 1
+        overlap = min(CHUNK_OVERLAP_FRAMES, self.chunk_frames // 4)
+        hop = self.chunk_frames - overlap
+        windows = [
+            (start, min(start + self.chunk_frames, n_frames))
+            for start in range(0, max(n_frames - overlap, 1), hop)
+        ]
+        fade_in = ((np.arange(overlap) + 0.5) / overlap)[:, None]
+        f0 = np.zeros(n_frames)
+        previous_tail = None
+        with ThreadPoolExecutor(max_workers=max(1, self.chunk_workers)) as executor:
+            for batch_start in range(0, len(windows), max(1, self.chunk_workers)):
+                batch = windows[batch_start : batch_start + max(1, self.chunk_workers)]
+                saliences = executor.map(
+                    lambda window: self.window_salience(audio, *window), batch
+                )
+                for (start, end), salience in zip(batch, saliences):
+                    if previous_tail is not None:
+                        salience[:overlap] = (
+                            previous_tail * (1 - fade_in) + salience[:overlap] * fade_in
+                        )
+                    if end < n_frames:
+                        previous_tail = salience[-overlap:]
+                        salience = salience[:-overlap]
+                    f0[start : start + salience.shape[0]] = self.decode(
+                        salience, thred=thred
+                    )
+        return f0
+
     def to_local_average_cents(self, salience, thred=0.05):
         """
         Converts salience to local average cents.
@@ -517,16 +594,10 @@ class RMVPE0Predictor:
         """
         center = np.argmax(salience, axis=1)
         salience = np.pad(salience, ((0, 0), (4, 4)))
-        center += 4
-        todo_salience = []
-        todo_cents_mapping = []
-        starts = center - 4
-        ends = center + 5
-        for idx in range(salience.shape[0]):
-            todo_salience.append(salience[:, starts[idx] : ends[idx]][idx])
-            todo_cents_mapping.append(self.cents_mapping[starts[idx] : ends[idx]])
-        todo_salience = np.array(todo_salience)
-        todo_cents_mapping = np.array(todo_cents_mapping)
+        # the 9 bins around each peak, in padded bin coordinates
+        bins = center[:, None] + np.arange(9)
+        todo_salience = np.take_along_axis(salience, bins, axis=1)
+        todo_cents_mapping = self.cents_mapping[bins]
         product_sum = np.sum(todo_salience * todo_cents_mapping, 1)
         weight_sum = np.sum(todo_salience, 1)
         devided = product_sum / weight_sum
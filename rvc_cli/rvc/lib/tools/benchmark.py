@@ -0,0 +1,951 @@
+import os
+import sys
+import time
+import numpy as np
+import torch
+
+now_dir = os.getcwd()
+sys.path.append(now_dir)
+
+from rvc_cli.rvc.configs.config import Config
+
+
+def synchronize(device):
+    """
+    Waits for pending work on a CUDA device so timings include it.
+
+    Parameters:
+    - device (str): The device the timed work ran on.
+    """
+    if str(device).startswith("cuda"):
+        torch.cuda.synchronize()
+
+
+def time_call(function, repeats=3):
+    """
+    Runs a function several times and returns the best wall-clock time in seconds.
+
+    Parameters:
+    - function (callable): The function to time.
+    - repeats (int): Number of timed runs (default is 3).
+
+    Returns:
+    - float: The fastest run time in seconds.
+    - object: The return value of the last run.
+    """
+    best = float("inf")
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def reset_peak_memory(device):
+    """
+    Starts a new peak memory measurement.
+
+    On CUDA devices the peak of allocated tensor memory is measured. On CPU the peak resident
+    set size of the process is measured, which is only supported on Linux.
+
+    Parameters:
+    - device (str): The device the measured work runs on.
+
+    Returns:
+    - float: The memory in use when the measurement starts, in MB.
+    """
+    if str(device).startswith("cuda"):
+        torch.cuda.synchronize()
+        torch.cuda.reset_peak_memory_stats()
+        return torch.cuda.memory_allocated() / 1024**2
+    try:
+        # writing 5 to clear_refs resets the peak resident set size (VmHWM)
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        return float("nan")
+    return read_process_memory("VmRSS")
+
+
+def get_peak_memory(device):
+    """
+    Returns the peak memory since the last reset_peak_memory call, in MB.
+
+    Parameters:
+    - device (str): The device the measured work ran on.
+    """
+    if str(device).startswith("cuda"):
+        torch.cuda.synchronize()
+        return torch.cuda.max_memory_allocated() / 1024**2
+    return read_process_memory("VmHWM")
+
+
+def read_process_memory(field):
+    """
+    Reads a memory field of /proc/self/status, in MB.
+
+    Parameters:
+    - field (str): Name of the field, such as "VmRSS" or "VmHWM".
+
+    Returns:
+    - float: The value in MB, or NaN when it cannot be read.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return float("nan")
+
+
+def benchmark_retrieval(
+    sizes=(10000, 50000, 100000, 300000), dim=768, n_queries=2000, k=8
+):
+    """
+    Compares the FAISS and torch retrieval backends on synthetic flat indexes.
+
+    Parameters:
+    - sizes (tuple of int): Numbers of stored vectors to benchmark.
+    - dim (int): Feature dimension (768 for v2 models, 256 for v1).
+    - n_queries (int): Number of query frames per search (2000 frames is 40 s of audio).
+    - k (int): Number of neighbours blended per frame.
+
+    Returns:
+    - list of dict: Timing and agreement results per index size.
+    """
+    import faiss
+    from rvc_cli.rvc.infer.retrieval import FaissRetrieval, TorchRetrieval
+
+    config = Config()
+    dtype = torch.float16 if config.is_half else torch.float32
+    rng = np.random.default_rng(0)
+    results = []
+    print(
+        f"{'vectors':>10} {'faiss ms':>10} {'torch ms':>10} {'speed-up':>9} {'max diff':>10}"
+    )
+    for size in sizes:
+        vectors = rng.standard_normal((size, dim), dtype=np.float32)
+        index = faiss.IndexFlatL2(dim)
+        index.add(vectors)
+        queries = vectors[rng.integers(0, size, n_queries)]
+        queries = queries + 0.1 * rng.standard_normal(queries.shape, dtype=np.float32)
+        feats = torch.from_numpy(queries).to(config.device, dtype)
+
+        faiss_backend = FaissRetrieval(index, vectors, k)
+        torch_backend = TorchRetrieval(vectors, config.device, k)
+
+        def run_torch():
+            retrieved = torch_backend.search(feats)
+            synchronize(config.device)
+            return retrieved
+
+        faiss_time, faiss_out = time_call(lambda: faiss_backend.search(feats))
+        torch_time, torch_out = time_call(run_torch)
+        max_diff = (faiss_out.float() - torch_out.float()).abs().max().item()
+        results.append(
+            {
+                "vectors": size,
+                "faiss_ms": faiss_time * 1000,
+                "torch_ms": torch_time * 1000,
+                "max_diff": max_diff,
+            }
+        )
+        print(
+            f"{size:>10} {faiss_time * 1000:>10.1f} {torch_time * 1000:>10.1f} "
+            f"{faiss_time / torch_time:>8.2f}x {max_diff:>10.2e}"
+        )
+        del index, torch_backend, faiss_backend
+    return results
+
+
+def benchmark_synthesis(n_segments=4, batch_sizes=(1, 2, 4), segment_seconds=None):
+    """
+    Compares segment-by-segment synthesis with batched synthesis on a randomly initialized
+    v2 40k generator.
+
+    Parameters:
+    - n_segments (int): Number of segments synthesized per run.
+    - batch_sizes (tuple of int): Maximum batch sizes to benchmark (1 is the per-segment loop).
+    - segment_seconds (float): Segment length (default matches the pipeline segments of the current device).
+
+    Returns:
+    - list of dict: Timing results per batch size.
+    """
+    from rvc_cli.rvc.infer.pipeline import Pipeline
+    from rvc_cli.rvc.lib.algorithm.synthesizers import Synthesizer
+
+    config = Config()
+    version_config = config.json_config[os.path.join("v2", "40000.json")]
+    data = version_config["data"]
+    torch.manual_seed(0)
+    net_g = Synthesizer(
+        spec_channels=data["filter_length"] // 2 + 1,
+        segment_size=version_config["train"]["segment_size"] // data["hop_length"],
+        sr=data["sample_rate"],
+        use_f0=True,
+        is_half=config.is_half,
+        **version_config["model"],
+    )
+    del net_g.enc_q
+    net_g.eval().to(config.device)
+    net_g = net_g.half() if config.is_half else net_g.float()
+    dtype = torch.float16 if config.is_half else torch.float32
+
+    if segment_seconds is None:
+        segment_seconds = config.x_center + 2 * config.x_pad
+    frames = int(segment_seconds * 100)
+    segments = []
+    for i in range(n_segments):
+        # vary the lengths slightly like the cut points of a real input
+        length = frames - 7 * i
+        feats = torch.randn(1, length, 768, device=config.device, dtype=dtype)
+        pitch = torch.randint(1, 256, (1, length), device=config.device)
+        pitchf = 100 + 200 * torch.rand(1, length, device=config.device)
+        segments.append((feats, length, pitch, pitchf))
+    sid = torch.tensor([0], device=config.device).long()
+    audio_seconds = sum(length for _, length, _, _ in segments) / 100
+
+    results = []
+    print(f"{n_segments} segments of {segment_seconds:.1f} s")
+    print(
+        f"{'batch':>6} {'total s':>9} {'segments/s':>11} {'x realtime':>11} {'speed-up':>9}"
+    )
+    base_time = None
+    for batch_size in batch_sizes:
+
+        def run():
+            audio = []
+            for start in range(0, n_segments, batch_size):
+                audio.extend(
+                    Pipeline.synthesize(
+                        net_g, sid, segments[start : start + batch_size]
+                    )
+                )
+            synchronize(config.device)
+            return audio
+
+        run_time, _ = time_call(run, repeats=2)
+        base_time = base_time or run_time
+        results.append(
+            {
+                "batch_size": batch_size,
+                "total_s": run_time,
+                "segments_per_s": n_segments / run_time,
+                "realtime_factor": audio_seconds / run_time,
+            }
+        )
+        print(
+            f"{batch_size:>6} {run_time:>9.2f} {n_segments / run_time:>11.2f} "
+            f"{audio_seconds / run_time:>11.1f} {base_time / run_time:>8.2f}x"
+        )
+    del net_g, segments
+    return results
+
+
+def loop_cut_points(audio, window, t_query, t_center, t_max):
+    """
+    Chooses cut points with the shifted-view summation loop plan_cut_points replaced,
+    kept as the reference the planner is checked against.
+
+    Parameters:
+    - audio (np.ndarray): The audio signal.
+    - window (int): Number of samples summed to measure loudness.
+    - t_query (int): Search radius around each nominal cut, in samples.
+    - t_center (int): Distance between nominal cuts, in samples.
+    - t_max (int): Longest input processed as a single segment, in samples.
+
+    Returns:
+    - list of int: The cut points, in samples.
+    """
+    audio_pad = np.pad(audio, (window // 2, window // 2), mode="reflect")
+    opt_ts = []
+    if audio_pad.shape[0] > t_max:
+        audio_sum = np.zeros_like(audio)
+        for i in range(window):
+            audio_sum += audio_pad[i : i - window]
+        for t in range(t_center, audio.shape[0], t_center):
+            opt_ts.append(
+                t
+                - t_query
+                + np.where(
+                    np.abs(audio_sum[t - t_query : t + t_query])
+                    == np.abs(audio_sum[t - t_query : t + t_query]).min()
+                )[0][0]
+            )
+    return opt_ts
+
+
+def benchmark_segmentation(durations=(60, 600, 1800), repeats=3):
+    """
+    Compares the cut point planner with the shifted-view summation loop it replaced, on
+    synthetic speech-like audio with pauses.
+
+    Parameters:
+    - durations (tuple of int): Input lengths in seconds.
+    - repeats (int): Number of timed runs per planner.
+
+    Returns:
+    - list of dict: Timing results per input length and whether the cut points matched.
+    """
+    from scipy import signal
+    from rvc_cli.rvc.lib.tools.segmentation import plan_cut_points
+
+    config = Config()
+    sample_rate = 16000
+    params = (
+        160,
+        sample_rate * config.x_query,
+        sample_rate * config.x_center,
+        sample_rate * config.x_max,
+    )
+    rng = np.random.default_rng(0)
+    bh, ah = signal.butter(N=5, Wn=48, btype="high", fs=sample_rate)
+    results = []
+    print(
+        f"{'seconds':>8} {'cuts':>6} {'loop ms':>10} {'planner ms':>11} {'speed-up':>9} {'identical':>10}"
+    )
+    for duration in durations:
+        n = duration * sample_rate
+        # 0.1-2 s syllable envelopes with short pauses over low-level noise
+        envelope = np.repeat(
+            rng.uniform(0, 1, n // 1600 + 1) ** 2 * (rng.random(n // 1600 + 1) > 0.2),
+            1600,
+        )[:n]
+        audio = envelope * rng.standard_normal(n) + 1e-4 * rng.standard_normal(n)
+        audio = signal.filtfilt(bh, ah, audio)
+
+        loop_time, loop_cuts = time_call(
+            lambda: loop_cut_points(audio, *params), repeats
+        )
+        plan_time, plan_cuts = time_call(
+            lambda: plan_cut_points(audio, *params), repeats
+        )
+        identical = [int(t) for t in loop_cuts] == plan_cuts
+        results.append(
+            {
+                "seconds": duration,
+                "cuts": len(plan_cuts),
+                "loop_ms": loop_time * 1000,
+                "planner_ms": plan_time * 1000,
+                "identical": identical,
+            }
+        )
+        print(
+            f"{duration:>8} {len(plan_cuts):>6} {loop_time * 1000:>10.1f} {plan_time * 1000:>11.1f} "
+            f"{loop_time / plan_time:>8.1f}x {str(identical):>10}"
+        )
+    return results
+
+
+def loop_autotune_f0(f0, f0_autotune_strength):
+    """
+    Autotunes an F0 contour with the per-frame loop autotune_f0 replaced, kept as the
+    reference the array version is checked against.
+
+    Parameters:
+    - f0 (np.ndarray): The F0 contour.
+    - f0_autotune_strength (float): Strength of the pull towards the closest note.
+
+    Returns:
+    - np.ndarray: The autotuned contour.
+    """
+    from rvc_cli.rvc.infer.f0_postprocess import REF_FREQS
+
+    autotuned_f0 = np.zeros_like(f0)
+    for i, freq in enumerate(f0):
+        closest_note = min(REF_FREQS, key=lambda x: abs(x - freq))
+        autotuned_f0[i] = freq + (closest_note - freq) * f0_autotune_strength
+    return autotuned_f0
+
+
+def benchmark_f0_postprocess(durations=(60, 600, 1800), repeats=3):
+    """
+    Compares the array-at-a-time F0 post-processing with the per-frame autotune loop it
+    replaced, on synthetic sung F0 contours, and times the voicing-aware median filter.
+
+    Parameters:
+    - durations (tuple of int): Input lengths in seconds.
+    - repeats (int): Number of timed runs of the array implementations.
+
+    Returns:
+    - list of dict: Timing results per input length and whether the voiced frames matched.
+    """
+    from rvc_cli.rvc.infer.f0_postprocess import (
+        REF_FREQS,
+        autotune_f0,
+        median_filter_f0,
+        quantize_f0,
+    )
+
+    frame_rate = 100
+    rng = np.random.default_rng(0)
+    # compile the median filter before timing it
+    median_filter_f0(np.ones(16), 3)
+    results = []
+    print(
+        f"{'seconds':>8} {'loop ms':>10} {'array ms':>9} {'speed-up':>9} {'median ms':>10} {'identical':>10}"
+    )
+    for duration in durations:
+        n = duration * frame_rate
+        # vibrato around notes held for 0.2-1 s, with 30% unvoiced frames
+        notes = np.repeat(
+            rng.uniform(80, 800, n // 20 + 1), rng.integers(20, 100, n // 20 + 1)
+        )[:n]
+        f0 = notes * 2 ** (0.3 * np.sin(np.arange(n) / 5) / 12)
+        f0[rng.random(n) < 0.3] = 0
+
+        loop_time, loop_f0 = time_call(lambda: loop_autotune_f0(f0, 0.8), 1)
+        loop_coarse = quantize_f0(np.where(f0 > 0, loop_f0, 0), 50, 1100)
+        array_time, array_f0 = time_call(
+            lambda: quantize_f0(autotune_f0(f0, REF_FREQS, 0.8), 50, 1100), repeats
+        )
+        median_time, _ = time_call(lambda: median_filter_f0(f0, 3), repeats)
+        voiced = f0 > 0
+        identical = bool(
+            np.array_equal(autotune_f0(f0, REF_FREQS, 0.8)[voiced], loop_f0[voiced])
+            and np.array_equal(array_f0, loop_coarse)
+        )
+        results.append(
+            {
+                "seconds": duration,
+                "loop_ms": loop_time * 1000,
+                "array_ms": array_time * 1000,
+                "median_ms": median_time * 1000,
+                "identical": identical,
+            }
+        )
+        print(
+            f"{duration:>8} {loop_time * 1000:>10.1f} {array_time * 1000:>9.1f} "
+            f"{loop_time / array_time:>8.1f}x {median_time * 1000:>10.1f} {str(identical):>10}"
+        )
+    return results
+
+
+def loop_local_average_cents(cents_mapping, salience, thred):
+    """
+    Decodes RMVPE salience with the per-frame loop to_local_average_cents replaced, kept
+    as the reference the gather-based decoder is checked against.
+
+    Parameters:
+    - cents_mapping (np.ndarray): Cents of every salience bin, padded by 4 on both sides.
+    - salience (np.ndarray): Salience values of shape (frames, N_CLASS).
+    - thred (float): Salience at or below which frames are unvoiced.
+
+    Returns:
+    - np.ndarray: The pitch of every frame in cents, 0 when unvoiced.
+    """
+    center = np.argmax(salience, axis=1)
+    salience = np.pad(salience, ((0, 0), (4, 4)))
+    center += 4
+    todo_salience = []
+    todo_cents_mapping = []
+    for idx in range(salience.shape[0]):
+        todo_salience.append(salience[idx, center[idx] - 4 : center[idx] + 5])
+        todo_cents_mapping.append(cents_mapping[center[idx] - 4 : center[idx] + 5])
+    todo_salience = np.array(todo_salience)
+    todo_cents_mapping = np.array(todo_cents_mapping)
+    devided = np.sum(todo_salience * todo_cents_mapping, 1) / np.sum(todo_salience, 1)
+    devided[np.max(salience, axis=1) <= thred] = 0
+    return devided
+
+
+def benchmark_rmvpe(durations=(60, 600, 3600), chunk_seconds=60, repeats=3):
+    """
+    Compares the gather-based RMVPE salience decoder with the per-frame loop it replaced and,
+    when the RMVPE model is installed, whole-input inference with chunked inference.
+
+    Parameters:
+    - durations (tuple of int): Input lengths in seconds for the decoder comparison.
+    - chunk_seconds (float): Window length of the chunked inference.
+    - repeats (int): Number of timed runs of the decoder.
+
+    Returns:
+    - list of dict: Timing results per input length.
+    """
+    from rvc_cli.rvc.lib.predictors.RMVPE import N_CLASS, RMVPE0Predictor
+
+    config = Config()
+    predictor = RMVPE0Predictor.__new__(RMVPE0Predictor)
+    predictor.cents_mapping = np.pad(
+        20 * np.arange(N_CLASS) + 1997.3794084376191, (4, 4)
+    )
+    rng = np.random.default_rng(0)
+    results = []
+    print(
+        f"{'seconds':>8} {'loop ms':>10} {'gather ms':>10} {'speed-up':>9} {'identical':>10}"
+    )
+    for duration in durations:
+        salience = rng.random((duration * 100, N_CLASS)).astype(np.float32) ** 8
+        loop_time, loop_cents = time_call(
+            lambda: loop_local_average_cents(predictor.cents_mapping, salience, 0.03), 1
+        )
+        gather_time, gather_cents = time_call(
+            lambda: predictor.to_local_average_cents(salience, thred=0.03), repeats
+        )
+        identical = bool(np.array_equal(loop_cents, gather_cents))
+        results.append(
+            {
+                "seconds": duration,
+                "loop_ms": loop_time * 1000,
+                "gather_ms": gather_time * 1000,
+                "identical": identical,
+            }
+        )
+        print(
+            f"{duration:>8} {loop_time * 1000:>10.1f} {gather_time * 1000:>10.1f} "
+            f"{loop_time / gather_time:>8.1f}x {str(identical):>10}"
+        )
+
+    model_path = os.path.join("rvc_cli", "rvc", "models", "predictors", "rmvpe.pt")
+    if not os.path.exists(model_path):
+        print(f"'{model_path}' not found, skipping the chunked inference comparison.")
+        return results
+    sample_rate = 16000
+    duration = max(durations[0], 3 * chunk_seconds)
+    t = np.arange(duration * sample_rate) / sample_rate
+    # a gliding tone with vibrato over low-level noise
+    audio = (
+        0.3 * np.sin(2 * np.pi * 220 * t * (1 + 0.05 * np.sin(2 * np.pi * 0.1 * t)))
+        + 0.01 * rng.standard_normal(t.shape[0])
+    ).astype(np.float32)
+    print(f"{'mode':>8} {'seconds':>8} {'time s':>8} {'peak MB':>8} {'f0 diff':>8}")
+    reference = None
+    for mode, seconds in (("whole", 0), ("chunked", chunk_seconds)):
+        predictor = RMVPE0Predictor(
+            model_path, config.is_half, config.device, chunk_seconds=seconds
+        )
+        with torch.no_grad():
+            baseline = reset_peak_memory(config.device)
+            elapsed, f0 = time_call(lambda: predictor.infer_from_audio(audio), 1)
+            peak = get_peak_memory(config.device) - baseline
+        reference = f0 if reference is None else reference
+        voiced = (f0 > 0) & (reference > 0)
+        difference = float(
+            np.median(np.abs(1200 * np.log2(f0[voiced] / reference[voiced])))
+        )
+        results.append(
+            {
+                "mode": mode,
+                "seconds": duration,
+                "time_s": elapsed,
+                "peak_mb": peak,
+                "median_cents_diff": difference,
+            }
+        )
+        print(
+            f"{mode:>8} {duration:>8} {elapsed:>8.2f} {peak:>8.1f} {difference:>8.3f}"
+        )
+    return results
+
+
+def synthetic_notes(duration, sample_rate=16000, hop=160, seed=0):
+    """
+    Generates notes of 1 to 4 seconds with vibrato, separated by 1 to 3 seconds of noise
+    at -70 dBFS, together with their true F0 contour.
+
+    Parameters:
+    - duration (int): Signal length in seconds.
+    - sample_rate (int): Sampling rate of the signal.
+    - hop (int): Number of samples between frames of the F0 contour.
+    - seed (int): Seed of the random note lengths, pitches and noise.
+
+    Returns:
+    - np.ndarray: The float32 signal.
+    - np.ndarray: The F0 of the frames centred on every hop samples, 0 outside the notes.
+    """
+    rng = np.random.default_rng(seed)
+    audio = 10 ** (-70 / 20) * rng.standard_normal(duration * sample_rate)
+    f0 = np.zeros(audio.shape[0] // hop)
+    position = sample_rate
+    while position < audio.shape[0] - 5 * sample_rate:
+        length = int(rng.uniform(1, 4) * sample_rate)
+        t = np.arange(length) / sample_rate
+        frequency = rng.uniform(110, 440)
+        fade = np.minimum(1, np.minimum(t, t[::-1]) / 0.02)
+        phase = 2 * np.pi * frequency * (t + 0.002 * np.sin(2 * np.pi * 5 * t))
+        audio[position : position + length] += 0.3 * fade * np.sin(phase)
+        # instantaneous frequency of the frames away from the fades
+        frames = np.arange(-(-position // hop), (position + length) // hop)
+        t = frames * hop / sample_rate - position / sample_rate
+        inside = (t >= 0.02) & (t <= length / sample_rate - 0.02)
+        f0[frames[inside]] = frequency * (
+            1 + 0.002 * 2 * np.pi * 5 * np.cos(2 * np.pi * 5 * t[inside])
+        )
+        position += length + int(rng.uniform(1, 3) * sample_rate)
+    return audio.astype(np.float32), f0
+
+
+def benchmark_f0_gate(
+    duration=120, methods=("rmvpe", "fcpe"), threshold_db=-50.0, tolerance_cents=50
+):
+    """
+    Validates energy-gated F0 extraction against full-input extraction on a signal of
+    tones separated by near-silent pauses, and compares their run times.
+
+    Parameters:
+    - duration (int): Input length in seconds.
+    - methods (tuple of str): F0 methods to compare, skipped when their model is not installed.
+    - threshold_db (float): Energy gate threshold in dBFS.
+    - tolerance_cents (float): Largest 95th percentile pitch difference on voiced frames for a match.
+
+    Returns:
+    - list of dict: Timing and accuracy results per method.
+    """
+    from rvc_cli.rvc.infer.pipeline import Pipeline
+    from rvc_cli.rvc.infer.predictor_registry import PREDICTORS_DIR
+    from rvc_cli.rvc.infer.f0_gate import find_active_spans
+
+    pipeline = Pipeline(40000, Config())
+    sample_rate = pipeline.sample_rate
+    audio, _ = synthetic_notes(duration, sample_rate, pipeline.window)
+    p_len = audio.shape[0] // pipeline.window
+    spans = find_active_spans(audio, p_len, pipeline.window, threshold_db)
+    inside = np.zeros(p_len, dtype=bool)
+    for start, end in spans:
+        inside[start:end] = True
+    print(f"{100 * (1 - inside.mean()):.0f}% of {p_len} frames below {threshold_db:g} dBFS")
+
+    results = []
+    print(
+        f"{'method':>8} {'full s':>8} {'gated s':>8} {'speed-up':>9} {'p95 cents':>10} "
+        f"{'vuv diff':>9} {'missed':>7} {'match':>6}"
+    )
+    for method in methods:
+        if not os.path.exists(os.path.join(PREDICTORS_DIR, f"{method}.pt")):
+            print(f"'{method}' model not found, skipping.")
+            continue
+        with torch.no_grad():
+            # warm up the predictor so its load time is not measured
+            pipeline.extract_f0(None, audio[:sample_rate], 100, method, 160)
+            full_time, full = time_call(
+                lambda: pipeline.extract_f0(None, audio, p_len, method, 160), 1
+            )
+            gated_time, gated = time_call(
+                lambda: pipeline.extract_f0(
+                    None, audio, p_len, method, 160, threshold_db
+                ),
+                1,
+            )
+        full = np.asarray(full)[:p_len]
+        gated = np.asarray(gated)[:p_len]
+        voiced = (full > 0) & (gated > 0)
+        cents = np.abs(1200 * np.log2(gated[voiced] / full[voiced]))
+        p95 = float(np.percentile(cents, 95)) if cents.size else 0.0
+        # voicing decisions that differ inside the processed spans
+        vuv_difference = float(np.mean((full > 0)[inside] != (gated > 0)[inside]))
+        # frames voiced by the full extraction but skipped by the gate
+        missed = float(np.mean((full > 0) & ~inside))
+        match = p95 <= tolerance_cents
+        results.append(
+            {
+                "method": method,
+                "full_s": full_time,
+                "gated_s": gated_time,
+                "p95_cents": p95,
+                "vuv_difference": vuv_difference,
+                "missed": missed,
+                "match": match,
+            }
+        )
+        print(
+            f"{method:>8} {full_time:>8.2f} {gated_time:>8.2f} {full_time / gated_time:>8.1f}x "
+            f"{p95:>10.2f} {100 * vuv_difference:>8.2f}% {100 * missed:>6.2f}% {str(match):>6}"
+        )
+    return results
+
+
+def benchmark_f0_decimation(
+    duration=30, methods=("crepe-tiny", "crepe", "fcpe"), factors=(2, 4), hop_length=128
+):
+    """
+    Compares crepe and FCPE run at a reduced frame rate, with their contours interpolated
+    back to full rate, against full-rate extraction. Pitch differences are measured on the
+    frames inside the notes, where the full-rate contour is voiced.
+
+    Parameters:
+    - duration (int): Input length in seconds.
+    - methods (tuple of str): F0 methods to compare; FCPE is skipped when its model is not installed.
+    - factors (tuple of int): Decimation factors to compare with full rate.
+    - hop_length (int): Crepe hop length at full rate.
+
+    Returns:
+    - list of dict: Timing and accuracy results per method and factor.
+    """
+    from rvc_cli.rvc.infer.pipeline import Pipeline
+    from rvc_cli.rvc.infer.predictor_registry import PREDICTORS_DIR
+
+    pipeline = Pipeline(40000, Config())
+    sample_rate = pipeline.sample_rate
+    audio, true_f0 = synthetic_notes(duration, sample_rate, pipeline.window)
+    p_len = audio.shape[0] // pipeline.window
+    results = []
+    print(
+        f"{'method':>11} {'factor':>7} {'time s':>8} {'speed-up':>9} "
+        f"{'median cents':>13} {'p95 cents':>10} {'vuv diff':>9}"
+    )
+    for method in methods:
+        if method == "fcpe" and not os.path.exists(
+            os.path.join(PREDICTORS_DIR, "fcpe.pt")
+        ):
+            print(f"'{method}' model not found, skipping.")
+            continue
+        reference = None
+        for factor in (1,) + tuple(factors):
+            with torch.no_grad():
+                elapsed, f0 = time_call(
+                    lambda: pipeline.extract_f0(
+                        None, audio, p_len, method, hop_length, f0_decimation=factor
+                    ),
+                    1,
+                )
+            f0 = np.nan_to_num(np.asarray(f0, dtype=np.float64))[:p_len]
+            if reference is None:
+                reference, reference_time = f0, elapsed
+            voiced = (f0 > 0) & (reference > 0) & (true_f0 > 0)
+            cents = np.abs(1200 * np.log2(f0[voiced] / reference[voiced]))
+            median = float(np.median(cents)) if cents.size else 0.0
+            p95 = float(np.percentile(cents, 95)) if cents.size else 0.0
+            vuv_difference = float(np.mean((f0 > 0) != (reference > 0)))
+            results.append(
+                {
+                    "method": method,
+                    "factor": factor,
+                    "time_s": elapsed,
+                    "speed_up": reference_time / elapsed,
+                    "median_cents": median,
+                    "p95_cents": p95,
+                    "vuv_difference": vuv_difference,
+                }
+            )
+            print(
+                f"{method:>11} {factor:>7} {elapsed:>8.2f} {reference_time / elapsed:>8.1f}x "
+                f"{median:>13.2f} {p95:>10.2f} {100 * vuv_difference:>8.2f}%"
+            )
+    return results
+
+
+def synthetic_f0_test_signal(sample_rate=16000, hop=160, segment_seconds=4, seed=0):
+    """
+    Generates a test signal with known F0 made of a glide, vibrato, a harmonic-rich tone,
+    stepped notes, noise bursts and silences.
+
+    Parameters:
+    - sample_rate (int): Sampling rate of the signal.
+    - hop (int): Number of samples between frames of the F0 contour.
+    - segment_seconds (float): Length of each voiced segment in seconds.
+    - seed (int): Seed of the noise.
+
+    Returns:
+    - np.ndarray: The float32 signal.
+    - np.ndarray: The F0 of the frames centred on every hop samples, 0 where unvoiced.
+    - np.ndarray: Boolean mask of the frames that are scored, away from voicing changes.
+    - list of tuple: (name, start frame, end frame) of every segment.
+    """
+    rng = np.random.default_rng(seed)
+    length = int(segment_seconds * sample_rate)
+    t = np.arange(length) / sample_rate
+    steps = np.array([196.0, 261.63, 329.63, 392.0, 523.25, 659.25])
+    # (name, F0 per sample, number of harmonics, level)
+    segments = [
+        ("silence", np.zeros(sample_rate), 0, 0.0),
+        ("glide", 80 * 10 ** (t / segment_seconds), 3, 0.3),
+        ("vibrato", 220 * 2 ** (np.sin(2 * np.pi * 6 * t) / 12), 5, 0.3),
+        ("harmonic", 110 * 1.5 ** (t / segment_seconds), 40, 0.2),
+        ("noise", np.zeros(sample_rate), 0, 0.1),
+        ("steps", steps[(t * len(steps) / segment_seconds).astype(int)], 8, 0.3),
+        ("silence", np.zeros(sample_rate), 0, 0.0),
+    ]
+    audio, f0, labels = [], [], []
+    position = 0
+    for name, track, harmonics, level in segments:
+        if harmonics:
+            phase = 2 * np.pi * np.cumsum(track) / sample_rate
+            segment = np.zeros(track.shape[0])
+            for k in range(1, harmonics + 1):
+                # drop the harmonics above the Nyquist frequency
+                audible = k * track < sample_rate / 2
+                segment += np.where(audible, np.sin(k * phase), 0) / k
+            fade = np.minimum(1, np.minimum(t, t[::-1]) / 0.01)
+            segment = level * fade * segment / np.abs(segment).max()
+        else:
+            segment = level * rng.standard_normal(track.shape[0])
+        audio.append(segment + 10 ** (-80 / 20) * rng.standard_normal(track.shape[0]))
+        f0.append(track)
+        labels.append((name, position // hop, (position + track.shape[0]) // hop))
+        position += track.shape[0]
+    audio = np.concatenate(audio).astype(np.float32)
+    f0 = np.concatenate(f0)[:: hop][: audio.shape[0] // hop]
+    # do not score the frames within 30 ms of a voicing change
+    voiced = f0 > 0
+    changes = np.flatnonzero(np.diff(voiced.astype(np.int8))) + 1
+    scored = np.ones(f0.shape[0], dtype=bool)
+    for change in changes:
+        scored[max(0, change - 3) : change + 3] = False
+    return audio, f0, scored, labels
+
+
+def f0_errors(f0, true_f0, scored, gross_threshold=0.2):
+    """
+    Computes the standard pitch tracking errors of an F0 contour against the true contour.
+
+    Parameters:
+    - f0 (np.ndarray): The estimated F0 contour, 0 or NaN where unvoiced.
+    - true_f0 (np.ndarray): The true F0 contour, 0 where unvoiced.
+    - scored (np.ndarray): Boolean mask of the frames to score.
+    - gross_threshold (float): Relative deviation above which a pitch error is gross.
+
+    Returns:
+    - dict: Gross pitch error (share of frames voiced in both whose pitch deviates by more
+      than gross_threshold), voicing decision error (share of frames with the wrong voicing
+      decision) and fine pitch error (mean cents deviation of the other voiced frames).
+    """
+    f0 = np.nan_to_num(np.asarray(f0, dtype=np.float64))[: true_f0.shape[0]]
+    f0 = np.pad(f0, (0, true_f0.shape[0] - f0.shape[0]))
+    f0, true_f0 = f0[scored], true_f0[scored]
+    both_voiced = (f0 > 0) & (true_f0 > 0)
+    deviation = np.abs(f0[both_voiced] / true_f0[both_voiced] - 1)
+    gross = deviation > gross_threshold
+    cents = np.abs(
+        1200 * np.log2(f0[both_voiced][~gross] / true_f0[both_voiced][~gross])
+    )
+    return {
+        "gpe": float(gross.mean()) if gross.size else 0.0,
+        "vde": float(np.mean((f0 > 0) != (true_f0 > 0))),
+        "fpe_cents": float(cents.mean()) if cents.size else 0.0,
+    }
+
+
+def benchmark_f0_methods(
+    methods=(
+        "crepe",
+        "crepe-tiny",
+        "rmvpe",
+        "fcpe",
+        "hybrid[crepe+rmvpe]",
+        "hybrid[rmvpe+fcpe]",
+        "hybrid[crepe+rmvpe+fcpe]",
+    ),
+    segment_seconds=4,
+    hop_length=128,
+):
+    """
+    Compares the accuracy and cost of the F0 methods on a synthetic signal with known F0.
+
+    Methods whose predictor weights are not installed locally are skipped; nothing is
+    downloaded.
+
+    Parameters:
+    - methods (tuple of str): F0 methods to compare, as passed to the pipeline.
+    - segment_seconds (float): Length of each voiced segment of the test signal.
+    - hop_length (int): Crepe hop length.
+
+    Returns:
+    - list of dict: Real-time factor, peak memory and pitch errors per method, overall and
+      per segment.
+    """
+    import re
+    from rvc_cli.rvc.infer.pipeline import Pipeline
+    from rvc_cli.rvc.infer.predictor_registry import PREDICTORS_DIR
+
+    config = Config()
+    pipeline = Pipeline(40000, config)
+    sample_rate = pipeline.sample_rate
+    audio, true_f0, scored, labels = synthetic_f0_test_signal(
+        sample_rate, pipeline.window, segment_seconds
+    )
+    duration = audio.shape[0] / sample_rate
+    p_len = audio.shape[0] // pipeline.window
+    segment_names = list(dict.fromkeys(name for name, _, _ in labels))
+    print(f"{duration:.1f} s test signal: {', '.join(segment_names)}")
+
+    results = []
+    print(
+        f"{'method':>25} {'RTF':>7} {'peak MB':>8} {'GPE':>7} {'VDE':>7} {'FPE cents':>10}"
+    )
+    for method in methods:
+        match = re.search(r"hybrid\[(.+)\]", method)
+        components = match.group(1).split("+") if match else [method]
+        missing = [
+            component
+            for component in components
+            if component in ("rmvpe", "fcpe")
+            and not os.path.exists(os.path.join(PREDICTORS_DIR, f"{component}.pt"))
+        ]
+        if missing:
+            print(f"{method:>25} skipped, '{', '.join(missing)}' model not found")
+            continue
+        with torch.no_grad():
+            # warm up the predictors so their load time is not measured
+            pipeline.extract_f0(None, audio[:sample_rate], 100, method, hop_length)
+            baseline = reset_peak_memory(config.device)
+            elapsed, f0 = time_call(
+                lambda: pipeline.extract_f0(None, audio, p_len, method, hop_length),
+                1,
+            )
+            peak = get_peak_memory(config.device) - baseline
+        errors = f0_errors(f0, true_f0, scored)
+        segments = {}
+        for name in segment_names:
+            mask = np.zeros_like(scored)
+            for label, start, end in labels:
+                if label == name:
+                    mask[start:end] = True
+            segments[name] = f0_errors(f0, true_f0, scored & mask)
+        results.append(
+            {
+                "method": method,
+                "rtf": elapsed / duration,
+                "peak_mb": peak,
+                **errors,
+                "segments": segments,
+            }
+        )
+        print(
+            f"{method:>25} {elapsed / duration:>7.3f} {peak:>8.1f} "
+            f"{100 * errors['gpe']:>6.2f}% {100 * errors['vde']:>6.2f}% "
+            f"{errors['fpe_cents']:>10.2f}"
+        )
+
+    if results:
+        print("GPE / VDE per segment:")
+        print(f"{'method':>25} " + " ".join(f"{name:>15}" for name in segment_names))
+        for result in results:
+            cells = [
+                f"{100 * errors['gpe']:.1f}% / {100 * errors['vde']:.1f}%"
+                for errors in result["segments"].values()
+            ]
+            print(
+                f"{result['method']:>25} " + " ".join(f"{cell:>15}" for cell in cells)
+            )
+    return results
+
+
+benchmark_suites = {
+    "retrieval": benchmark_retrieval,
+    "synthesis": benchmark_synthesis,
+    "segmentation": benchmark_segmentation,
+    "f0_postprocess": benchmark_f0_postprocess,
+    "rmvpe": benchmark_rmvpe,
+    "f0_gate": benchmark_f0_gate,
+    "f0_decimation": benchmark_f0_decimation,
+    "f0_methods": benchmark_f0_methods,
+}
+
+
+def run_benchmark(suite):
+    """
+    Runs a named benchmark suite.
+
+    Parameters:
+    - suite (str): Name of the suite to run.
+
+    Returns:
+    - list of dict: The results reported by the suite.
+    """
+    if suite not in benchmark_suites:
+        raise ValueError(f"Unknown benchmark suite: {suite}")
+    print(f"Running '{suite}' benchmark on {Config().device}...")
+    return benchmark_suites[suite]()
@@ -0,0 +1,326 @@
+import os
+import sys
+import time
+import faiss
+import torch
+import numpy as np
+
+now_dir = os.getcwd()
+sys.path.append(now_dir)
+
+from rvc_cli.rvc.infer.index_cache import (
+    copy_vector_sidecar,
+    get_optimized_index_path,
+    get_sidecar_path,
+    load_vector_sidecar,
+)
+from rvc_cli.rvc.infer.retrieval import FaissRetrieval
+
+# Number of vectors added to a new index at a time
+ADD_CHUNK_SIZE = 65536
+
+INDEX_TYPES = ["ivf", "hnsw", "fp16", "pq"]
+# Index types that store lossy codes and blend from a float16 sidecar of their own
+COMPRESSED_INDEX_TYPES = ["fp16", "pq"]
+
+
+class CastVectors:
+    """
+    A read-only view of a vector array that casts gathered rows to another dtype, used to
+    evaluate a float16 sidecar before it is written.
+    """
+
+    def __init__(self, vectors, dtype):
+        self.vectors = vectors
+        self.dtype = np.dtype(dtype)
+        self.shape = vectors.shape
+
+    def __getitem__(self, key):
+        return np.asarray(self.vectors[key]).astype(self.dtype)
+
+
+def build_ivf_index(vectors, nlist=None, nprobe=8):
+    """
+    Builds an IVF-Flat index over a set of vectors.
+
+    Parameters:
+    - vectors (np.ndarray): The vectors to index, shape (n, dim).
+    - nlist (int): Number of inverted lists (default is 4 * sqrt(n), capped so each list gets 39 training points).
+    - nprobe (int): Number of lists visited per search (default is 8).
+
+    Returns:
+    - faiss.IndexIVFFlat: The trained and filled index.
+    """
+    n, dim = vectors.shape
+    if nlist is None:
+        nlist = int(4 * np.sqrt(n))
+    nlist = max(1, min(nlist, n // 39))
+    quantizer = faiss.IndexFlatL2(dim)
+    index = faiss.IndexIVFFlat(quantizer, dim, nlist)
+    train_size = min(n, 256 * nlist)
+    train_ids = np.random.default_rng(0).choice(n, train_size, replace=False)
+    index.train(np.ascontiguousarray(vectors[np.sort(train_ids)], dtype=np.float32))
+    add_vectors(index, vectors)
+    index.nprobe = min(nprobe, nlist)
+    return index
+
+
+def build_hnsw_index(vectors, hnsw_m=32, ef_construction=200, ef_search=64):
+    """
+    Builds an HNSW-Flat index over a set of vectors.
+
+    Parameters:
+    - vectors (np.ndarray): The vectors to index, shape (n, dim).
+    - hnsw_m (int): Number of graph neighbours per node (default is 32).
+    - ef_construction (int): Candidate list size while building (default is 200).
+    - ef_search (int): Candidate list size while searching (default is 64).
+
+    Returns:
+    - faiss.IndexHNSWFlat: The filled index.
+    """
+    index = faiss.IndexHNSWFlat(vectors.shape[1], hnsw_m)
+    index.hnsw.efConstruction = ef_construction
+    add_vectors(index, vectors)
+    index.hnsw.efSearch = ef_search
+    return index
+
+
+def build_fp16_index(vectors):
+    """
+    Builds a flat index that stores its vectors as float16 scalar-quantized codes.
+
+    Parameters:
+    - vectors (np.ndarray): The vectors to index, shape (n, dim).
+
+    Returns:
+    - faiss.IndexScalarQuantizer: The filled index.
+    """
+    index = faiss.IndexScalarQuantizer(
+        vectors.shape[1], faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_L2
+    )
+    add_vectors(index, vectors)
+    return index
+
+
+def build_pq_index(vectors, pq_m=None, pq_nbits=8):
+    """
+    Builds a product-quantized index. Searches re-rank its candidates against the vector sidecar.
+
+    Parameters:
+    - vectors (np.ndarray): The vectors to index, shape (n, dim).
+    - pq_m (int): Number of sub-quantizers, must divide the dimension (default is dim / 8).
+    - pq_nbits (int): Bits per sub-quantizer code (default is 8).
+
+    Returns:
+    - faiss.IndexPQ: The trained and filled index.
+    """
+    n, dim = vectors.shape
+    pq_m = pq_m or dim // 8
+    if dim % pq_m != 0:
+        raise ValueError(f"pq_m ({pq_m}) must divide the vector dimension ({dim}).")
+    index = faiss.IndexPQ(dim, pq_m, pq_nbits)
+    train_size = min(n, 256 * 2**pq_nbits)
+    train_ids = np.random.default_rng(0).choice(n, train_size, replace=False)
+    index.train(np.ascontiguousarray(vectors[np.sort(train_ids)], dtype=np.float32))
+    add_vectors(index, vectors)
+    return index
+
+
+def add_vectors(index, vectors):
+    """
+    Adds vectors to an index in chunks, so memory-mapped vectors are never copied whole.
+
+    Parameters:
+    - index (faiss.Index): The index to fill.
+    - vectors (np.ndarray): The vectors to add, in id order.
+    """
+    for start in range(0, vectors.shape[0], ADD_CHUNK_SIZE):
+        index.add(
+            np.ascontiguousarray(
+                vectors[start : start + ADD_CHUNK_SIZE], dtype=np.float32
+            )
+        )
+
+
+def exact_search(vectors, queries, k=8):
+    """
+    Finds the exact nearest neighbours of a set of queries by scanning the vectors in chunks,
+    so memory-mapped vectors are never copied whole.
+
+    Parameters:
+    - vectors (np.ndarray): The vectors to search, in id order.
+    - queries (np.ndarray): The query vectors, shape (q, dim), float32.
+    - k (int): Number of neighbours returned (default is 8).
+
+    Returns:
+    - np.ndarray: Squared L2 distances of the neighbours, shape (q, k), nearest first.
+    - np.ndarray: Ids of the neighbours, shape (q, k).
+    """
+    distances = np.zeros((queries.shape[0], 0), dtype=np.float32)
+    ids = np.zeros((queries.shape[0], 0), dtype=np.int64)
+    for start in range(0, vectors.shape[0], ADD_CHUNK_SIZE):
+        chunk = np.ascontiguousarray(
+            vectors[start : start + ADD_CHUNK_SIZE], dtype=np.float32
+        )
+        chunk_distances, chunk_ids = faiss.knn(queries, chunk, min(k, chunk.shape[0]))
+        distances = np.concatenate([distances, chunk_distances], axis=1)
+        ids = np.concatenate([ids, chunk_ids + start], axis=1)
+        # stable, so ties keep the lower id as the flat index does
+        order = np.argsort(distances, axis=1, kind="stable")[:, :k]
+        distances = np.take_along_axis(distances, order, axis=1)
+        ids = np.take_along_axis(ids, order, axis=1)
+    return distances, ids
+
+
+def evaluate_index(index, vectors, blend_vectors=None, sample_size=1000, k=8):
+    """
+    Measures recall@k, per-query latency and blended output difference of an index against
+    an exact search over the original vectors, scanned in chunks rather than indexed in memory.
+
+    The recall queries are a random sample of the indexed vectors themselves; the blend
+    comparison perturbs them slightly so no query sits exactly on a stored vector.
+
+    Parameters:
+    - index (faiss.Index): The index to evaluate.
+    - vectors (np.ndarray): The original vectors, in id order.
+    - blend_vectors (np.ndarray): The vectors the pipeline will blend with this index (default is vectors).
+    - sample_size (int): Number of query vectors (default is 1000).
+    - k (int): Number of neighbours compared (default is 8).
+
+    Returns:
+    - dict: Recall, latency and blend difference figures.
+    """
+    blend_vectors = vectors if blend_vectors is None else blend_vectors
+    n = vectors.shape[0]
+    rng = np.random.default_rng(0)
+    query_ids = np.sort(rng.choice(n, min(sample_size, n), replace=False))
+    queries = np.ascontiguousarray(vectors[query_ids], dtype=np.float32)
+
+    start = time.perf_counter()
+    _, exact_ids = exact_search(vectors, queries, k)
+    exact_time = time.perf_counter() - start
+
+    retrieval = FaissRetrieval(index, blend_vectors, k)
+    start = time.perf_counter()
+    if retrieval.rerank:
+        _, ids = retrieval.search_reranked(queries)
+    else:
+        _, ids = index.search(queries, k)
+    search_time = time.perf_counter() - start
+    hits = [len(np.intersect1d(a, b)) for a, b in zip(ids, exact_ids)]
+
+    noise = 0.05 * queries.std() * rng.standard_normal(queries.shape)
+    blend_queries = (queries + noise).astype(np.float32)
+    score, ix = exact_search(vectors, blend_queries, k)
+    # the inverse-square distance weighting of the retrieval backends
+    weight = np.square(1 / score)
+    weight /= weight.sum(axis=1, keepdims=True)
+    reference = torch.from_numpy(
+        np.sum(
+            np.asarray(vectors[ix], dtype=np.float32) * np.expand_dims(weight, axis=2),
+            axis=1,
+        )
+    )
+    blended = retrieval.search(torch.from_numpy(blend_queries))
+    difference = (blended - reference).abs()
+
+    return {
+        "recall": float(np.sum(hits)) / (len(queries) * k),
+        "exact_latency_ms": exact_time * 1000 / len(queries),
+        "latency_ms": search_time * 1000 / len(queries),
+        "blend_mean_diff": difference.mean().item(),
+        "blend_max_diff": difference.max().item(),
+        "blend_rms": reference.pow(2).mean().sqrt().item(),
+    }
+
+
+def optimize_index(
+    index_path,
+    index_type="ivf",
+    nlist=None,
+    nprobe=8,
+    hnsw_m=32,
+    ef_construction=200,
+    ef_search=64,
+    pq_m=None,
+    pq_nbits=8,
+    sample_size=1000,
+):
+    """
+    Rebuilds a flat index as IVF-Flat, HNSW, fp16 or PQ and writes it next to the original.
+
+    The pipeline searches the optimized copy automatically while it is newer than the original.
+    The compressed types (fp16, pq) also write a float16 copy of the vectors next to the
+    optimized index, which the pipeline blends from; the original sidecar stays float32.
+
+    Parameters:
+    - index_path (str): Path to the original index file.
+    - index_type (str): "ivf", "hnsw", "fp16" or "pq" (default is "ivf").
+    - nlist (int): IVF inverted list count (default derived from the index size).
+    - nprobe (int): IVF lists visited per search (default is 8).
+    - hnsw_m (int): HNSW neighbours per node (default is 32).
+    - ef_construction (int): HNSW build candidate list size (default is 200).
+    - ef_search (int): HNSW search candidate list size (default is 64).
+    - pq_m (int): PQ sub-quantizer count (default is dim / 8).
+    - pq_nbits (int): PQ bits per sub-quantizer code (default is 8).
+    - sample_size (int): Number of vectors used to measure recall (default is 1000).
+
+    Returns:
+    - str: Path of the optimized index.
+    - dict: The evaluation report.
+    """
+    vectors = load_vector_sidecar(index_path)
+    original_bytes = os.path.getsize(index_path) + vectors.nbytes
+    print(
+        f"Building {index_type.upper()} index from {vectors.shape[0]} vectors of dimension {vectors.shape[1]}..."
+    )
+    start = time.perf_counter()
+    if index_type == "ivf":
+        index = build_ivf_index(vectors, nlist, nprobe)
+    elif index_type == "hnsw":
+        index = build_hnsw_index(vectors, hnsw_m, ef_construction, ef_search)
+    elif index_type == "fp16":
+        index = build_fp16_index(vectors)
+    elif index_type == "pq":
+        index = build_pq_index(vectors, pq_m, pq_nbits)
+    else:
+        raise ValueError(f"Unknown index type: {index_type}")
+    build_time = time.perf_counter() - start
+
+    compressed = index_type in COMPRESSED_INDEX_TYPES
+    blend_vectors = CastVectors(vectors, "float16") if compressed else vectors
+    report = evaluate_index(index, vectors, blend_vectors, sample_size)
+    report["build_s"] = build_time
+
+    output_path = get_optimized_index_path(index_path)
+    output_sidecar_path = get_sidecar_path(output_path)
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    faiss.write_index(index, tmp_path)
+    if compressed:
+        copy_vector_sidecar(vectors, output_sidecar_path, "float16")
+    elif os.path.exists(output_sidecar_path):
+        # left by an earlier compressed build; this type blends the original vectors
+        os.remove(output_sidecar_path)
+    del vectors, blend_vectors
+    os.replace(tmp_path, output_path)
+    report["original_mb"] = original_bytes / 1024**2
+    report["optimized_mb"] = (
+        os.path.getsize(output_path)
+        + os.path.getsize(
+            output_sidecar_path if compressed else get_sidecar_path(index_path)
+        )
+    ) / 1024**2
+
+    print(f"Built in {build_time:.1f} s, written to '{output_path}'.")
+    print(f"Recall@8: {report['recall']:.4f}")
+    print(
+        f"Per-query latency: {report['latency_ms']:.3f} ms (flat: {report['exact_latency_ms']:.3f} ms)"
+    )
+    print(
+        f"Size with vectors: {report['optimized_mb']:.1f} MB (original: {report['original_mb']:.1f} MB)"
+    )
+    print(
+        f"Blended feature difference: mean {report['blend_mean_diff']:.2e}, "
+        f"max {report['blend_max_diff']:.2e} (feature RMS {report['blend_rms']:.2e})"
+    )
+    return output_path, report
@@ -0,0 +1,95 @@
+import numpy as np
+
+
+def moving_sum(x, width):
+    """
+    Computes the sums of every run of width consecutive samples with a cumulative sum.
+
+    Parameters:
+    - x (np.ndarray): The input signal.
+    - width (int): Number of samples per sum.
+
+    Returns:
+    - np.ndarray: Float64 array of length len(x) - width + 1 where element j is sum(x[j : j + width]).
+    """
+    cumsum = np.zeros(x.shape[0] + 1)
+    np.cumsum(x, dtype=np.float64, out=cumsum[1:])
+    return cumsum[width:] - cumsum[:-width]
+
+
+def sequential_sum(x, positions, width):
+    """
+    Sums runs of width samples in the same order as adding width shifted views of the signal,
+    so the results are bit-identical to that loop.
+
+    Parameters:
+    - x (np.ndarray): The input signal.
+    - positions (np.ndarray): Start indices of the runs.
+    - width (int): Number of samples per sum.
+
+    Returns:
+    - np.ndarray: The sums, in the dtype of x.
+    """
+    sums = np.zeros(positions.shape[0], dtype=x.dtype)
+    for i in range(width):
+        sums += x[positions + i]
+    return sums
+
+
+def find_quietest_point(audio_pad, start, stop, window):
+    """
+    Finds the first position in [start, stop) whose window-sample sum has the smallest magnitude.
+
+    The sums are approximated with a cumulative sum, and only the positions that can still
+    be the minimum under a bound on the rounding error are summed exactly, so the result
+    matches an exact search over the whole range.
+
+    Parameters:
+    - audio_pad (np.ndarray): The audio signal padded by window // 2 samples on both sides.
+    - start (int): First candidate position.
+    - stop (int): End of the candidate positions (exclusive).
+    - window (int): Number of samples per sum.
+
+    Returns:
+    - int: The position of the quietest window.
+    """
+    segment = audio_pad[start : stop + window - 1]
+    approx = np.abs(moving_sum(segment, window))
+    # Rounding error of the cumulative sum and of the sequential reference sums
+    magnitude = moving_sum(np.abs(segment), window)
+    tolerance = 2 * (
+        segment.shape[0] * np.finfo(np.float64).eps * np.abs(segment).sum()
+        + window * np.finfo(audio_pad.dtype).eps * magnitude.max()
+    )
+    candidates = np.flatnonzero(approx <= approx.min() + 2 * tolerance)
+    exact = np.abs(sequential_sum(audio_pad, start + candidates, window))
+    return start + int(candidates[np.argmin(exact)])
+
+
+def plan_cut_points(audio, window, t_query, t_center, t_max):
+    """
+    Chooses the points at which a long input is cut into segments.
+
+    A cut is placed every t_center samples, moved to the quietest window-sample run within
+    t_query samples of it. Inputs of up to t_max samples are not cut.
+
+    Parameters:
+    - audio (np.ndarray): The audio signal.
+    - window (int): Number of samples summed to measure loudness.
+    - t_query (int): Search radius around each nominal cut, in samples.
+    - t_center (int): Distance between nominal cuts, in samples.
+    - t_max (int): Longest input processed as a single segment, in samples.
+
+    Returns:
+    - list of int: The cut points, in samples.
+    """
+    audio_pad = np.pad(audio, (window // 2, window // 2), mode="reflect")
+    cut_points = []
+    if audio_pad.shape[0] > t_max:
+        for t in range(t_center, audio.shape[0], t_center):
+            cut_points.append(
+                find_quietest_point(
+                    audio_pad, t - t_query, min(t + t_query, audio.shape[0]), window
+                )
+            )
+    return cut_points
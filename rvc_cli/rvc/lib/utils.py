@@ -1,4 +1,5 @@
 import os, sys
+import math
 import librosa
 import soundfile as sf
 import numpy as np
@@ -23,6 +24,9 @@ logging.getLogger("torch").setLevel(logging.ERROR)
 now_dir = os.getcwd()
 sys.path.append(now_dir)
 
+# Output samples decoded beyond both ends of a range so resampling matches the whole file
+RESAMPLE_MARGIN_SAMPLES = 800
+
 base_path = os.path.join(now_dir, "rvc_cli", "rvc", "models", "formant", "stftpitchshift")
 stft = base_path + ".exe" if sys.platform == "win32" else base_path
 
@@ -63,23 +67,59 @@ def load_audio_infer(
         if sr != sample_rate:
             audio = librosa.resample(audio, orig_sr=sr, target_sr=sample_rate)
         if formant_shifting:
-            formant_qfrency = kwargs.get("formant_qfrency", 0.8)
-            formant_timbre = kwargs.get("formant_timbre", 0.8)
-
-            from stftpitchshift import StftPitchShift
-
-            pitchshifter = StftPitchShift(1024, 32, sample_rate)
-            audio = pitchshifter.shiftpitch(
+            audio = formant_shift(
                 audio,
-                factors=1,
-                quefrency=formant_qfrency * 1e-3,
-                distortion=formant_timbre,
+                sample_rate,
+                kwargs.get("formant_qfrency", 0.8),
+                kwargs.get("formant_timbre", 0.8),
             )
     except Exception as error:
         raise RuntimeError(f"An error occurred loading the audio: {error}")
     return np.array(audio).flatten()
 
 
+def formant_shift(audio, sample_rate, formant_qfrency=0.8, formant_timbre=0.8):
+    from stftpitchshift import StftPitchShift
+
+    pitchshifter = StftPitchShift(1024, 32, sample_rate)
+    return pitchshifter.shiftpitch(
+        audio,
+        factors=1,
+        quefrency=formant_qfrency * 1e-3,
+        distortion=formant_timbre,
+    )
+
+
+def load_audio_range(file, sample_rate, start, end):
+    """
+    Decodes the samples [start, end) of an audio file as mono audio at sample_rate,
+    seeking to the matching source frames instead of reading the whole file.
+
+    Reads start on a source frame that falls exactly on a sample_rate sample, with a small
+    margin on both sides for the resampler, so any range matches the same samples of the
+    whole file resampled at once. Samples past the end of the file are zero.
+    """
+    try:
+        file = file.strip(" ").strip('"').strip("\n").strip('"').strip(" ")
+        with sf.SoundFile(file) as f:
+            sr = f.samplerate
+            # source frames and output samples per alignment step
+            gcd = math.gcd(sr, sample_rate)
+            src_step, dst_step = sr // gcd, sample_rate // gcd
+            margin = -(-RESAMPLE_MARGIN_SAMPLES // dst_step) if sr != sample_rate else 0
+            first = max(start // dst_step - margin, 0)
+            last = -(-end // dst_step) + margin
+            f.seek(min(first * src_step, f.frames))
+            audio = f.read((last - first) * src_step, always_2d=True)
+        audio = audio.mean(axis=1)
+        if sr != sample_rate and audio.shape[0] > 0:
+            audio = librosa.resample(audio, orig_sr=sr, target_sr=sample_rate)
+        audio = audio[start - first * dst_step : end - first * dst_step]
+    except Exception as error:
+        raise RuntimeError(f"An error occurred loading the audio: {error}")
+    return np.pad(audio, (0, end - start - audio.shape[0]))
+
+
 def format_title(title):
     formatted_title = (
         unicodedata.normalize("NFKD", title).encode("ascii", "ignore").decode("utf-8")
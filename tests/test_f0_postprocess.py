@@ -0,0 +1,46 @@
+import numpy as np
+from scipy import signal
+
+from rvc_cli.rvc.infer.f0_postprocess import REF_FREQS, autotune_f0, median_filter_f0
+from rvc_cli.rvc.lib.tools.benchmark import loop_autotune_f0
+
+
+def vibrato_f0(n, unvoiced=0.3, seed=0):
+    rng = np.random.default_rng(seed)
+    notes = np.repeat(
+        rng.uniform(80, 800, n // 20 + 1), rng.integers(20, 100, n // 20 + 1)
+    )[:n]
+    f0 = notes * 2 ** (0.3 * np.sin(np.arange(n) / 5) / 12)
+    f0[rng.random(n) < unvoiced] = 0
+    return f0
+
+
+def test_autotune_matches_loop():
+    f0 = vibrato_f0(3000)
+    voiced = f0 > 0
+    for strength in (0.0, 0.5, 1.0):
+        result = autotune_f0(f0, REF_FREQS, strength)
+        np.testing.assert_array_equal(
+            result[voiced], loop_autotune_f0(f0, strength)[voiced]
+        )
+        np.testing.assert_array_equal(result[~voiced], 0)
+
+
+def test_median_filter_matches_medfilt_when_voiced():
+    f0 = vibrato_f0(3000, unvoiced=0)
+    for radius in (3, 5):
+        np.testing.assert_array_equal(
+            median_filter_f0(f0, radius)[radius:-radius],
+            signal.medfilt(f0, 2 * radius + 1)[radius:-radius],
+        )
+
+
+def test_median_filter_keeps_unvoiced_frames():
+    f0 = vibrato_f0(3000)
+    result = median_filter_f0(f0, 5)
+    np.testing.assert_array_equal(result[f0 == 0], 0)
+
+
+def test_median_filter_small_radius_is_noop():
+    f0 = vibrato_f0(300)
+    np.testing.assert_array_equal(median_filter_f0(f0, 2), f0)
@@ -0,0 +1,48 @@
+import faiss
+import numpy as np
+import torch
+
+from rvc_cli.rvc.infer.retrieval import (
+    FaissRetrieval,
+    TorchRetrieval,
+    create_retrieval_backend,
+)
+
+
+def stored_vectors(n=2000, dim=64, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal((n, dim)).astype("float32")
+
+
+def flat_index(big_npy):
+    index = faiss.IndexFlatL2(big_npy.shape[1])
+    index.add(big_npy)
+    return index
+
+
+def test_torch_retrieval_matches_faiss():
+    big_npy = stored_vectors()
+    feats = torch.from_numpy(stored_vectors(300, seed=1))
+    expected = FaissRetrieval(flat_index(big_npy), big_npy).search(feats)
+    result = TorchRetrieval(big_npy, "cpu").search(feats)
+    torch.testing.assert_close(result, expected, rtol=1e-4, atol=1e-4)
+
+
+def test_torch_retrieval_searches_float16_sidecar():
+    sidecar = stored_vectors().astype("float16")
+    feats = torch.from_numpy(stored_vectors(300, seed=1))
+    # both backends search the same rounded vectors
+    expected = FaissRetrieval(flat_index(sidecar.astype("float32")), sidecar).search(
+        feats
+    )
+    result = TorchRetrieval(sidecar, "cpu").search(feats)
+    torch.testing.assert_close(result, expected, rtol=1e-3, atol=1e-3)
+
+
+def test_auto_backend_keeps_faiss_for_optimized_indexes():
+    big_npy = stored_vectors()
+    index = flat_index(big_npy)
+    assert create_retrieval_backend(index, big_npy, "cpu").name == "torch"
+    assert (
+        create_retrieval_backend(index, big_npy, "cpu", optimized=True).name == "faiss"
+    )
@@ -0,0 +1,21 @@
+import numpy as np
+
+from rvc_cli.rvc.lib.predictors.RMVPE import N_CLASS, RMVPE0Predictor
+from rvc_cli.rvc.lib.tools.benchmark import loop_local_average_cents
+
+
+def test_local_average_cents_matches_loop():
+    predictor = RMVPE0Predictor.__new__(RMVPE0Predictor)
+    predictor.cents_mapping = np.pad(
+        20 * np.arange(N_CLASS) + 1997.3794084376191, (4, 4)
+    )
+    rng = np.random.default_rng(0)
+    salience = rng.random((2000, N_CLASS)).astype(np.float32) ** 8
+    # peaks at both ends of the range exercise the padding
+    salience[0, 0] = 1
+    salience[1, -1] = 1
+    for thred in (0.03, 0.5):
+        np.testing.assert_array_equal(
+            predictor.to_local_average_cents(salience, thred=thred),
+            loop_local_average_cents(predictor.cents_mapping, salience, thred),
+        )
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from rvc_cli.rvc.lib.tools.benchmark import loop_cut_points
+from rvc_cli.rvc.lib.tools.segmentation import plan_cut_points
+
+
+def speech_like(n, dtype, seed=0):
+    rng = np.random.default_rng(seed)
+    envelope = np.repeat(
+        rng.uniform(0, 1, n // 1600 + 1) ** 2 * (rng.random(n // 1600 + 1) > 0.2),
+        1600,
+    )[:n]
+    return (envelope * rng.standard_normal(n) + 1e-3 * rng.standard_normal(n)).astype(
+        dtype
+    )
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_plan_cut_points_matches_loop(dtype):
+    params = (160, 16000 * 2, 16000 * 8, 16000 * 10)
+    audio = speech_like(16000 * 60, dtype)
+    assert plan_cut_points(audio, *params) == loop_cut_points(audio, *params)
+
+
+def test_plan_cut_points_digital_silence():
+    params = (160, 16000 * 2, 16000 * 8, 16000 * 10)
+    audio = speech_like(16000 * 30, np.float32, seed=1)
+    audio[16000 * 7 : 16000 * 10] = 0
+    assert plan_cut_points(audio, *params) == loop_cut_points(audio, *params)
+
+
+def test_plan_cut_points_short_input():
+    params = (160, 16000 * 2, 16000 * 8, 16000 * 10)
+    audio = speech_like(16000 * 5, np.float32)
+    assert plan_cut_points(audio, *params) == []
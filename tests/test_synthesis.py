@@ -0,0 +1,58 @@
+import json
+import os
+
+import numpy as np
+import torch
+
+from rvc_cli.rvc.configs.config import CONFIG_BASE_PATH
+from rvc_cli.rvc.infer.pipeline import Pipeline
+from rvc_cli.rvc.lib.algorithm.synthesizers import Synthesizer
+
+# Feature frames at the end of a shorter segment that see the batch padding through the
+# generator's receptive field; the pipeline trims far more than this as segment overlap
+EDGE_FRAMES = 10
+
+
+def random_synthesizer():
+    # read the file directly: Config() rewrites the precision of every config on CPU
+    with open(os.path.join(CONFIG_BASE_PATH, "v2", "40000.json")) as f:
+        version_config = json.load(f)
+    data = version_config["data"]
+    torch.manual_seed(0)
+    net_g = Synthesizer(
+        spec_channels=data["filter_length"] // 2 + 1,
+        segment_size=version_config["train"]["segment_size"] // data["hop_length"],
+        sr=data["sample_rate"],
+        use_f0=True,
+        is_half=False,
+        **version_config["model"],
+    )
+    del net_g.enc_q
+    return net_g.eval().float(), data["hop_length"]
+
+
+def test_batched_synthesis_matches_per_segment(monkeypatch):
+    net_g, hop_length = random_synthesizer()
+    segments = []
+    for length in (60, 53, 46):
+        feats = torch.randn(1, length, 768)
+        pitch = torch.randint(1, 256, (1, length))
+        pitchf = 100 + 200 * torch.rand(1, length)
+        segments.append((feats, length, pitch, pitchf))
+    # the prior sample, the harmonic noise and the random phase are drawn per call
+    monkeypatch.setattr(torch, "randn_like", lambda x, **kwargs: torch.zeros_like(x))
+    monkeypatch.setattr(
+        torch, "rand", lambda *args, **kwargs: torch.zeros(*args, **kwargs)
+    )
+    sid = torch.tensor([0]).long()
+
+    batched = Pipeline.synthesize(net_g, sid, segments)
+    for segment, audio in zip(segments, batched):
+        single = Pipeline.synthesize(net_g, sid, [segment])[0]
+        assert audio.shape == single.shape == (segment[1] * hop_length,)
+        edge = EDGE_FRAMES * hop_length
+        np.testing.assert_allclose(audio[:-edge], single[:-edge], atol=1e-5)
+    # a segment as long as the batch is not padded at all
+    np.testing.assert_allclose(
+        batched[0], Pipeline.synthesize(net_g, sid, [segments[0]])[0], atol=1e-5
+    )